@@ -0,0 +1,244 @@
+# -*- coding: utf-8 -*-
+"""
+Recarga a quente do mapa e das constantes de ajuste, sem reiniciar o jogo.
+
+O HotReloader consulta periodicamente o mtime do módulo do jogo e do .tmx (um
+os.stat por arquivo, barato o bastante para rodar dentro do on_update) e, ao
+detectar uma mudança, reaplica só o que mudou:
+
+- constantes: o código-fonte é lido com ast e as atribuições MAIÚSCULAS de
+  nível de módulo são avaliadas de novo (literais ou expressões sobre outras
+  constantes); as que mudaram de valor são trocadas com setattr no módulo e a
+  simulação repassa a mudança aos objetos vivos (ver
+  GameSimulation.apply_constant_changes);
+- mapa: cada camada do .tmx tem um hash do seu XML; uma camada de tiles
+  alterada reconstrói só as suas estruturas e uma camada de imagem só o seu
+  fundo (ver GameSimulation.reload_level_layers).
+
+A população (next_generation_traits), as estatísticas e os inimigos vivos são
+preservados. Apenas para desenvolvimento: nada aqui é usado nos treinos.
+"""
+import ast
+import hashlib
+import os
+import sys
+import xml.etree.ElementTree as ET
+
+from diagnostics import events
+
+HOT_RELOAD_INTERVAL = 0.5  # Segundos entre verificações de mtime
+
+# Nós permitidos nas expressões de constantes (aritmética sobre constantes)
+_EXPRESSION_NODES = (
+    ast.Expression,
+    ast.Constant,
+    ast.Name,
+    ast.Load,
+    ast.BinOp,
+    ast.UnaryOp,
+    ast.operator,
+    ast.unaryop,
+    ast.Tuple,
+    ast.List,
+    ast.Dict,
+    ast.Set,
+)
+
+
+_NOT_CONSTANT = object()
+
+
+def _evaluate(value, constants, namespace):
+    """Valor de uma expressão de constante, ou _NOT_CONSTANT se não for uma."""
+    try:
+        return ast.literal_eval(value)
+    except (ValueError, TypeError, SyntaxError):
+        pass
+
+    expression = ast.Expression(value)
+    nodes = list(ast.walk(expression))
+    if not all(isinstance(node, _EXPRESSION_NODES) for node in nodes):
+        return _NOT_CONSTANT
+
+    scope = {}
+    for node in nodes:
+        if not isinstance(node, ast.Name):
+            continue
+        if node.id in constants:
+            scope[node.id] = constants[node.id]
+        elif node.id.isupper() and node.id in namespace:
+            scope[node.id] = namespace[node.id]
+        else:
+            return _NOT_CONSTANT
+    try:
+        code = compile(expression, "<constants>", "eval")
+        return eval(code, {"__builtins__": {}}, scope)
+    except Exception:
+        return _NOT_CONSTANT
+
+
+def read_constants(source, namespace):
+    """
+    Avalia as constantes MAIÚSCULAS de nível de módulo de `source`.
+
+    Literais são lidos com ast.literal_eval; expressões só com aritmética e
+    nomes de outras constantes são avaliadas sobre as constantes já lidas (e,
+    na falta delas, sobre `namespace`). Qualquer outra coisa é ignorada.
+
+    Retorna:
+        dict nome -> valor, na ordem do código.
+    """
+    constants = {}
+    for node in ast.parse(source).body:
+        if isinstance(node, ast.Assign):
+            targets, value = node.targets, node.value
+        elif isinstance(node, ast.AnnAssign) and node.value is not None:
+            targets, value = [node.target], node.value
+        else:
+            continue
+        names = [t.id for t in targets if isinstance(t, ast.Name) and t.id.isupper()]
+        if not names:
+            continue
+        result = _evaluate(value, constants, namespace)
+        if result is _NOT_CONSTANT:
+            continue
+        for name in names:
+            constants[name] = result
+    return constants
+
+
+def layer_hashes(tmx_path):
+    """
+    Hash do XML de cada camada do .tmx.
+
+    Retorna:
+        dict (tipo, nome) -> hash, com tipo "layer" (tiles), "imagelayer" ou
+        "objectgroup".
+    """
+    root = ET.parse(tmx_path).getroot()
+    hashes = {}
+    for kind in ("layer", "imagelayer", "objectgroup"):
+        for element in root.iter(kind):
+            digest = hashlib.sha1(ET.tostring(element)).hexdigest()
+            hashes[(kind, element.get("name", ""))] = digest
+    return hashes
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+class HotReloader:
+    """
+    Observa o módulo do jogo e o mapa e reaplica as mudanças em `game`.
+
+    Args:
+        game: GameSimulation (ou MyGame) em execução
+        map_path: .tmx observado; por padrão o MAP_NAME do módulo do jogo
+        interval: segundos entre verificações
+        module: módulo com as constantes; por padrão o da classe de `game`
+    """
+
+    def __init__(
+        self, game, map_path=None, interval=HOT_RELOAD_INTERVAL, module=None
+    ):
+        self.game = game
+        self.module = module or sys.modules[type(game).__module__]
+        self.module_path = os.path.abspath(self.module.__file__)
+        self.map_path = map_path or self.module.MAP_NAME
+        self.interval = interval
+        self.elapsed = 0.0
+
+        self.module_mtime = _mtime(self.module_path)
+        self.map_mtime = _mtime(self.map_path)
+        with open(self.module_path, encoding="utf-8") as f:
+            self.constants = read_constants(f.read(), vars(self.module))
+        self.layers = layer_hashes(self.map_path)
+
+    def poll(self, delta_time):
+        """Chamado a cada quadro; verifica os arquivos a cada `interval` segundos."""
+        self.elapsed += delta_time
+        if self.elapsed < self.interval:
+            return
+        self.elapsed = 0.0
+        self.check()
+
+    def check(self):
+        """Verifica os arquivos agora e reaplica o que mudou."""
+        module_mtime = _mtime(self.module_path)
+        if module_mtime != self.module_mtime:
+            self.module_mtime = module_mtime
+            self.reload_constants()
+
+        map_mtime = _mtime(self.map_path)
+        if map_mtime != self.map_mtime:
+            self.map_mtime = map_mtime
+            self.reload_map()
+
+    def reload_constants(self):
+        try:
+            with open(self.module_path, encoding="utf-8") as f:
+                constants = read_constants(f.read(), vars(self.module))
+        except (OSError, SyntaxError) as e:
+            # Arquivo salvo no meio de uma edição: tenta de novo na próxima mudança
+            events.emit(
+                "hot_reload",
+                "Recarga ignorada: {error}",
+                events.WARNING,
+                error=str(e),
+            )
+            return {}
+
+        changed = {
+            name: value
+            for name, value in constants.items()
+            if name not in self.constants or self.constants[name] != value
+        }
+        self.constants = constants
+        if not changed:
+            return {}
+
+        for name, value in changed.items():
+            setattr(self.module, name, value)
+        self.game.apply_constant_changes(changed)
+        events.emit(
+            "hot_reload",
+            "Constantes recarregadas: {names}",
+            names=", ".join(sorted(changed)),
+            values=changed,
+        )
+        return changed
+
+    def reload_map(self):
+        try:
+            layers = layer_hashes(self.map_path)
+        except (OSError, ET.ParseError) as e:
+            events.emit(
+                "hot_reload",
+                "Recarga do mapa ignorada: {error}",
+                events.WARNING,
+                error=str(e),
+            )
+            return set()
+
+        changed = {
+            key
+            for key in set(layers) | set(self.layers)
+            if layers.get(key) != self.layers.get(key)
+        }
+        self.layers = layers
+        if not changed:
+            return changed
+
+        tile_layers = {name for kind, name in changed if kind == "layer"}
+        image_layers = {name for kind, name in changed if kind == "imagelayer"}
+        self.game.reload_level_layers(tile_layers, image_layers)
+        events.emit(
+            "hot_reload",
+            "Camadas recarregadas: {names}",
+            names=", ".join(sorted(f"{kind}:{name}" for kind, name in changed)),
+        )
+        return changed
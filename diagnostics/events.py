@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+"""
+Log estruturado de eventos da simulação, fora do caminho quente.
+
+Quem emite um evento só confere o nível da categoria e anexa uma tupla a um
+buffer circular (collections.deque com maxlen: append e popleft são atômicos no
+CPython, sem lock). Uma thread em segundo plano esvazia o buffer, formata a
+mensagem, grava uma linha JSON por evento no arquivo (JSONL) e, opcionalmente,
+repete a mensagem no console. Um terminal lento atrasa a thread, nunca o frame;
+se o buffer encher, os eventos mais antigos são descartados e contados.
+
+Categorias (e nível mínimo padrão):
+    generation    fim de geração (melhor/média de fitness)
+    elite         elite escolhido
+    shock         choque genético ativado
+    player_reset  player caiu (volta a um snapshot ou reinicia a geração)
+    spawn         fallback de spawn (ex.: nadador sem tile de água)
+    hot_reload    constantes ou camadas do mapa recarregadas (devtools)
+    distributed   workers conectados/perdidos e lotes redistribuídos
+    capture       gravação de vídeo iniciada/encerrada (quadros e descartes)
+
+Processos filhos: a thread de escrita não sobrevive a um fork e workers de
+multiprocessing saem por os._exit, sem passar pelo atexit. Depois de um fork o
+filho descarta o logger herdado (os eventos pendentes são do pai) e cria um
+novo, com a mesma configuração, no primeiro emit; processos iniciados com spawn
+recebem config() e chamam configure(**config). Quem roda trabalho em um worker
+chama flush() ao terminar cada tarefa.
+
+Uso:
+    events.configure(sink_path="events.jsonl", levels={"spawn": events.DEBUG})
+    events.emit("elite", "Elite: {type} com Fitness: {fitness:.2f}",
+                type="running", fitness=12.5)
+"""
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+LEVEL_NAMES = {DEBUG: "DEBUG", INFO: "INFO", WARNING: "WARNING"}
+
+DEFAULT_LEVELS = {
+    "generation": INFO,
+    "elite": INFO,
+    "shock": INFO,
+    "player_reset": INFO,
+    "spawn": WARNING,
+    "hot_reload": INFO,
+    "distributed": INFO,
+    "capture": INFO,
+}
+
+BUFFER_CAPACITY = 4096  # Eventos pendentes antes de descartar os mais antigos
+FLUSH_INTERVAL = 0.1  # Segundos entre esvaziamentos do buffer
+
+
+class EventLogger:
+    """
+    Logger de eventos com buffer circular e thread de escrita.
+
+    Args:
+        sink_path: arquivo JSONL (acrescenta ao final); None = sem arquivo
+        levels: nível mínimo por categoria (sobrepõe DEFAULT_LEVELS)
+        echo_level: eventos a partir deste nível também vão para o console
+            (None desliga o console)
+        capacity: tamanho do buffer circular
+        flush_interval: intervalo de esvaziamento da thread, em segundos
+    """
+
+    def __init__(
+        self,
+        sink_path=None,
+        levels=None,
+        echo_level=INFO,
+        capacity=BUFFER_CAPACITY,
+        flush_interval=FLUSH_INTERVAL,
+    ):
+        self.levels = dict(DEFAULT_LEVELS)
+        self.levels.update(levels or {})
+        self.echo_level = echo_level
+        self.capacity = capacity
+        self.flush_interval = flush_interval
+        self.dropped = 0
+
+        self._buffer = deque(maxlen=capacity)
+        self._sink = open(sink_path, "a", encoding="utf-8") if sink_path else None
+        self._wakeup = threading.Event()
+        # flush() esvazia na thread chamadora: o lock impede que ela e a thread
+        # de escrita intercalem linhas no arquivo ou no console
+        self._drain_lock = threading.Lock()
+        self._stopped = False
+        self._thread = threading.Thread(
+            target=self._run, name="event-logger", daemon=True
+        )
+        self._thread.start()
+
+    def set_level(self, category, level):
+        self.levels[category] = level
+
+    def enabled(self, category, level=INFO) -> bool:
+        return level >= self.levels.get(category, INFO)
+
+    def emit(self, category, message, level=INFO, **fields):
+        """
+        Registra um evento. `message` é um modelo de str.format preenchido com
+        `fields` só na thread de escrita; no chamador não há formatação nem I/O.
+        """
+        if level < self.levels.get(category, INFO):
+            return
+        buffer = self._buffer
+        if len(buffer) == self.capacity:
+            self.dropped += 1
+        buffer.append((time.time(), category, level, message, fields))
+
+    def flush(self):
+        """Esvazia o buffer agora (na thread chamadora)."""
+        self._drain()
+
+    def close(self):
+        """Para a thread, grava os eventos pendentes e fecha o arquivo."""
+        if self._stopped:
+            return
+        self._stopped = True
+        self._wakeup.set()
+        self._thread.join()
+        self._drain()
+        if self._sink:
+            self._sink.close()
+            self._sink = None
+
+    def _run(self):
+        while not self._stopped:
+            self._wakeup.wait(self.flush_interval)
+            self._drain()
+
+    def _drain(self):
+        with self._drain_lock:
+            self._drain_locked()
+
+    def _drain_locked(self):
+        buffer = self._buffer
+        lines = []
+        while True:
+            try:
+                timestamp, category, level, message, fields = buffer.popleft()
+            except IndexError:
+                break
+            try:
+                text = message.format(**fields)
+            except (KeyError, IndexError, ValueError) as e:
+                text = f"{message} (erro de formatação: {e})"
+            if self._sink:
+                record = {
+                    "time": timestamp,
+                    "category": category,
+                    "level": LEVEL_NAMES.get(level, level),
+                    "message": text,
+                }
+                record.update(fields)
+                lines.append(json.dumps(record, default=str))
+            if self.echo_level is not None and level >= self.echo_level:
+                print(text, file=sys.stdout)
+
+        if self._sink and lines:
+            self._sink.write("\n".join(lines) + "\n")
+            self._sink.flush()
+
+
+# Logger do processo, criado sob demanda (ver configure), e os argumentos
+# com que ele é (re)criado
+_logger = None
+_config = {}
+
+
+def configure(**kwargs) -> EventLogger:
+    """Substitui o logger do processo (argumentos de EventLogger)."""
+    global _logger, _config
+    if _logger is not None:
+        _logger.close()
+    _config = dict(kwargs)
+    _logger = EventLogger(**kwargs)
+    return _logger
+
+
+def config() -> dict:
+    """Argumentos do logger do processo, para repetir configure() em um filho."""
+    return dict(_config)
+
+
+def get_logger() -> EventLogger:
+    global _logger
+    if _logger is None:
+        _logger = EventLogger(**_config)
+    return _logger
+
+
+def emit(category, message, level=INFO, **fields):
+    """Emite um evento no logger do processo (ver EventLogger.emit)."""
+    (_logger or get_logger()).emit(category, message, level, **fields)
+
+
+def flush():
+    """Grava agora os eventos pendentes do logger do processo, se houver."""
+    if _logger is not None:
+        _logger.flush()
+
+
+def shutdown():
+    global _logger
+    if _logger is not None:
+        _logger.close()
+        _logger = None
+
+
+def _after_fork_in_child():
+    # A thread de escrita e o lock herdados são do pai: o logger é abandonado
+    # sem close() e recriado por get_logger() com a mesma configuração
+    global _logger
+    _logger = None
+
+
+atexit.register(shutdown)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
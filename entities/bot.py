@@ -0,0 +1,427 @@
+# -*- coding: utf-8 -*-
+"""
+Jogador automático (bot) para avaliar os inimigos sem ninguém no teclado.
+
+O bot controla o player pela mesma interface do teclado (left_pressed,
+right_pressed, apply_movement e player_jump) e planeja rotas com A* sobre um
+grafo de caminhabilidade calculado uma única vez por nível:
+
+- nós: células vazias com espaço para o corpo do player e chão sólido embaixo;
+- arestas: andar para a célula vizinha e, para pulos e quedas, os pousos de
+  trajetórias simuladas com a mesma física do PhysicsEnginePlatformer
+  (gravidade por tick, velocidade fixa), segurando a direção por N ticks.
+
+O grafo fica em cache por LevelData (compartilhado entre arenas) e as rotas em
+um cache LRU do grafo, então milhares de bots no mesmo nível custam poucas
+buscas. O replanejamento é incremental: o bot segue a rota atual e só busca de
+novo quando sai dela ou quando o objetivo muda (e nem isso se o objetivo novo
+já estiver na rota).
+
+Perfis (BOT_PROFILES):
+    runner  atravessa o nível de uma ponta à outra, ida e volta
+    evader  foge para o ponto alcançável mais longe dos inimigos
+    idler   fica parado, com um pulo ocasional
+"""
+import heapq
+import math
+import weakref
+from collections import OrderedDict, deque
+
+BOT_PROFILES = ("runner", "evader", "idler")
+
+BOT_REPLAN_INTERVAL = 0.5  # Segundos entre reavaliações do objetivo
+# Distância (px) ao centro da célula para pular; maior que metade do passo do
+# player, senão ele pode oscilar em volta do centro sem nunca alcançá-lo
+BOT_ALIGN_TOLERANCE = 3.0
+BOT_IDLE_JUMP_CHANCE = 0.01  # Chance de pulo por tick do perfil idler
+BOT_STUCK_TIME = 2.0  # Segundos no mesmo nó antes de descartar a rota
+
+JUMP_COST = 4.0  # Ticks extras de custo por pulo ou queda (prefere andar)
+MAX_AIR_TICKS = 90  # Limite da simulação de uma trajetória
+MOVE_TICK_STEP = 3  # Granularidade dos ticks de direção segurada no ar
+PATH_CACHE_SIZE = 4096
+
+WALK, JUMP, FALL = "walk", "jump", "fall"
+
+_graphs = weakref.WeakKeyDictionary()
+
+
+class WalkGraph:
+    """
+    Grafo de caminhabilidade de um nível para um corpo e uma física dados.
+
+    Args:
+        level: LevelData (usa tile_grid, width, height, tile_size)
+        body_width, body_height: caixa de colisão do player em pixels
+        speed: deslocamento horizontal por tick (PLAYER_MOVEMENT_SPEED)
+        jump_force: velocidade vertical inicial do pulo (PLAYER_JUMP_FORCE)
+        gravity: gravidade por tick (GRAVITY)
+    """
+
+    def __init__(self, level, body_width, body_height, speed, jump_force, gravity):
+        self.level = level
+        self.width = level.width
+        self.height = level.height
+        self.tile_size = level.tile_size
+        self.body_width = body_width
+        self.body_height = body_height
+        self.speed = speed
+        self.jump_force = jump_force
+        self.gravity = gravity
+
+        self.solid = [tile_id != -1 for tile_id in level.tile_grid]
+        self.nodes = [
+            index
+            for index in range(self.width * self.height)
+            if self._is_standable(index)
+        ]
+        self.node_set = set(self.nodes)
+        self._reachable = {}
+        # nó -> lista de (vizinho, tipo, ticks com a direção segurada, custo)
+        self.edges = {node: self._build_edges(node) for node in self.nodes}
+        self._paths = OrderedDict()
+
+    # --- Geometria ---
+
+    def _cell_solid(self, column, row):
+        if column < 0 or column >= self.width or row < 0:
+            return True  # Bordas laterais e o fundo do mapa funcionam como paredes
+        if row >= self.height:
+            return False
+        return self.solid[row * self.width + column]
+
+    def _is_standable(self, index):
+        row, column = divmod(index, self.width)
+        if row == 0 or self.solid[index]:
+            return False
+        body_rows = math.ceil(self.body_height / self.tile_size)
+        if any(self._cell_solid(column, row + i) for i in range(1, body_rows)):
+            return False
+        return self._cell_solid(column, row - 1)
+
+    def _box_hits(self, x, y):
+        """A caixa do corpo com os pés em (x, y) encosta em alguma célula sólida?"""
+        size = self.tile_size
+        half = self.body_width / 2 - 0.01
+        left = int((x - half) // size)
+        right = int((x + half) // size)
+        bottom = int((y + 0.01) // size)
+        top = int((y + self.body_height - 0.01) // size)
+        for row in range(bottom, top + 1):
+            for column in range(left, right + 1):
+                if self._cell_solid(column, row):
+                    return True
+        return False
+
+    def center(self, node):
+        """Posição (x, y dos pés) do centro de um nó."""
+        row, column = divmod(node, self.width)
+        return (column + 0.5) * self.tile_size, row * self.tile_size
+
+    def node_at(self, x, feet_y):
+        """Nó onde o player está apoiado, ou None (no ar ou fora do grafo)."""
+        size = self.tile_size
+        row = int(round(feet_y / size))
+        column = int(x // size)
+        for candidate in (column, column - 1, column + 1):
+            if 0 <= candidate < self.width and 0 <= row < self.height:
+                node = row * self.width + candidate
+                if node in self.node_set:
+                    return node
+        return None
+
+    # --- Arestas ---
+
+    def _simulate(self, x, y, vy, direction, move_ticks):
+        """
+        Simula uma trajetória (mesma ordem do motor: gravidade, eixo y, eixo x)
+        e devolve (nó de pouso, ticks no ar) ou None.
+        """
+        for tick in range(1, MAX_AIR_TICKS + 1):
+            vy -= self.gravity
+            new_y = y + vy
+            if self._box_hits(x, new_y):
+                if vy < 0:
+                    landed_y = (int(new_y // self.tile_size) + 1) * self.tile_size
+                    return self.node_at(x, landed_y), tick
+                vy = 0.0  # Bateu a cabeça no teto
+            else:
+                y = new_y
+            if y < -self.tile_size:
+                return None  # Caiu para fora do mapa
+            if tick <= move_ticks:
+                new_x = x + direction * self.speed
+                if not self._box_hits(new_x, y):
+                    x = new_x
+        return None
+
+    def _build_edges(self, node):
+        best = {}
+
+        def add(target, kind, move_ticks, cost):
+            if target is None or target == node:
+                return
+            if target not in best or cost < best[target][3]:
+                best[target] = (target, kind, move_ticks, cost)
+
+        row, column = divmod(node, self.width)
+        x, y = self.center(node)
+        walk_cost = self.tile_size / self.speed
+
+        for direction in (-1, 1):
+            neighbour = node + direction
+            if 0 <= column + direction < self.width and neighbour in self.node_set:
+                add(neighbour, WALK, 0, walk_cost)
+            elif not self._cell_solid(column + direction, row):
+                # Beirada: sai andando e cai, segurando a direção por N ticks
+                edge_x = x + direction * (self.tile_size / 2 + self.body_width / 2)
+                for move_ticks in range(0, MAX_AIR_TICKS, MOVE_TICK_STEP):
+                    result = self._simulate(edge_x, y, 0.0, direction, move_ticks)
+                    if result:
+                        target, ticks = result
+                        add(target, FALL, move_ticks, ticks + JUMP_COST)
+                        if move_ticks >= ticks:
+                            break  # Segurar mais tempo não muda o pouso
+
+            for move_ticks in range(0, MAX_AIR_TICKS, MOVE_TICK_STEP):
+                if move_ticks == 0 and direction == 1:
+                    continue  # Pulo vertical: já simulado na outra direção
+                result = self._simulate(x, y, self.jump_force, direction, move_ticks)
+                if result:
+                    target, ticks = result
+                    add(target, JUMP, move_ticks, ticks + JUMP_COST)
+                    if move_ticks >= ticks:
+                        break
+        return list(best.values())
+
+    # --- Busca ---
+
+    def _heuristic(self, node, goal):
+        # Nenhuma aresta anda mais que `speed` px por tick na horizontal
+        return abs(node % self.width - goal % self.width) * self.tile_size / self.speed
+
+    def find_path(self, start, goal):
+        """
+        Rota de start até goal (A*), como lista de arestas (de, para, tipo,
+        ticks), ou None. Resultados ficam em um cache LRU.
+        """
+        key = (start, goal)
+        paths = self._paths
+        if key in paths:
+            paths.move_to_end(key)
+            return paths[key]
+
+        path = self._search(start, goal)
+        paths[key] = path
+        if len(paths) > PATH_CACHE_SIZE:
+            paths.popitem(last=False)
+        return path
+
+    def _search(self, start, goal):
+        if start not in self.node_set or goal not in self.node_set:
+            return None
+        came_from = {start: None}
+        cost = {start: 0.0}
+        frontier = [(self._heuristic(start, goal), start)]
+        while frontier:
+            _, node = heapq.heappop(frontier)
+            if node == goal:
+                break
+            for target, kind, move_ticks, edge_cost in self.edges[node]:
+                new_cost = cost[node] + edge_cost
+                if new_cost < cost.get(target, math.inf):
+                    cost[target] = new_cost
+                    came_from[target] = (node, kind, move_ticks)
+                    heapq.heappush(
+                        frontier, (new_cost + self._heuristic(target, goal), target)
+                    )
+        if goal not in came_from:
+            return None
+
+        path = []
+        node = goal
+        while came_from[node] is not None:
+            previous, kind, move_ticks = came_from[node]
+            path.append((previous, node, kind, move_ticks))
+            node = previous
+        path.reverse()
+        return tuple(path)
+
+    def reachable(self, start):
+        """Nós alcançáveis a partir de start (busca em largura, em cache)."""
+        if start in self._reachable:
+            return self._reachable[start]
+        seen = {start}
+        queue = deque([start])
+        while queue:
+            node = queue.popleft()
+            for target, *_ in self.edges.get(node, ()):
+                if target not in seen:
+                    seen.add(target)
+                    queue.append(target)
+        seen = frozenset(seen)
+        self._reachable[start] = seen
+        return seen
+
+
+def walk_graph(level, body_width, body_height, speed, jump_force, gravity):
+    """WalkGraph do nível, construído uma vez por LevelData e parâmetros."""
+    key = (body_width, body_height, speed, jump_force, gravity)
+    graphs = _graphs.setdefault(level, {})
+    if key not in graphs:
+        graphs[key] = WalkGraph(level, *key)
+    return graphs[key]
+
+
+class BotPlayer:
+    """
+    Controla o player de uma GameSimulation.
+
+    Args:
+        game: GameSimulation (usa player_sprite, physics_engine, level_data,
+            enemy_list e a interface de movimento)
+        profile: um de BOT_PROFILES
+        speed, jump_force, gravity: física do player (constantes do jogo)
+        rng: gerador aleatório (perfil idler)
+    """
+
+    def __init__(self, game, profile, speed, jump_force, gravity, rng):
+        if profile not in BOT_PROFILES:
+            raise ValueError(f"Perfil de bot desconhecido: {profile!r} {BOT_PROFILES}")
+        self.game = game
+        self.profile = profile
+        self.rng = rng
+
+        player = game.player_sprite
+        self.graph = walk_graph(
+            game.level_data,
+            round(player.right - player.left, 2),
+            round(player.top - player.bottom, 2),
+            speed,
+            jump_force,
+            gravity,
+        )
+
+        self.path = deque()
+        self.goal = None
+        self.node = None
+        self.air_ticks = 0
+        self.hold_ticks = 0
+        self.direction = 0
+        self.replan_timer = 0.0
+        self.stuck_time = 0.0
+        self.heading_right = True
+
+    def reset(self):
+        """Descarta a rota (p.ex. quando a geração recomeça)."""
+        self.path.clear()
+        self.goal = None
+        self.node = None
+        self.replan_timer = 0.0
+
+    # --- Objetivos por perfil ---
+
+    def _goal_runner(self):
+        nodes = self.graph.reachable(self.node)
+        width = self.graph.width
+        rightmost = max(nodes, key=lambda n: (n % width, -n))
+        leftmost = min(nodes, key=lambda n: (n % width, n))
+        if self.node == rightmost:
+            self.heading_right = False
+        elif self.node == leftmost:
+            self.heading_right = True
+        return rightmost if self.heading_right else leftmost
+
+    def _goal_evader(self):
+        enemies = [(e.center_x, e.center_y) for e in self.game.enemy_list]
+        if not enemies:
+            return self.node
+        center = self.graph.center
+
+        def safety(node):
+            x, y = center(node)
+            return min((x - ex) ** 2 + (y - ey) ** 2 for ex, ey in enemies)
+
+        return max(self.graph.reachable(self.node), key=safety)
+
+    def _goal_idler(self):
+        return self.node
+
+    # --- Controle ---
+
+    def _press(self, direction):
+        game = self.game
+        game.left_pressed = direction < 0
+        game.right_pressed = direction > 0
+        game.apply_movement()
+
+    def _plan(self, goal):
+        self.goal = goal
+        if self.path and any(edge[1] == goal for edge in self.path):
+            # Objetivo novo já está na rota: só corta o final
+            while self.path[-1][1] != goal:
+                self.path.pop()
+            return
+        self.path = deque(self.graph.find_path(self.node, goal) or ())
+
+    def update(self, delta_time):
+        """Decide as teclas deste tick (chamado antes da física do player)."""
+        game = self.game
+        player = game.player_sprite
+
+        # Apoiado no chão: o motor zera change_y ao pousar, e a grade diz se há
+        # um nó sob os pés (bem mais barato que physics_engine.can_jump())
+        node = None
+        if player.change_y == 0:
+            node = self.graph.node_at(player.center_x, player.bottom)
+        if node is None:
+            # No ar: segura a direção pelos ticks previstos na aresta
+            self.air_ticks += 1
+            self._press(self.direction if self.air_ticks <= self.hold_ticks else 0)
+            return
+        if node != self.node:
+            self.node = node
+            self.stuck_time = 0.0
+        else:
+            self.stuck_time += delta_time
+
+        # Avança na rota; fora dela (ou parado demais), replaneja
+        while self.path and self.path[0][1] == node:
+            self.path.popleft()
+        if (self.path and self.path[0][0] != node) or self.stuck_time > BOT_STUCK_TIME:
+            self.path.clear()
+            self.stuck_time = 0.0
+            self.replan_timer = 0.0
+
+        self.replan_timer -= delta_time
+        if self.replan_timer <= 0 or (not self.path and self.goal != node):
+            self.replan_timer = BOT_REPLAN_INTERVAL
+            goal = getattr(self, f"_goal_{self.profile}")()
+            if goal != self.goal or not self.path:
+                self._plan(goal)
+
+        if not self.path:
+            self._press(0)
+            if self.profile == "idler" and self.rng.random() < BOT_IDLE_JUMP_CHANCE:
+                game.player_jump()
+            return
+
+        source, target, kind, move_ticks = self.path[0]
+        source_x = self.graph.center(source)[0]
+        target_x = self.graph.center(target)[0]
+        direction = (target_x > source_x) - (target_x < source_x)
+
+        if kind == WALK:
+            self._press(direction)
+        elif kind == FALL:
+            self.direction, self.hold_ticks, self.air_ticks = direction, move_ticks, 0
+            self._press(direction)
+        else:
+            offset = source_x - player.center_x
+            if abs(offset) > BOT_ALIGN_TOLERANCE:
+                # Alinha com o centro da célula de onde a trajetória foi simulada
+                self._press(1 if offset > 0 else -1)
+                return
+            self.direction, self.hold_ticks, self.air_ticks = direction, move_ticks, 0
+            self._press(direction if move_ticks > 0 else 0)
+            game.player_jump()
@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+"""
+Comportamento de enxame (separação, alinhamento e coesão) sobre uma grade
+uniforme de posições.
+
+A cada tick as posições dos inimigos de um tipo entram em uma SpatialHash com
+células do tamanho do raio de vizinhança; os vizinhos de um inimigo estão no
+bloco 3x3 de células em volta da sua. Em vez de comparar todos os pares
+(O(N²), inviável com milhares de abelhas):
+
+- alinhamento e coesão usam somas por célula (quantidade, posição e
+  velocidade), acumuladas uma vez por bloco 3x3: custo O(1) por inimigo, por
+  mais denso que o bando esteja;
+- a separação examina no máximo max_neighbours candidatos do bloco, começando
+  pela posição do próprio inimigo na sua célula (cada um vê vizinhos
+  diferentes mesmo quando o bando inteiro cabe numa célula): custo O(k).
+
+flock_steering() devolve as três direções (vetores unitários) de cada
+inimigo; os pesos vêm dos traços evolutivos (ver Enemy.apply_traits).
+"""
+import math
+
+_GOLDEN_ANGLE = math.pi * (3 - math.sqrt(5))
+_NO_STEERING = (0.0, 0.0, 0.0, 0.0, 0.0, 0.0)
+_BLOCK = [(ox, oy) for ox in (-1, 0, 1) for oy in (-1, 0, 1) if ox or oy]
+
+
+class SpatialHash:
+    """
+    Grade uniforme: célula (cx, cy) -> índices dos pontos dentro dela.
+
+    Args:
+        cell_size: lado da célula em pixels
+    """
+
+    def __init__(self, cell_size):
+        self.cell_size = cell_size
+        self.cells = {}
+
+    def rebuild(self, points):
+        """Reconstrói a grade a partir de uma sequência de (x, y)."""
+        cells = {}
+        size = self.cell_size
+        for index, (x, y) in enumerate(points):
+            key = (int(x // size), int(y // size))
+            members = cells.get(key)
+            if members is None:
+                cells[key] = [index]
+            else:
+                members.append(index)
+        self.cells = cells
+
+
+def _unit(x, y):
+    length = math.hypot(x, y)
+    if length < 1e-9:
+        return 0.0, 0.0
+    return x / length, y / length
+
+
+def flock_steering(boids, radius, separation_distance, max_neighbours):
+    """
+    Direções de separação, alinhamento e coesão de cada inimigo.
+
+    Args:
+        boids: sequência de (x, y, vx, vy)
+        radius: raio de vizinhança (lado das células da grade)
+        separation_distance: vizinhos mais perto que isso repelem
+        max_neighbours: candidatos examinados na separação, por inimigo
+
+    Retorna:
+        Lista alinhada com boids de tuplas (sep_x, sep_y, align_x, align_y,
+        coh_x, coh_y), cada par unitário ou nulo.
+    """
+    grid = SpatialHash(radius)
+    grid.rebuild((boid[0], boid[1]) for boid in boids)
+    cells = grid.cells
+
+    # Somas por célula: quantidade, posição e velocidade
+    sums = {}
+    for key, members in cells.items():
+        sx = sy = svx = svy = 0.0
+        for index in members:
+            x, y, vx, vy = boids[index]
+            sx += x
+            sy += y
+            svx += vx
+            svy += vy
+        sums[key] = (len(members), sx, sy, svx, svy)
+
+    result = [_NO_STEERING] * len(boids)
+    separation_sq = separation_distance * separation_distance
+    for (cx, cy), members in cells.items():
+        count, sx, sy, svx, svy = sums[(cx, cy)]
+        neighbour_cells = []
+        for ox, oy in _BLOCK:
+            key = (cx + ox, cy + oy)
+            block_sums = sums.get(key)
+            if block_sums is not None:
+                count += block_sums[0]
+                sx += block_sums[1]
+                sy += block_sums[2]
+                svx += block_sums[3]
+                svy += block_sums[4]
+                neighbour_cells.append(cells[key])
+
+        others = count - 1
+        if others == 0:
+            continue
+        size = len(members)
+        for slot, index in enumerate(members):
+            x, y, vx, vy = boids[index]
+
+            # Coesão: rumo ao centro dos vizinhos; alinhamento: rumo à
+            # velocidade média deles (sem contar o próprio inimigo)
+            coh_x, coh_y = _unit((sx - x) / others - x, (sy - y) / others - y)
+            align_x, align_y = _unit(
+                (svx - vx) / others - vx, (svy - vy) / others - vy
+            )
+
+            # Separação: candidatos da própria célula a partir do slot seguinte,
+            # depois das células vizinhas, até max_neighbours
+            push_x = push_y = 0.0
+            budget = max_neighbours
+            for step in range(1, min(size, budget + 1)):
+                other = boids[members[(slot + step) % size]]
+                dx = x - other[0]
+                dy = y - other[1]
+                distance_sq = dx * dx + dy * dy
+                if distance_sq < separation_sq:
+                    if distance_sq < 1e-9:
+                        # Inimigos empilhados: empurra numa direção própria
+                        angle = index * _GOLDEN_ANGLE
+                        push_x += math.cos(angle)
+                        push_y += math.sin(angle)
+                    else:
+                        push_x += dx / distance_sq
+                        push_y += dy / distance_sq
+            budget -= size - 1
+            for neighbour in neighbour_cells:
+                if budget <= 0:
+                    break
+                length = len(neighbour)
+                for step in range(min(length, budget)):
+                    other = boids[neighbour[(slot + step) % length]]
+                    dx = x - other[0]
+                    dy = y - other[1]
+                    distance_sq = dx * dx + dy * dy
+                    if 1e-9 < distance_sq < separation_sq:
+                        push_x += dx / distance_sq
+                        push_y += dy / distance_sq
+                budget -= length
+
+            sep_x, sep_y = _unit(push_x, push_y)
+            result[index] = (sep_x, sep_y, align_x, align_y, coh_x, coh_y)
+    return result
@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+"""
+Banco local (SQLite) com o hall da fama dos genomas.
+
+Cada elite de cada geração é gravado com os componentes de fitness, o tipo do
+inimigo, a execução (run) de origem e os parâmetros dessa execução. Há índices
+por fitness, por tipo e por faixa de cada traço, então consultas de semeadura
+como "os 50 melhores nadadores com jump > 3" respondem em milissegundos mesmo
+com milhões de linhas, e um treino novo pode começar de genomas bons em vez
+dos três dicionários fixos de GameSimulation.
+
+Uso:
+    with GenomeStore("genomes.db") as store:
+        run_id = store.start_run({"SELECTION_MODE": "pareto"})
+        store.record_elite(run_id, generation, traits, fitness, hits=2)
+        seeds = store.top_genomes(50, enemy_type="swimming",
+                                  conditions=[parse_condition("jump>3")])
+"""
+import json
+import re
+import sqlite3
+import time
+import uuid
+
+# Traços com coluna (e índice) próprios; o dict completo também é salvo em JSON
+TRAIT_COLUMNS = ("run", "fly", "jump", "swim")
+
+COMPARISON_OPERATORS = (">=", "<=", ">", "<", "=")
+_CONDITION_PATTERN = re.compile(r"^\s*(\w+)\s*(>=|<=|>|<|=)\s*(-?[\d.]+)\s*$")
+
+_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS runs (
+        run_id TEXT PRIMARY KEY,
+        started REAL NOT NULL,
+        params TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS genomes (
+        id INTEGER PRIMARY KEY,
+        run_id TEXT NOT NULL REFERENCES runs(run_id),
+        generation INTEGER NOT NULL,
+        type TEXT NOT NULL,
+        fitness REAL NOT NULL,
+        hits INTEGER NOT NULL,
+        proximity REAL NOT NULL,
+        min_distance REAL,
+        novelty REAL,
+        run REAL NOT NULL,
+        fly REAL NOT NULL,
+        jump REAL NOT NULL,
+        swim REAL NOT NULL,
+        traits TEXT NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_genomes_fitness ON genomes (fitness DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_genomes_type_fitness"
+    " ON genomes (type, fitness DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_genomes_run ON genomes (run_id, generation)",
+] + [
+    f"CREATE INDEX IF NOT EXISTS idx_genomes_type_{trait}"
+    f" ON genomes (type, {trait}, fitness DESC)"
+    for trait in TRAIT_COLUMNS
+]
+
+
+def parse_condition(text):
+    """
+    Converte "jump>3" em ("jump", ">", 3.0).
+
+    Só aceita traços de TRAIT_COLUMNS e os operadores de COMPARISON_OPERATORS
+    (os nomes vão para o SQL, então nada fora dessas listas passa).
+    """
+    match = _CONDITION_PATTERN.match(text)
+    if not match or match.group(1) not in TRAIT_COLUMNS:
+        raise ValueError(
+            f"Condição inválida: {text!r} (use <traço><op><valor>, traços {TRAIT_COLUMNS})"
+        )
+    return match.group(1), match.group(2), float(match.group(3))
+
+
+class GenomeStore:
+    """
+    Acesso ao banco de genomas.
+
+    Args:
+        path: arquivo SQLite (criado se não existir); ":memory:" para testes
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        with self.connection:
+            for statement in _SCHEMA:
+                self.connection.execute(statement)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if self.connection is not None:
+            # Atualiza as estatísticas do planejador (ANALYZE quando vale a pena)
+            # para ele escolher entre os índices por traço e o índice por fitness
+            self.connection.execute("PRAGMA optimize")
+            self.connection.close()
+            self.connection = None
+
+    def start_run(self, params=None, run_id=None) -> str:
+        """Registra uma execução (com seus parâmetros) e devolve o run_id."""
+        run_id = run_id or uuid.uuid4().hex
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR IGNORE INTO runs (run_id, started, params) VALUES (?, ?, ?)",
+                (run_id, time.time(), json.dumps(params or {}, sort_keys=True)),
+            )
+        return run_id
+
+    def record_elite(
+        self,
+        run_id,
+        generation,
+        traits,
+        fitness,
+        hits=0,
+        proximity=0.0,
+        min_distance=None,
+        novelty=None,
+    ):
+        """Grava o elite de uma geração."""
+        if min_distance is not None and min_distance == float("inf"):
+            min_distance = None
+        with self.connection:
+            self.connection.execute(
+                """
+                INSERT INTO genomes (
+                    run_id, generation, type, fitness, hits, proximity,
+                    min_distance, novelty, run, fly, jump, swim, traits
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    run_id,
+                    generation,
+                    traits["type"],
+                    fitness,
+                    hits,
+                    proximity,
+                    min_distance,
+                    novelty,
+                    *(traits.get(trait, 1.0) for trait in TRAIT_COLUMNS),
+                    json.dumps(traits, sort_keys=True),
+                ),
+            )
+
+    def top_genomes(
+        self, limit=50, enemy_type=None, conditions=(), run_id=None
+    ) -> list:
+        """
+        Melhores genomas (maior fitness primeiro) que satisfazem os filtros.
+
+        Args:
+            limit: quantidade máxima
+            enemy_type: "running", "flying", "swimming" ou None (todos)
+            conditions: tuplas (traço, operador, valor), ver parse_condition()
+            run_id: restringe a uma execução
+
+        Retorna:
+            Lista de dicts com "traits", "fitness", "hits", "run_id" e
+            "generation".
+        """
+        clauses = []
+        values = []
+        if enemy_type is not None:
+            clauses.append("type = ?")
+            values.append(enemy_type)
+        if run_id is not None:
+            clauses.append("run_id = ?")
+            values.append(run_id)
+        for trait, operator, value in conditions:
+            if trait not in TRAIT_COLUMNS or operator not in COMPARISON_OPERATORS:
+                raise ValueError(f"Condição inválida: {trait} {operator} {value}")
+            clauses.append(f"{trait} {operator} ?")
+            values.append(value)
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self.connection.execute(
+            f"""
+            SELECT type, run, fly, jump, swim, traits, fitness, hits, run_id,
+                generation
+            FROM genomes {where} ORDER BY fitness DESC LIMIT ?
+            """,
+            (*values, limit),
+        ).fetchall()
+
+        genomes = []
+        for row in rows:
+            genome_type, *trait_values, traits_json = row[:6]
+            # As colunas valem como base; o JSON guarda eventuais traços extras
+            traits = dict(zip(TRAIT_COLUMNS, trait_values), type=genome_type)
+            traits.update(json.loads(traits_json))
+            fitness, hits, genome_run_id, generation = row[6:]
+            genomes.append(
+                {
+                    "traits": traits,
+                    "fitness": fitness,
+                    "hits": hits,
+                    "run_id": genome_run_id,
+                    "generation": generation,
+                }
+            )
+        return genomes
+
+    def seed_traits(self, population_size, **query) -> list:
+        """
+        Traços para uma população inicial de population_size inimigos, a partir
+        de top_genomes(**query). Se houver menos resultados que inimigos, os
+        melhores são repetidos; sem resultados, devolve uma lista vazia.
+        """
+        genomes = self.top_genomes(limit=population_size, **query)
+        if not genomes:
+            return []
+        return [
+            dict(genomes[i % len(genomes)]["traits"]) for i in range(population_size)
+        ]
+
+    def count(self) -> int:
+        return self.connection.execute("SELECT COUNT(*) FROM genomes").fetchone()[0]
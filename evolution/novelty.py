@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+"""
+Busca por novidade (novelty search) com arquivo indexado por k-d tree.
+
+Cada inimigo avaliado produz um descritor de comportamento (vetor curto de
+números normalizados) e a novidade é a distância média aos k vizinhos mais
+próximos entre o arquivo de comportamentos já vistos e a população atual.
+
+O arquivo cresce a cada geração e é indexado por uma floresta logarítmica de
+k-d trees (Bentley-Saxe): os descritores novos entram em um buffer pequeno; quando
+o buffer enche vira uma árvore, e árvores de tamanho parecido são fundidas e
+reconstruídas. Cada entrada é reconstruída O(log N) vezes e uma consulta k-NN
+percorre O(log N) árvores com um heap compartilhado, então a novidade continua
+sublinear mesmo com centenas de milhares de entradas.
+"""
+import heapq
+import math
+
+NOVELTY_K = 15
+BUFFER_SIZE = 64  # Descritores pendentes (busca linear) antes de virar árvore
+LEAF_SIZE = 16  # Pontos por folha (abaixo disso a varredura linear é mais barata)
+SPREAD_SAMPLE = 64  # Pontos usados para escolher o eixo de corte de um nó
+TRIM_FRACTION = 0.9  # Ao passar de max_size, mantém as 90% entradas mais novas
+
+
+# Distância euclidiana implementada em C (bem mais rápida que somar em Python)
+distance = math.dist
+
+
+class KDTree:
+    """
+    k-d tree estática (imutável depois de construída) sobre uma lista de pontos.
+
+    Os nós são tuplas (axis, split, left, right) e as folhas listas de pontos;
+    a divisão é pela mediana do eixo de maior extensão do nó.
+    """
+
+    def __init__(self, points, leaf_size=LEAF_SIZE):
+        self.size = len(points)
+        self.leaf_size = leaf_size
+        self.root = self._build(list(points)) if points else None
+
+    def _build(self, points):
+        if len(points) <= self.leaf_size:
+            return points
+
+        # Eixo de maior extensão, estimado por uma amostra espaçada dos pontos
+        sample = points[:: max(1, len(points) // SPREAD_SAMPLE)]
+        axis = max(
+            range(len(points[0])),
+            key=lambda d: max(p[d] for p in sample) - min(p[d] for p in sample),
+        )
+        points.sort(key=lambda p: p[axis])
+        middle = len(points) // 2
+        split = points[middle][axis]
+        return (
+            axis,
+            split,
+            self._build(points[:middle]),
+            self._build(points[middle:]),
+        )
+
+    def nearest(self, query, k):
+        """
+        Os k pontos mais próximos de query.
+
+        Retorna uma lista de (distância, ponto) em ordem crescente de distância.
+        """
+        best = []
+        self.search(query, k, best)
+        return sorted((-neg, point) for neg, _, point in best)
+
+    def search(self, query, k, best):
+        """
+        Atualiza `best`, um max-heap de (-distância, id, ponto) com no máximo
+        k itens; permite compartilhar o heap entre várias árvores.
+        """
+        if self.root is not None and k > 0:
+            self._search(self.root, query, k, best)
+
+    def _search(self, node, query, k, best):
+        if isinstance(node, list):
+            for point in node:
+                d = distance(query, point)
+                if len(best) < k:
+                    heapq.heappush(best, (-d, id(point), point))
+                elif d < -best[0][0]:
+                    heapq.heapreplace(best, (-d, id(point), point))
+            return
+
+        axis, split, left, right = node
+        diff = query[axis] - split
+        near, far = (left, right) if diff < 0 else (right, left)
+        self._search(near, query, k, best)
+        # Só desce no outro lado se o plano de corte estiver mais perto que o
+        # k-ésimo vizinho atual
+        if len(best) < k or abs(diff) < -best[0][0]:
+            self._search(far, query, k, best)
+
+
+class NoveltyArchive:
+    """
+    Arquivo de descritores de comportamento com consulta k-NN.
+
+    Args:
+        k: vizinhos usados no cálculo da novidade
+        max_size: limite de entradas (as mais antigas são descartadas, com
+            reconstrução completa); None = sem limite
+    """
+
+    def __init__(self, k=NOVELTY_K, max_size=None):
+        self.k = k
+        self.max_size = max_size
+        self._trees = []  # Floresta, da árvore mais antiga (maior) para a mais nova
+        self._buffer = []  # Inseridos depois da última árvore criada
+        self._size = 0
+        self.rebuilds = 0
+
+    def __len__(self):
+        return self._size
+
+    def add(self, descriptor):
+        self._buffer.append(tuple(descriptor))
+        self._size += 1
+        if len(self._buffer) >= BUFFER_SIZE:
+            self._flush_buffer()
+        if self.max_size is not None and self._size > self.max_size:
+            self._trim()
+
+    def extend(self, descriptors):
+        for descriptor in descriptors:
+            self.add(descriptor)
+
+    def points(self) -> list:
+        """Todas as entradas, da mais antiga para a mais nova."""
+        points = []
+        for tree in self._trees:
+            points.extend(tree.points)
+        points.extend(self._buffer)
+        return points
+
+    def rebuild(self):
+        """Reconstrói o índice inteiro como uma única árvore."""
+        points = self.points()
+        self._trees = [self._make_tree(points)] if points else []
+        self._buffer = []
+
+    def _make_tree(self, points):
+        tree = KDTree(points)
+        # A construção reordena a cópia interna; guarda a ordem de inserção
+        tree.points = points
+        self.rebuilds += 1
+        return tree
+
+    def _flush_buffer(self):
+        # Funde com as árvores mais novas enquanto não forem maiores que o
+        # acumulado, mantendo tamanhos aproximadamente em potências de 2
+        points = self._buffer
+        while self._trees and self._trees[-1].size <= len(points):
+            points = self._trees.pop().points + points
+        self._trees.append(self._make_tree(points))
+        self._buffer = []
+
+    def _trim(self):
+        points = self.points()
+        keep = int(self.max_size * TRIM_FRACTION)
+        points = points[len(points) - keep :]
+        self._size = len(points)
+        self._trees = [self._make_tree(points)] if points else []
+        self._buffer = []
+
+    def nearest_distances(self, descriptor, k=None):
+        """Distâncias (crescentes) aos k vizinhos mais próximos no arquivo."""
+        k = k or self.k
+        query = tuple(descriptor)
+        best = []
+        # Árvores mais novas (menores) primeiro: o heap aperta rápido e poda as
+        # maiores
+        for tree in reversed(self._trees):
+            tree.search(query, k, best)
+        distances = [-neg for neg, _, _ in best]
+        distances.extend(distance(query, p) for p in self._buffer)
+        return heapq.nsmallest(k, distances)
+
+    def novelty(self, descriptor, neighbours=(), k=None):
+        """
+        Distância média aos k vizinhos mais próximos entre o arquivo e
+        `neighbours` (tipicamente o resto da população atual).
+        """
+        k = k or self.k
+        distances = self.nearest_distances(descriptor, k)
+        distances.extend(
+            distance(descriptor, other) for other in neighbours
+        )
+        nearest = heapq.nsmallest(k, distances)
+        return sum(nearest) / len(nearest) if nearest else 0.0
+
+    def score_population(self, descriptors):
+        """
+        Novidade de cada descritor da população (contra o arquivo e os demais
+        indivíduos da população).
+
+        A população também é indexada por uma KDTree temporária, construída
+        uma vez: cada indivíduo consulta k+1 vizinhos e descarta a si mesmo,
+        sem varrer os outros N-1.
+        """
+        k = self.k
+        points = [tuple(descriptor) for descriptor in descriptors]
+        population = KDTree(points)
+        scores = []
+        for point in points:
+            best = []
+            population.search(point, k + 1, best)
+            # Descarta o próprio indivíduo (pela identidade; um igual a ele
+            # continua contando como vizinho a distância zero)
+            neighbours = sorted((-neg, id(other)) for neg, _, other in best)
+            own = next(
+                (i for i, (_, ident) in enumerate(neighbours) if ident == id(point)),
+                len(neighbours) - 1,
+            )
+            distances = [d for i, (d, _) in enumerate(neighbours) if i != own]
+            distances.extend(self.nearest_distances(point, k))
+            nearest = heapq.nsmallest(k, distances)
+            scores.append(sum(nearest) / len(nearest) if nearest else 0.0)
+        return scores
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""
+Avaliação por corrida (racing): interrompe cedo os genomas sem chance.
+
+Durante a avaliação headless, o fitness parcial de cada indivíduo é lido em
+checkpoints. Entre dois checkpoints o ganho de fitness por segundo é uma
+amostra; com a média e o erro padrão dessas amostras (Welford) cada indivíduo
+tem um intervalo para o fitness final projetado:
+
+    limite inferior = atual + restante * max(0, média - z * erro)
+    limite superior = atual + restante * (média + z * erro)
+
+Um indivíduo é eliminado quando o seu limite superior fica abaixo do k-ésimo
+maior limite inferior entre os que ainda correm, isto é, quando nem no cenário
+otimista ele alcançaria o top-k (o elite, com keep=1). O simulador deixa de
+atualizá-lo e o tempo vai para os sobreviventes.
+"""
+import math
+
+RACING_CHECKPOINT_INTERVAL = 1.0  # Segundos simulados entre checkpoints
+RACING_MIN_CHECKPOINTS = 3  # Amostras antes de qualquer eliminação
+RACING_MIN_FRACTION = 0.25  # Fração mínima da avaliação antes de eliminar
+RACING_Z = 2.0  # Largura do intervalo, em erros padrão
+
+
+class Race:
+    """
+    Estado de uma corrida entre `size` indivíduos.
+
+    Args:
+        size: número de indivíduos (índices 0..size-1)
+        keep: tamanho do top-k que precisa ser decidido (1 = só o elite)
+        z: largura do intervalo de confiança, em erros padrão
+        min_checkpoints: amostras mínimas de um indivíduo para eliminá-lo
+        min_fraction: fração mínima da duração antes de eliminar alguém
+    """
+
+    def __init__(
+        self,
+        size,
+        keep=1,
+        z=RACING_Z,
+        min_checkpoints=RACING_MIN_CHECKPOINTS,
+        min_fraction=RACING_MIN_FRACTION,
+    ):
+        self.keep = max(1, keep)
+        self.z = z
+        self.min_checkpoints = min_checkpoints
+        self.min_fraction = min_fraction
+
+        self.alive = set(range(size))
+        self.eliminated_at = {}  # índice -> tempo decorrido na eliminação
+        self.scores = [0.0] * size
+        self._last_time = 0.0
+        # Welford sobre as taxas de ganho entre checkpoints
+        self._count = [0] * size
+        self._mean = [0.0] * size
+        self._m2 = [0.0] * size
+
+    def rate_interval(self, index):
+        """(média - z*erro, média + z*erro) da taxa de ganho de `index`."""
+        count = self._count[index]
+        mean = self._mean[index]
+        if count < 2:
+            return mean, mean
+        error = math.sqrt(self._m2[index] / (count - 1) / count)
+        return mean - self.z * error, mean + self.z * error
+
+    def bounds(self, index, remaining):
+        """Limites (inferior, superior) do fitness final projetado de `index`."""
+        low_rate, high_rate = self.rate_interval(index)
+        score = self.scores[index]
+        return (
+            score + remaining * max(0.0, low_rate),
+            score + remaining * max(0.0, high_rate),
+        )
+
+    def checkpoint(self, scores, elapsed, duration) -> list:
+        """
+        Registra o fitness parcial dos indivíduos vivos e elimina os sem chance.
+
+        Args:
+            scores: dict índice -> fitness atual (para os índices em alive)
+            elapsed: tempo simulado decorrido
+            duration: duração total da avaliação
+
+        Retorna:
+            Os índices eliminados neste checkpoint.
+        """
+        interval = elapsed - self._last_time
+        if interval <= 0:
+            return []
+        self._last_time = elapsed
+
+        for index in self.alive:
+            score = scores[index]
+            rate = (score - self.scores[index]) / interval
+            self.scores[index] = score
+            self._count[index] += 1
+            delta = rate - self._mean[index]
+            self._mean[index] += delta / self._count[index]
+            self._m2[index] += delta * (rate - self._mean[index])
+
+        if len(self.alive) <= self.keep or elapsed < duration * self.min_fraction:
+            return []
+
+        remaining = max(0.0, duration - elapsed)
+        bounds = {index: self.bounds(index, remaining) for index in self.alive}
+        lower = sorted((low for low, _ in bounds.values()), reverse=True)
+        threshold = lower[self.keep - 1]
+
+        eliminated = [
+            index
+            for index, (_, high) in bounds.items()
+            if high < threshold and self._count[index] >= self.min_checkpoints
+        ]
+        for index in eliminated:
+            self.alive.discard(index)
+            self.eliminated_at[index] = elapsed
+        return sorted(eliminated)
@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+"""
+Geradores aleatórios baseados em contador (Philox4x32-10), por fluxo.
+
+Em vez de um gerador com estado compartilhado (o módulo random global, cujo
+resultado depende da ordem em que os inimigos são avaliados), cada uso tem o
+seu fluxo, identificado por um caminho como (semente, geração, indivíduo,
+propósito). O n-ésimo bloco de um fluxo é philox(contador=n, chave=fluxo): uma
+função pura, sem estado para compartilhar nem travar, então simular um inimigo
+em outra arena, outro processo ou em lote dá exatamente os mesmos números.
+
+CounterRNG é um random.Random (uniform, randint, choice, shuffle... funcionam
+igual), com estado de poucos inteiros (getstate/setstate baratos para os
+snapshots). random_floats() calcula um intervalo de posições de um fluxo de
+uma vez, para avaliação vetorizada.
+"""
+import hashlib
+import random
+
+PHILOX_ROUNDS = 10
+BATCH_BLOCKS = 16  # Blocos (4 palavras de 32 bits) gerados por recarga do buffer
+
+_M0 = 0xD2511F53
+_M1 = 0xCD9E8D57
+_W0 = 0x9E3779B9
+_W1 = 0xBB67AE85
+_MASK = 0xFFFFFFFF
+_FLOAT_SCALE = 1.0 / (1 << 53)
+
+
+def philox4x32(counter, key, rounds=PHILOX_ROUNDS):
+    """
+    Bloco Philox4x32 (Salmon et al., 2011).
+
+    Args:
+        counter: 4 palavras de 32 bits
+        key: 2 palavras de 32 bits
+
+    Retorna:
+        Tupla com 4 palavras de 32 bits.
+    """
+    c0, c1, c2, c3 = counter
+    k0, k1 = key
+    for _ in range(rounds):
+        p0 = _M0 * c0
+        p1 = _M1 * c2
+        c0, c1, c2, c3 = (
+            (p1 >> 32) ^ c1 ^ k0,
+            p1 & _MASK,
+            (p0 >> 32) ^ c3 ^ k1,
+            p0 & _MASK,
+        )
+        k0 = (k0 + _W0) & _MASK
+        k1 = (k1 + _W1) & _MASK
+    return c0, c1, c2, c3
+
+
+def stream_id(*path):
+    """
+    Identificador de 128 bits de um fluxo (chave de 2 palavras e as 2 palavras
+    altas do contador), estável entre processos e execuções (ao contrário de
+    hash()). Os elementos de path devem ser int ou str.
+    """
+    text = "\x1f".join(f"{type(part).__name__}:{part}" for part in path)
+    digest = hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+    words = [int.from_bytes(digest[i : i + 4], "little") for i in range(0, 16, 4)]
+    return (words[0], words[1]), (words[2], words[3])
+
+
+def philox_blocks(stream, start, count):
+    """Palavras dos blocos start..start+count-1 de um fluxo (lista plana)."""
+    key, (high0, high1) = stream
+    words = []
+    for index in range(start, start + count):
+        words.extend(
+            philox4x32((index & _MASK, index >> 32 & _MASK, high0, high1), key)
+        )
+    return words
+
+
+def random_floats(path, start, count):
+    """
+    Floats em [0, 1) nas posições start..start+count-1 do fluxo `path` (cada
+    float usa 2 palavras, 2 floats por bloco): a posição i só depende de
+    (path, i), então lotes de qualquer tamanho e ordem dão os mesmos valores.
+    """
+    stream = stream_id(*path)
+    first_block = start // 2
+    last_block = (start + count + 1) // 2
+    words = philox_blocks(stream, first_block, last_block - first_block)
+    offset = (start % 2) * 2
+    return [
+        ((words[i] >> 5) * 67108864 + (words[i + 1] >> 6)) * _FLOAT_SCALE
+        for i in range(offset, offset + count * 2, 2)
+    ]
+
+
+class CounterRNG(random.Random):
+    """
+    random.Random sobre um fluxo Philox.
+
+    Args:
+        *path: identificação do fluxo, ex.: (semente, geração, indivíduo,
+            "enemy")
+    """
+
+    def __init__(self, *path):
+        self.path = path
+        self._stream = stream_id(*path)
+        super().__init__()
+
+    def seed(self, a=None, version=2):
+        # random.Random.__init__ chama seed(None): só volta ao início do fluxo.
+        # Uma semente explícita troca o fluxo.
+        if a is not None:
+            self.path = (a,)
+            self._stream = stream_id(a)
+        self._block = 0  # Próximo bloco a gerar
+        self._words = []
+        self._position = 0
+        self.gauss_next = None
+
+    def _next_word(self):
+        if self._position == len(self._words):
+            self._words = philox_blocks(self._stream, self._block, BATCH_BLOCKS)
+            self._block += BATCH_BLOCKS
+            self._position = 0
+        word = self._words[self._position]
+        self._position += 1
+        return word
+
+    def random(self):
+        high = self._next_word() >> 5
+        low = self._next_word() >> 6
+        return (high * 67108864 + low) * _FLOAT_SCALE
+
+    def getrandbits(self, k):
+        if k <= 32:
+            return self._next_word() >> (32 - k) if k else 0
+        value = 0
+        bits = 0
+        while bits < k:
+            value = value << 32 | self._next_word()
+            bits += 32
+        return value >> (bits - k)
+
+    def getstate(self):
+        # Palavras consumidas desde o início do fluxo (o buffer é recalculável)
+        consumed = (self._block - BATCH_BLOCKS) * 4 + self._position
+        return self._stream, max(0, consumed), self.gauss_next
+
+    def setstate(self, state):
+        self._stream, consumed, self.gauss_next = state
+        block, self._position = divmod(consumed, BATCH_BLOCKS * 4)
+        self._block = block * BATCH_BLOCKS
+        self._words = []
+        if self._position or consumed:
+            self._words = philox_blocks(self._stream, self._block, BATCH_BLOCKS)
+            self._block += BATCH_BLOCKS
@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+"""
+Seleção multiobjetivo: ordenação não-dominada rápida + distância de aglomeração.
+
+Todos os objetivos são de MAXIMIZAÇÃO. A ordenação segue o ENS-BS (Efficient
+Non-dominated Sort com busca binária): os indivíduos são percorridos em ordem
+lexicográfica decrescente, então nenhum indivíduo pode dominar um que veio
+antes dele, e a frente de cada um é encontrada por busca binária sobre as
+frentes já construídas. Com dois objetivos a checagem contra uma frente é O(1)
+(basta olhar o último membro), o que dá O(N log N) no total; com três objetivos
+cada frente mantém uma "escada" 2D ordenada e a checagem é O(log N). Acima disso
+cai na varredura dos membros da frente, ainda bem abaixo do O(M N²) do NSGA-II.
+"""
+import random
+from bisect import bisect_left
+
+INFINITY = float("inf")
+
+
+def dominates(a, b) -> bool:
+    """True se a domina b (>= em todos os objetivos e > em pelo menos um)."""
+    strictly_better = False
+    for x, y in zip(a, b):
+        if x < y:
+            return False
+        if x > y:
+            strictly_better = True
+    return strictly_better
+
+
+def fast_non_dominated_sort(objectives) -> list:
+    """
+    Separa a população em frentes de Pareto.
+
+    Args:
+        objectives: sequência de tuplas (um valor por objetivo, maximização)
+
+    Retorna:
+        Lista de frentes; cada frente é uma lista de índices em objectives.
+    """
+    if not objectives:
+        return []
+
+    order = sorted(
+        range(len(objectives)), key=lambda i: objectives[i], reverse=True
+    )
+    n_objectives = len(objectives[0])
+    fronts = []
+    staircases = []  # Só usadas com três objetivos
+
+    for index in order:
+        point = objectives[index]
+
+        if n_objectives == 2:
+            # Em ordem lexicográfica decrescente, os membros de uma frente têm o
+            # 2º objetivo crescente: basta comparar com o último adicionado.
+            def dominated_by(k, point=point):
+                return dominates(objectives[fronts[k][-1]], point)
+
+        elif n_objectives == 3:
+
+            def dominated_by(k, point=point):
+                return staircases[k].dominates(point)
+
+        else:
+
+            def dominated_by(k, point=point):
+                # Membros recentes são os mais parecidos com o ponto atual
+                for member in reversed(fronts[k]):
+                    if dominates(objectives[member], point):
+                        return True
+                return False
+
+        low, high = 0, len(fronts)
+        while low < high:
+            middle = (low + high) // 2
+            if dominated_by(middle):
+                low = middle + 1
+            else:
+                high = middle
+
+        if low == len(fronts):
+            fronts.append([])
+            if n_objectives == 3:
+                staircases.append(_Staircase())
+        fronts[low].append(index)
+        if n_objectives == 3:
+            staircases[low].insert(point)
+
+    return fronts
+
+
+class _Staircase:
+    """
+    Conjunto Pareto-máximo 2D (2º e 3º objetivos) dos membros de uma frente.
+
+    Como os pontos chegam em ordem decrescente do 1º objetivo, um membro domina
+    o ponto consultado se e só se o domina nos outros dois objetivos (salvo
+    quando os vetores são idênticos). Os degraus ficam ordenados pelo 2º
+    objetivo crescente, com o 3º estritamente decrescente.
+    """
+
+    def __init__(self):
+        self.keys = []  # 2º objetivo (crescente)
+        self.points = []
+
+    def dominates(self, point) -> bool:
+        i = bisect_left(self.keys, point[1])
+        if i == len(self.keys):
+            return False
+        step = self.points[i]
+        return step[2] >= point[2] and step != point
+
+    def insert(self, point):
+        i = bisect_left(self.keys, point[1])
+        if i < len(self.keys) and self.points[i][1:] == point[1:]:
+            # Mesmo degrau: o representante existente tem 1º objetivo >=
+            return
+        # Remove os degraus que o novo ponto domina em 2D (à esquerda)
+        start = i
+        while start > 0 and self.points[start - 1][2] <= point[2]:
+            start -= 1
+        self.keys[start:i] = [point[1]]
+        self.points[start:i] = [point]
+
+
+def crowding_distance(objectives, front) -> dict:
+    """Distância de aglomeração dos membros de uma frente (extremos = infinito)."""
+    distances = {index: 0.0 for index in front}
+    if len(front) <= 2:
+        for index in front:
+            distances[index] = INFINITY
+        return distances
+
+    for m in range(len(objectives[front[0]])):
+        ordered = sorted(front, key=lambda i: objectives[i][m])
+        low = objectives[ordered[0]][m]
+        high = objectives[ordered[-1]][m]
+        distances[ordered[0]] = INFINITY
+        distances[ordered[-1]] = INFINITY
+        if high == low:
+            continue
+        span = high - low
+        for k in range(1, len(ordered) - 1):
+            if distances[ordered[k]] != INFINITY:
+                distances[ordered[k]] += (
+                    objectives[ordered[k + 1]][m] - objectives[ordered[k - 1]][m]
+                ) / span
+
+    return distances
+
+
+def rank_population(objectives):
+    """
+    Calcula o rank de Pareto (0 = frente não-dominada) e a distância de
+    aglomeração de cada indivíduo.
+
+    Retorna:
+        (ranks, crowding) — duas listas alinhadas com objectives.
+    """
+    ranks = [0] * len(objectives)
+    crowding = [0.0] * len(objectives)
+    for rank, front in enumerate(fast_non_dominated_sort(objectives)):
+        for index, distance in crowding_distance(objectives, front).items():
+            ranks[index] = rank
+            crowding[index] = distance
+    return ranks, crowding
+
+
+def crowded_tournament(ranks, crowding, rng=random) -> int:
+    """Torneio binário pelo operador de comparação aglomerada do NSGA-II."""
+    a = rng.randrange(len(ranks))
+    b = rng.randrange(len(ranks))
+    if ranks[a] != ranks[b]:
+        return a if ranks[a] < ranks[b] else b
+    return a if crowding[a] >= crowding[b] else b
@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+"""
+Estatísticas incrementais da evolução.
+
+Substitui a varredura de fitness_history a cada geração (e a cada frame do
+resumo): cada geração é registrada uma única vez e todo o estado derivado
+(médias, variâncias, janela móvel, estagnação) é atualizado em O(1) amortizado.
+O histórico fica em deques de tamanho fixo, então a memória não cresce em
+treinos muito longos.
+"""
+import math
+from collections import deque
+
+FITNESS_PERCENTILES = (10, 25, 50, 75, 90)
+
+
+def percentile(sorted_values, p):
+    """Percentil p (0-100) com interpolação linear de uma lista já ordenada."""
+    if not sorted_values:
+        return 0.0
+    position = (len(sorted_values) - 1) * p / 100.0
+    low = math.floor(position)
+    high = math.ceil(position)
+    if low == high:
+        return sorted_values[low]
+    fraction = position - low
+    return sorted_values[low] * (1 - fraction) + sorted_values[high] * fraction
+
+
+class EvolutionStats:
+    """
+    Estado estatístico da evolução, compartilhado pela lógica de evolução e pela UI.
+
+    Atributos principais (válidos após a primeira geração):
+        generation: gerações registradas
+        best_ever: maior fitness já observado
+        best_mean / best_variance: média e variância (Welford) do melhor fitness
+            por geração, desde o início
+        window_mean / window_variance: idem, só nas últimas `window` gerações
+        is_stagnating: critério do choque genético (melhor fitness das últimas
+            N gerações não supera o da geração anterior a elas)
+        fitness_percentiles: percentis do fitness da população na última geração
+        population_mean: fitness médio da população na última geração
+        trait_diversity: desvio padrão de cada traço na última geração
+        history: resumos por geração (limitado a history_size)
+    """
+
+    def __init__(self, stagnation_threshold=3, window=20, history_size=1000):
+        self.stagnation_threshold = stagnation_threshold
+        self.generation = 0
+        self.best_ever = -math.inf
+
+        # Welford sobre o melhor fitness de cada geração
+        self.best_mean = 0.0
+        self._best_m2 = 0.0
+
+        # Janela móvel (somas mantidas incrementalmente)
+        self._window = deque(maxlen=window)
+        self._window_sum = 0.0
+        self._window_sum_sq = 0.0
+
+        # Melhor fitness por geração, limitado; base para reconstruir a janela
+        # de estagnação caso o limiar mude durante a execução
+        self.best_history = deque(maxlen=max(history_size, stagnation_threshold + 1))
+        self.history = deque(maxlen=history_size)
+
+        # Máximo deslizante das últimas N gerações (deque monotônico)
+        self._max_window = deque()
+        self.is_stagnating = False
+
+        self.population_mean = 0.0
+        self.fitness_percentiles = {}
+        self.trait_diversity = {}
+
+    @property
+    def best_variance(self):
+        return self._best_m2 / self.generation if self.generation > 1 else 0.0
+
+    @property
+    def window_mean(self):
+        return self._window_sum / len(self._window) if self._window else 0.0
+
+    @property
+    def window_variance(self):
+        n = len(self._window)
+        if n < 2:
+            return 0.0
+        mean = self._window_sum / n
+        return max(0.0, self._window_sum_sq / n - mean * mean)
+
+    def record_generation(self, fitness_scores, traits_list, stagnation_threshold=None):
+        """
+        Registra uma geração e atualiza todo o estado derivado.
+
+        Args:
+            fitness_scores: fitness final de cada indivíduo
+            traits_list: traços de cada indivíduo (mesma ordem)
+            stagnation_threshold: limiar atual (pode mudar entre gerações)
+
+        Retorna:
+            True se a população está estagnada (choque genético).
+        """
+        best = max(fitness_scores)
+        self.generation += 1
+        self.best_ever = max(self.best_ever, best)
+
+        delta = best - self.best_mean
+        self.best_mean += delta / self.generation
+        self._best_m2 += delta * (best - self.best_mean)
+
+        if len(self._window) == self._window.maxlen:
+            oldest = self._window[0]
+            self._window_sum -= oldest
+            self._window_sum_sq -= oldest * oldest
+        self._window.append(best)
+        self._window_sum += best
+        self._window_sum_sq += best * best
+
+        self.best_history.append(best)
+        self._update_stagnation(best, stagnation_threshold)
+
+        ordered = sorted(fitness_scores)
+        self.population_mean = sum(ordered) / len(ordered)
+        self.fitness_percentiles = {
+            p: percentile(ordered, p) for p in FITNESS_PERCENTILES
+        }
+        self.trait_diversity = self._trait_diversity(traits_list)
+
+        self.history.append(
+            {
+                "generation": self.generation,
+                "best": best,
+                "mean": self.population_mean,
+                "percentiles": self.fitness_percentiles,
+                "diversity": self.trait_diversity,
+                "stagnating": self.is_stagnating,
+            }
+        )
+        return self.is_stagnating
+
+    def _update_stagnation(self, best, stagnation_threshold):
+        """Atualiza o máximo deslizante das últimas N gerações e a estagnação."""
+        if (
+            stagnation_threshold is not None
+            and stagnation_threshold != self.stagnation_threshold
+        ):
+            self.stagnation_threshold = stagnation_threshold
+            if self.best_history.maxlen < stagnation_threshold + 1:
+                # A comparação precisa de N + 1 gerações: o histórico cresce (as
+                # que já saíram não voltam, a estagnação espera novas gerações)
+                self.best_history = deque(
+                    self.best_history, maxlen=stagnation_threshold + 1
+                )
+            self._rebuild_max_window()
+        else:
+            self._push_max_window(self.generation, best)
+
+        n = self.stagnation_threshold
+        if self.generation < n + 1 or len(self.best_history) < n + 1:
+            self.is_stagnating = False
+            return
+
+        reference = self.best_history[-n - 1]
+        self.is_stagnating = self._max_window[0][1] <= reference
+
+    def _push_max_window(self, generation, value):
+        window = self._max_window
+        while window and window[-1][1] <= value:
+            window.pop()
+        window.append((generation, value))
+        while window[0][0] <= generation - self.stagnation_threshold:
+            window.popleft()
+
+    def _rebuild_max_window(self):
+        self._max_window.clear()
+        n = min(self.stagnation_threshold, len(self.best_history))
+        first_generation = self.generation - n + 1
+        for offset in range(n):
+            self._push_max_window(
+                first_generation + offset, self.best_history[-n + offset]
+            )
+
+    @staticmethod
+    def _trait_diversity(traits_list):
+        """Desvio padrão populacional de cada traço numérico."""
+        sums = {}
+        sums_sq = {}
+        for traits in traits_list:
+            for key, value in traits.items():
+                if isinstance(value, (int, float)):
+                    sums[key] = sums.get(key, 0.0) + value
+                    sums_sq[key] = sums_sq.get(key, 0.0) + value * value
+        n = len(traits_list)
+        return {
+            key: math.sqrt(max(0.0, sums_sq[key] / n - (sums[key] / n) ** 2))
+            for key in sums
+        }
@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+"""
+Atlas de texturas: empacotamento das imagens do jogo e carga única em tempo
+de execução.
+
+Etapa de build (python -m render.atlas): reúne as imagens que o jogo usa
+(sprites dos inimigos e do player, tilesets e camadas de imagem dos mapas de
+MAP_NAMES), empacota-as em poucas páginas PNG (prateleiras, maiores primeiro) e
+grava um manifesto JSON com a região de cada imagem e o hash, o mtime e o
+tamanho do arquivo de origem.
+
+Em tempo de execução, install_atlas() abre cada página uma vez e registra cada
+região no cache de imagens padrão do arcade sob o caminho da imagem de origem:
+tiles, camadas de imagem e sprites passam a ser recortes das páginas, sem abrir
+nem decodificar os PNGs originais (de cada um só se consulta o mtime e o
+tamanho; o hash é recalculado apenas se eles mudaram, como em world/cache.py).
+Uma região cuja origem mudou depois do build é ignorada (a imagem é lida do
+arquivo, como sem atlas).
+
+get_texture() devolve a Texture de uma imagem, criada uma vez por processo:
+arcade.Sprite(caminho) decodifica o arquivo a cada sprite, o que pesava em cada
+geração nova de inimigos. No desenho, todas as SpriteLists já compartilham o
+atlas de GPU padrão do arcade (uma chamada de desenho por lista).
+"""
+import argparse
+import hashlib
+import json
+import os
+import xml.etree.ElementTree as ET
+
+import arcade
+from arcade.texture import ImageData, Texture, default_texture_cache
+from PIL import Image
+
+ATLAS_MANIFEST = "assets/atlas/atlas.json"
+ATLAS_PAGE_SIZE = 2048  # Lado máximo de uma página, em pixels
+ATLAS_PADDING = 1  # Pixels vazios entre regiões
+MANIFEST_VERSION = 1
+
+_textures = {}  # Origem -> Texture (ver get_texture)
+_installed = set()  # Manifestos já instalados neste processo
+
+
+def _file_hash(path):
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def _cache_name(source):
+    """Nome da imagem no cache do arcade (o mesmo que o carregador de mapas usa)."""
+    return Texture.create_image_cache_name(arcade.resources.resolve(source))
+
+
+def map_images(tmx_path) -> list:
+    """Imagens usadas por um mapa: tilesets (inclusive .tsx) e camadas de imagem."""
+    directory = os.path.dirname(tmx_path)
+    root = ET.parse(tmx_path).getroot()
+    images = []
+    for tileset in root.iter("tileset"):
+        base = directory
+        if tileset.get("source"):
+            tsx_path = os.path.join(directory, tileset.get("source"))
+            tileset = ET.parse(tsx_path).getroot()
+            base = os.path.dirname(tsx_path)
+        for image in tileset.iter("image"):
+            images.append(os.path.normpath(os.path.join(base, image.get("source"))))
+    for layer in root.iter("imagelayer"):
+        image = layer.find("image")
+        if image is not None and image.get("source"):
+            images.append(
+                os.path.normpath(os.path.join(directory, image.get("source")))
+            )
+    return images
+
+
+def game_images(game_module) -> list:
+    """Todas as imagens do jogo, sem repetições, na ordem em que aparecem."""
+    sources = list(game_module.ENEMY_SPRITES_MAP.values())
+    sources.append(game_module.PLAYER_IDLE_SPRITE)
+    for map_name in game_module.MAP_NAMES:
+        sources.extend(map_images(map_name))
+    return list(dict.fromkeys(sources))
+
+
+def pack(sizes, page_size=ATLAS_PAGE_SIZE, padding=ATLAS_PADDING) -> list:
+    """
+    Empacotamento em prateleiras: as imagens, da mais alta para a mais baixa,
+    ocupam linhas da esquerda para a direita; uma linha cheia abre outra abaixo
+    e uma página cheia abre outra página.
+
+    Args:
+        sizes: lista de (largura, altura)
+
+    Retorna:
+        Lista alinhada com sizes de (página, x, y).
+    """
+    order = sorted(range(len(sizes)), key=lambda i: (-sizes[i][1], -sizes[i][0]))
+    placements = [None] * len(sizes)
+    page = x = y = shelf_height = 0
+    for index in order:
+        width, height = sizes[index]
+        if width > page_size or height > page_size:
+            raise ValueError(
+                f"Imagem de {width}x{height} não cabe numa página de {page_size}px"
+            )
+        if x + width > page_size:
+            x = 0
+            y += shelf_height + padding
+            shelf_height = 0
+        if y + height > page_size:
+            page += 1
+            x = y = shelf_height = 0
+        placements[index] = (page, x, y)
+        x += width + padding
+        shelf_height = max(shelf_height, height)
+    return placements
+
+
+def build_atlas(sources, manifest_path=ATLAS_MANIFEST, page_size=ATLAS_PAGE_SIZE):
+    """
+    Empacota as imagens de sources e grava as páginas e o manifesto.
+
+    Retorna:
+        O manifesto gravado (dict).
+    """
+    images = []
+    for source in sources:
+        image = Image.open(arcade.resources.resolve(source))
+        images.append(image.convert("RGBA") if image.mode != "RGBA" else image)
+    placements = pack([image.size for image in images], page_size)
+
+    page_count = max((page for page, _, _ in placements), default=-1) + 1
+    used = [[0, 0] for _ in range(page_count)]
+    for image, (page, x, y) in zip(images, placements):
+        used[page][0] = max(used[page][0], x + image.width)
+        used[page][1] = max(used[page][1], y + image.height)
+    pages = [Image.new("RGBA", tuple(size), (0, 0, 0, 0)) for size in used]
+
+    regions = {}
+    for source, image, (page, x, y) in zip(sources, images, placements):
+        pages[page].paste(image, (x, y))
+        stat = os.stat(arcade.resources.resolve(source))
+        regions[source] = {
+            "page": page,
+            "x": x,
+            "y": y,
+            "width": image.width,
+            "height": image.height,
+            "sha1": _file_hash(arcade.resources.resolve(source)),
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+        }
+
+    directory = os.path.dirname(manifest_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    stem = os.path.splitext(os.path.basename(manifest_path))[0]
+    page_files = []
+    for number, page in enumerate(pages):
+        page_file = f"{stem}-{number}.png"
+        page.save(os.path.join(directory, page_file), optimize=True)
+        page_files.append(page_file)
+
+    manifest = {"version": MANIFEST_VERSION, "pages": page_files, "regions": regions}
+    temporary = f"{manifest_path}.tmp"
+    with open(temporary, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(temporary, manifest_path)
+    return manifest
+
+
+def _unchanged(path, region) -> bool:
+    """
+    A origem ainda é a do build? Mesmo mtime e tamanho bastam; senão (arquivo
+    tocado, copiado ou manifesto sem esses campos) decide o hash.
+    """
+    stat = os.stat(path)
+    if (stat.st_mtime_ns, stat.st_size) == (region.get("mtime_ns"), region.get("size")):
+        return True
+    return _file_hash(path) == region["sha1"]
+
+
+def install_atlas(manifest_path=ATLAS_MANIFEST) -> int:
+    """
+    Registra as regiões do atlas no cache de imagens do arcade (uma vez por
+    processo). Sem manifesto, não faz nada.
+
+    Retorna:
+        Quantas imagens passaram a vir do atlas.
+    """
+    if manifest_path in _installed or not os.path.exists(manifest_path):
+        return 0
+    _installed.add(manifest_path)
+    with open(manifest_path, encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("version") != MANIFEST_VERSION:
+        print(f"Atlas {manifest_path} de outra versão; rode python -m render.atlas")
+        return 0
+
+    directory = os.path.dirname(manifest_path)
+    pages = [
+        Image.open(os.path.join(directory, page)).convert("RGBA")
+        for page in manifest["pages"]
+    ]
+    image_cache = default_texture_cache.image_data_cache
+    installed = 0
+    for source, region in manifest["regions"].items():
+        try:
+            if not _unchanged(arcade.resources.resolve(source), region):
+                print(f"Atlas desatualizado para {source}; usando o arquivo")
+                continue
+        except OSError:
+            continue  # Origem ausente: o carregador não a pediria pelo caminho
+        x, y = region["x"], region["y"]
+        image = pages[region["page"]].crop(
+            (x, y, x + region["width"], y + region["height"])
+        )
+        image_cache.put(_cache_name(source), ImageData(image))
+        _textures.pop(source, None)
+        installed += 1
+    return installed
+
+
+def get_texture(source) -> Texture:
+    """Texture da imagem source, criada uma vez por processo (do atlas, se houver)."""
+    texture = _textures.get(source)
+    if texture is None:
+        texture = default_texture_cache.load_or_get_texture(source)
+        _textures[source] = texture
+    return texture
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--out", default=ATLAS_MANIFEST, help="Manifesto gerado")
+    parser.add_argument("--page-size", type=int, default=ATLAS_PAGE_SIZE)
+    args = parser.parse_args()
+
+    import teste  # Aqui e não no topo: teste.py importa este módulo
+
+    sources = game_images(teste)
+    manifest = build_atlas(sources, args.out, args.page_size)
+    print(
+        f"Atlas: {len(manifest['regions'])} imagens em "
+        f"{len(manifest['pages'])} página(s) -> {args.out}"
+    )
+
+
+if __name__ == "__main__":
+    main()
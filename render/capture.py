@@ -0,0 +1,325 @@
+# -*- coding: utf-8 -*-
+"""
+Captura de tela e gravação de vídeo sem travar o desenho.
+
+Ler a tela com glReadPixels para a memória do programa espera a GPU terminar o
+frame, e codificar um PNG custa dezenas de milissegundos: feito dentro do
+on_draw, cada captura viraria um frame perdido. Aqui cada etapa sai do caminho
+do frame:
+
+1. on_frame() (fim do on_draw) pede a leitura para um pixel buffer object
+   (PBO) de um anel de READBACK_SLOTS e marca uma fence: a cópia acontece na
+   GPU, sem esperar;
+2. nos frames seguintes, as leituras cuja fence já sinalizou são copiadas do
+   PBO mapeado para um slot livre de um bloco de memória compartilhada (um
+   memmove, a única cópia no processo do jogo);
+3. o processo codificador (render/encoder.py, prioridade reduzida) recebe só o
+   número do slot, grava o PNG ou passa o quadro ao ffmpeg e devolve o slot.
+
+Pressão de retorno: sem PBO livre (GPU atrasada) ou sem slot livre
+(codificador atrasado), o quadro é descartado e contado; o jogo nunca espera.
+O processo codificador só sobe na primeira captura.
+
+Uso (MyGame):
+    capture = FrameCapture()
+    capture.screenshot()                    # próximo frame vira um PNG
+    capture.start_recording()               # um quadro a cada CAPTURE_EVERY
+    capture.on_frame(window)                # no fim de cada on_draw
+    capture.close()
+"""
+import ctypes
+import json
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+from multiprocessing import shared_memory
+
+from pyglet import gl
+
+from diagnostics import events
+
+CAPTURE_DIRECTORY = "captures"
+CAPTURE_EVERY = 2  # Grava um a cada N frames desenhados
+CAPTURE_FPS = 30  # Taxa do vídeo (60 frames desenhados / CAPTURE_EVERY)
+READBACK_SLOTS = 3  # Leituras em voo na GPU
+POOL_SLOTS = 8  # Quadros esperando o codificador
+ENCODER_NICENESS = 10  # Prioridade reduzida do processo codificador
+
+_PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_BYTES_PER_PIXEL = 4  # RGBA: o formato de leitura mais rápido na maioria dos drivers
+
+
+class FrameCapture:
+    """
+    Capturas de tela e gravação da janela, com leitura assíncrona e
+    codificação em outro processo.
+
+    Args:
+        directory: pasta dos PNGs, das sequências e dos vídeos
+        every: na gravação, captura um a cada `every` frames
+        video: grava MP4 pelo ffmpeg; sem ffmpeg no PATH (ou False), grava uma
+            sequência de PNGs
+        fps: taxa do vídeo
+        readback_slots, pool_slots: tamanhos do anel de PBOs e do pool de
+            quadros
+    """
+
+    def __init__(
+        self,
+        directory=CAPTURE_DIRECTORY,
+        every=CAPTURE_EVERY,
+        video=True,
+        fps=CAPTURE_FPS,
+        readback_slots=READBACK_SLOTS,
+        pool_slots=POOL_SLOTS,
+    ):
+        self.directory = directory
+        self.every = max(1, every)
+        self.video = video and shutil.which("ffmpeg") is not None
+        self.fps = fps
+        self.readback_slots = readback_slots
+        self.pool_slots = pool_slots
+
+        self.size = None  # (largura, altura) dos buffers alocados
+        self.slot_size = 0
+        self.pbos = []
+        self.free_pbos = deque()
+        self.pending = deque()  # Leituras em voo: (pbo, fence, destino, tamanho)
+        self.block = None
+        self.free_slots = deque()
+        self.process = None
+
+        self.recording = None  # Destino da gravação atual (.mp4 ou pasta)
+        self.recording_size = None
+        self.recordings = 0
+        self.frame = 0
+        self.captured = 0
+        self.dropped = 0
+        self.screenshot_requested = False
+        self.closed = False
+
+    @property
+    def active(self) -> bool:
+        if self.closed:
+            return False
+        return bool(self.recording or self.screenshot_requested or self.pending)
+
+    def screenshot(self):
+        """O próximo frame desenhado vira um PNG em directory."""
+        self.screenshot_requested = True
+
+    def start_recording(self):
+        """Começa a gravar (um vídeo ou uma pasta de PNGs com data e hora)."""
+        if self.recording or self.closed:
+            return
+        # O número distingue gravações reiniciadas no mesmo segundo
+        self.recordings += 1
+        name = time.strftime(f"session-%Y%m%d-%H%M%S-{self.recordings}")
+        os.makedirs(self.directory, exist_ok=True)
+        if self.video:
+            self.recording = os.path.join(self.directory, f"{name}.mp4")
+        else:
+            self.recording = os.path.join(self.directory, name)
+            os.makedirs(self.recording, exist_ok=True)
+        self.recording_size = None
+        self.frame = self.captured = self.dropped = 0
+        events.emit("capture", "Gravando em {path}", path=self.recording)
+
+    def stop_recording(self):
+        """Encerra a gravação; os quadros já lidos ainda são codificados."""
+        if not self.recording:
+            return
+        path, self.recording = self.recording, None
+        self._collect(wait=True)
+        if path.endswith(".mp4") and self.process is not None:
+            self._send(["end", path])
+        events.emit(
+            "capture",
+            "Gravação encerrada: {captured} quadros, {dropped} descartados -> {path}",
+            captured=self.captured,
+            dropped=self.dropped,
+            path=path,
+        )
+
+    def on_frame(self, window):
+        """
+        Chamado no fim de cada on_draw. Recolhe as leituras prontas e pede a
+        deste frame, se houver captura.
+        """
+        if not self.active:
+            return
+        self._collect()
+        width, height = window.get_framebuffer_size()
+
+        with window.ctx.screen.activate():
+            if self.screenshot_requested:
+                self.screenshot_requested = False
+                os.makedirs(self.directory, exist_ok=True)
+                stamp = time.strftime("%Y%m%d-%H%M%S")
+                name = f"screenshot-{stamp}-{self.frame}.png"
+                self._read(width, height, os.path.join(self.directory, name))
+
+            if self.recording and self.recording_size not in (None, (width, height)):
+                # Um vídeo tem tamanho fixo: janela redimensionada, arquivo novo
+                self.stop_recording()
+                self.start_recording()
+            if self.recording:
+                if self.frame % self.every == 0:
+                    self.recording_size = (width, height)
+                    if self.video:
+                        path = self.recording
+                    else:
+                        name = f"frame-{self.frame // self.every:06d}.png"
+                        path = os.path.join(self.recording, name)
+                    self._read(width, height, path)
+                self.frame += 1
+
+    def _allocate(self, width, height):
+        """(Re)cria PBOs e o bloco compartilhado para quadros de width x height."""
+        self._collect(wait=True)
+        self._release_buffers()
+        frame_bytes = width * height * _BYTES_PER_PIXEL
+        self.slot_size = frame_bytes
+
+        buffers = (gl.GLuint * self.readback_slots)()
+        gl.glGenBuffers(self.readback_slots, buffers)
+        for pbo in buffers:
+            gl.glBindBuffer(gl.GL_PIXEL_PACK_BUFFER, pbo)
+            gl.glBufferData(
+                gl.GL_PIXEL_PACK_BUFFER, frame_bytes, None, gl.GL_STREAM_READ
+            )
+        gl.glBindBuffer(gl.GL_PIXEL_PACK_BUFFER, 0)
+        self.pbos = list(buffers)
+        self.free_pbos = deque(self.pbos)
+
+        self.block = shared_memory.SharedMemory(
+            create=True, size=frame_bytes * self.pool_slots
+        )
+        self.free_slots = deque(range(self.pool_slots))
+        self.process = subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "render.encoder",
+                self.block.name,
+                str(frame_bytes),
+                str(self.fps),
+                str(ENCODER_NICENESS),
+            ],
+            cwd=_PACKAGE_ROOT,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+        # Os slots devolvidos voltam ao pool por uma thread que só espera na
+        # saída do codificador (deque.append é atômico)
+        threading.Thread(
+            target=self._receive_slots,
+            args=(self.process.stdout, self.free_slots),
+            name="capture-slots",
+            daemon=True,
+        ).start()
+        self.size = (width, height)
+
+    @staticmethod
+    def _receive_slots(output, free_slots):
+        for line in output:
+            free_slots.append(int(line))
+
+    def _send(self, job):
+        self.process.stdin.write(json.dumps(job) + "\n")
+        self.process.stdin.flush()
+
+    def _read(self, width, height, path):
+        """Pede a leitura do framebuffer para um PBO livre (ou descarta o quadro)."""
+        if self.size != (width, height):
+            self._allocate(width, height)
+        if not self.free_pbos:
+            self.dropped += 1
+            return
+        pbo = self.free_pbos.popleft()
+        gl.glBindBuffer(gl.GL_PIXEL_PACK_BUFFER, pbo)
+        gl.glPixelStorei(gl.GL_PACK_ALIGNMENT, 1)
+        gl.glReadPixels(0, 0, width, height, gl.GL_RGBA, gl.GL_UNSIGNED_BYTE, 0)
+        gl.glBindBuffer(gl.GL_PIXEL_PACK_BUFFER, 0)
+        fence = gl.glFenceSync(gl.GL_SYNC_GPU_COMMANDS_COMPLETE, 0)
+        self.pending.append((pbo, fence, path, (width, height)))
+
+    def _collect(self, wait=False):
+        """
+        Passa ao codificador as leituras já concluídas pela GPU, em ordem.
+        Com wait=True espera todas (fim da gravação, realocação).
+        """
+        while self.pending:
+            pbo, fence, path, (width, height) = self.pending[0]
+            if wait:
+                flags, timeout = gl.GL_SYNC_FLUSH_COMMANDS_BIT, 1_000_000_000
+            else:
+                flags, timeout = 0, 0
+            status = gl.glClientWaitSync(fence, flags, timeout)
+            if status not in (gl.GL_ALREADY_SIGNALED, gl.GL_CONDITION_SATISFIED):
+                break
+            gl.glDeleteSync(fence)
+            self.pending.popleft()
+            self.free_pbos.append(pbo)
+
+            while wait and not self.free_slots and self.process.poll() is None:
+                # Fim da gravação: espera o codificador liberar um slot
+                time.sleep(0.001)
+            if not self.free_slots:
+                self.dropped += 1
+                continue
+            slot = self.free_slots.popleft()
+            size = width * height * _BYTES_PER_PIXEL
+            gl.glBindBuffer(gl.GL_PIXEL_PACK_BUFFER, pbo)
+            pointer = gl.glMapBufferRange(
+                gl.GL_PIXEL_PACK_BUFFER, 0, size, gl.GL_MAP_READ_BIT
+            )
+            target = (ctypes.c_char * size).from_buffer(
+                self.block.buf, slot * self.slot_size
+            )
+            ctypes.memmove(target, pointer, size)
+            del target
+            gl.glUnmapBuffer(gl.GL_PIXEL_PACK_BUFFER)
+            gl.glBindBuffer(gl.GL_PIXEL_PACK_BUFFER, 0)
+            self._send([slot, width, height, os.path.abspath(path)])
+            self.captured += 1
+
+    def _release_buffers(self):
+        try:
+            if self.pbos:
+                buffers = (gl.GLuint * len(self.pbos))(*self.pbos)
+                gl.glDeleteBuffers(len(self.pbos), buffers)
+        finally:
+            # O processo e o bloco saem mesmo se o OpenGL falhar
+            self.pbos = []
+            self.free_pbos.clear()
+            self.pending.clear()
+            if self.process is not None:
+                self.process.stdin.close()
+                self.process.wait()
+                self.process = None
+            if self.block is not None:
+                self.block.close()
+                self.block.unlink()
+                self.block = None
+            self.size = None
+
+    def close(self):
+        """
+        Encerra a gravação, espera o codificador terminar e libera tudo. Precisa
+        do contexto OpenGL: chame antes de a janela fechar (MyGame.on_close).
+        Chamadas seguintes não fazem nada.
+        """
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            self.stop_recording()
+            self._collect(wait=True)
+        finally:
+            self._release_buffers()
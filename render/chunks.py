@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""
+Camadas estáticas em blocos (chunks) com recorte pela câmera.
+
+Desenhar a ground_list inteira a cada frame custa proporcionalmente ao tamanho
+do nível, mas com CAMERA_ZOOM a câmera mostra só uma janela pequena do mapa.
+ChunkedLayer divide os sprites de uma camada estática em blocos de
+CHUNK_SIZE x CHUNK_SIZE pixels, uma SpriteList por bloco (a geometria sobe para
+a GPU uma vez, no primeiro desenho), e a cada frame só os blocos que cruzam a
+vista da câmera são desenhados: o custo depende do tamanho da tela e do zoom,
+não do nível.
+
+Um sprite entra no bloco do seu centro; cada bloco guarda a caixa que cobre
+todos os seus sprites, então um sprite maior que o bloco (ex.: uma imagem de
+fundo) nunca é recortado por engano.
+"""
+import arcade
+
+CHUNK_SIZE = 512  # Lado de um bloco, em pixels
+
+
+def camera_view(camera) -> tuple:
+    """Retângulo do mundo visível numa Camera2D: (left, bottom, right, top)."""
+    x, y = camera.position
+    return x + camera.left, y + camera.bottom, x + camera.right, y + camera.top
+
+
+class ChunkedLayer:
+    """
+    Sprites estáticos de uma camada, agrupados em blocos.
+
+    Args:
+        sprites: sprites da camada (a ordem de desenho é mantida dentro de
+            cada bloco)
+        chunk_size: lado do bloco em pixels
+    """
+
+    def __init__(self, sprites, chunk_size=CHUNK_SIZE):
+        self.chunk_size = chunk_size
+        self.chunks = {}  # (cx, cy) -> [SpriteList, left, bottom, right, top]
+        for sprite in sprites:
+            key = (
+                int(sprite.center_x // chunk_size),
+                int(sprite.center_y // chunk_size),
+            )
+            chunk = self.chunks.get(key)
+            if chunk is None:
+                chunk = [
+                    arcade.SpriteList(lazy=True),
+                    sprite.left,
+                    sprite.bottom,
+                    sprite.right,
+                    sprite.top,
+                ]
+                self.chunks[key] = chunk
+            chunk[0].append(sprite)
+            chunk[1] = min(chunk[1], sprite.left)
+            chunk[2] = min(chunk[2], sprite.bottom)
+            chunk[3] = max(chunk[3], sprite.right)
+            chunk[4] = max(chunk[4], sprite.top)
+
+        # Quanto um bloco pode passar das bordas da sua célula (sprites grandes)
+        self.margin = 0
+        for (cx, cy), (_, left, bottom, right, top) in self.chunks.items():
+            self.margin = max(
+                self.margin,
+                cx * chunk_size - left,
+                cy * chunk_size - bottom,
+                right - (cx + 1) * chunk_size,
+                top - (cy + 1) * chunk_size,
+            )
+        self.drawn_chunks = 0  # Blocos desenhados no último draw()
+
+    def __len__(self):
+        return len(self.chunks)
+
+    def visible(self, left, bottom, right, top) -> list:
+        """SpriteLists dos blocos que cruzam o retângulo, na ordem da grade."""
+        size = self.chunk_size
+        margin = self.margin
+        chunks = self.chunks
+        visible = []
+        first_x, last_x = int((left - margin) // size), int((right + margin) // size)
+        first_y, last_y = int((bottom - margin) // size), int((top + margin) // size)
+        for cy in range(first_y, last_y + 1):
+            for cx in range(first_x, last_x + 1):
+                chunk = chunks.get((cx, cy))
+                if (
+                    chunk is not None
+                    and chunk[1] < right
+                    and chunk[3] > left
+                    and chunk[2] < top
+                    and chunk[4] > bottom
+                ):
+                    visible.append(chunk[0])
+        return visible
+
+    def draw(self, view):
+        """Desenha os blocos que cruzam view (left, bottom, right, top)."""
+        visible = self.visible(*view)
+        for sprite_list in visible:
+            sprite_list.draw()
+        self.drawn_chunks = len(visible)
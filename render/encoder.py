@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""
+Processo codificador da captura de tela (ver render/capture.py).
+
+Roda em um processo separado, com prioridade reduzida: a compressão de PNG e
+a escrita do vídeo nunca disputam o GIL nem (num processador ocupado) a CPU
+com o jogo. Os quadros chegam num bloco de memória compartilhada dividido em
+slots; pela entrada padrão chega só (slot, largura, altura, destino) e,
+depois de codificado, o número do slot volta livre pela saída padrão.
+
+Roda com python -m render.encoder, e não com multiprocessing: o spawn
+reimportaria o módulo principal (teste.py, com arcade e a janela) no filho.
+Este módulo não importa arcade nem OpenGL: o processo sobe rápido.
+"""
+import json
+import os
+import subprocess
+import sys
+from multiprocessing import resource_tracker, shared_memory
+
+from PIL import Image
+
+PNG_COMPRESS_LEVEL = 1  # Compressão rápida; os PNGs ficam maiores
+
+
+def video_command(path, width, height, fps) -> list:
+    """Linha de comando do ffmpeg: quadros RGBA crus (de baixo para cima) -> MP4."""
+    return [
+        "ffmpeg",
+        "-y",
+        "-loglevel",
+        "error",
+        "-f",
+        "rawvideo",
+        "-pix_fmt",
+        "rgba",
+        "-s",
+        f"{width}x{height}",
+        "-r",
+        str(fps),
+        "-i",
+        "-",
+        "-vf",
+        "vflip",
+        "-c:v",
+        "libx264",
+        "-preset",
+        "veryfast",
+        "-pix_fmt",
+        "yuv420p",
+        path,
+    ]
+
+
+def save_png(pixels, width, height, path):
+    """Grava um quadro RGBA lido do OpenGL (linhas de baixo para cima) em PNG."""
+    # Passo de linha negativo: o PIL inverte a imagem ao ler o buffer
+    image = Image.frombuffer("RGBA", (width, height), pixels, "raw", "RGBA", 0, -1)
+    image.convert("RGB").save(path, compress_level=PNG_COMPRESS_LEVEL)
+
+
+def encoder_main(block_name, slot_size, fps, niceness):
+    """
+    Laço do processo codificador: um trabalho JSON por linha na entrada
+    padrão; cada slot codificado é devolvido numa linha da saída padrão.
+
+    Trabalhos:
+        [slot, largura, altura, destino]: codifica o slot; destino .mp4 vai
+            para o vídeo aberto com esse caminho (aberto no primeiro quadro),
+            qualquer outro destino vira um PNG
+        ["end", destino]: fecha o vídeo destino
+    A entrada fechada encerra o processo.
+    """
+    try:
+        os.nice(niceness)
+    except (AttributeError, OSError):
+        pass  # Sem os.nice (Windows): roda com a prioridade normal
+    block = shared_memory.SharedMemory(name=block_name)
+    # Este processo tem o próprio resource_tracker, que removeria o bloco ao
+    # sair; quem o remove é o jogo, em FrameCapture.close()
+    resource_tracker.unregister(block._name, "shared_memory")
+    videos = {}  # destino -> processo do ffmpeg
+    try:
+        for line in sys.stdin:
+            job = json.loads(line)
+            if job[0] == "end":
+                video = videos.pop(job[1], None)
+                if video is not None:
+                    video.stdin.close()
+                    video.wait()
+                continue
+
+            slot, width, height, path = job
+            start = slot * slot_size
+            pixels = block.buf[start : start + width * height * 4]
+            try:
+                if path.endswith(".mp4"):
+                    video = videos.get(path)
+                    if video is None:
+                        video = subprocess.Popen(
+                            video_command(path, width, height, fps),
+                            stdin=subprocess.PIPE,
+                        )
+                        videos[path] = video
+                    video.stdin.write(pixels)
+                else:
+                    save_png(pixels, width, height, path)
+            except (OSError, ValueError) as e:
+                print(f"Captura: falha ao gravar {path}: {e}", file=sys.stderr)
+            finally:
+                pixels.release()
+                print(slot, flush=True)
+    finally:
+        for video in videos.values():
+            video.stdin.close()
+            video.wait()
+        block.close()
+
+
+if __name__ == "__main__":
+    # python -m render.encoder <bloco> <bytes por slot> <fps> <niceness>
+    name, size, rate, nice = sys.argv[1:5]
+    encoder_main(name, int(size), int(rate), int(nice))
@@ -7,11 +7,33 @@ A próxima geração de traços é baseada **APENAS** no inimigo com o
 maior score de fitness (o "Elite") da geração atual.
 Os novos traços são gerados através de Cruzamento (Crossover) e Mutação.
 """
+import argparse
 import arcade
 import random
 import math
+import operator
 import xml.etree.ElementTree as ET
 import os
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from devtools.hot_reload import HotReloader
+from diagnostics import events
+from entities.bot import BotPlayer
+from entities.swarm import flock_steering
+from evolution.genome_store import GenomeStore, parse_condition
+from evolution.novelty import NoveltyArchive
+from evolution.rng import CounterRNG
+from evolution.selection import crowded_tournament, rank_population
+from evolution.stats import EvolutionStats
+from render.atlas import get_texture, install_atlas
+from render.capture import FrameCapture
+from render.chunks import ChunkedLayer, camera_view
+from training.traces import TraceRecorder
+from world.cache import level_cache
+from world.collision import resolve_motion, sweep_box
+from world.level import COLLISION_LAYER_NAME, EMPTY_TILE, FOREGROUND_LAYER_NAME
 
 # --- Configurações do Jogo ---
 # Restaurando as dimensões fixas da tela para simplificar a câmera
@@ -27,9 +49,26 @@ PARALLAX_LAYERS = {
 
 # Zoom da câmera: 2.0 significa que você verá metade do que via antes, ou seja, a câmera está 2x mais perto
 CAMERA_ZOOM = 2.0
+# Fundos, chão e frente desenhados em blocos, só os que a câmera vê (ver
+# render/chunks.py); False desenha as listas inteiras a cada frame
+CHUNKED_STATIC_LAYERS = True
+
+# --- RELÓGIO DA SIMULAÇÃO (JOGO COM JANELA) ---
+# A simulação avança em passos fixos, independentes da taxa de quadros; o
+# desenho interpola as posições entre os dois últimos passos. As velocidades do
+# jogo são por passo, então mudar a taxa muda a velocidade do jogo.
+SIMULATION_TICK_RATE = 60  # Passos de simulação por segundo
+MAX_SIMULATION_STEPS_PER_FRAME = 5  # Evita a "espiral da morte" em quadros lentos
+RENDER_INTERPOLATION = True
+# Deslocamento (px) entre dois passos acima do qual é um teletransporte (nova
+# geração, snapshot restaurado) e o sprite não é interpolado
+INTERPOLATION_SNAP_DISTANCE = 64.0
 
 # Nome do arquivo de mapa Tiled
 MAP_NAME = "assets/level-1.tmx"
+# Mapas da avaliação headless multi-mapa (fitness agregado entre eles, ver
+# training/headless.run_generation e ArenaRunner.evaluate_maps)
+MAP_NAMES = (MAP_NAME,)
 
 # Constantes do Jogo
 PLAYER_SCALE = 0.6  # Escala do jogador
@@ -38,6 +77,11 @@ PLAYER_MOVEMENT_SPEED = 5
 PLAYER_JUMP_FORCE = 10
 GRAVITY = 0.7
 
+# --- JOGADOR AUTOMÁTICO (BOT) ---
+# Perfil do bot que controla o player ("runner", "evader" ou "idler", ver
+# entities/bot.py); vazio = jogador humano. No jogo, a tecla B liga/desliga.
+BOT_PROFILE = ""
+
 # --- CONSTANTES DE MOVIMENTO E TRAÇOS ---
 ENEMY_MAX_RUN_SPEED = 4.0
 ENEMY_PERCEPTION_RANGE = 400
@@ -45,8 +89,20 @@ ENEMY_ACCELERATION = 0.25
 ENEMY_FRICTION = 0.95
 ENEMY_DRIFT_DECELERATION = 0.6
 
+# --- LOD DE IA (inimigos longe do player) ---
+# Corredores e nadadores além de AI_LOD_FAR_DISTANCE (em x) só aplicam fricção
+# em update_movement; quando estão no chão seus ticks são agrupados e, parados,
+# eles dormem até o player se aproximar. Voadores sempre atualizam.
+AI_LOD_ENABLED = True
+AI_LOD_FAR_DISTANCE = ENEMY_PERCEPTION_RANGE + 100
+AI_LOD_FAR_TICK_INTERVAL = 4  # Ticks agrupados por atualização de um inimigo longe
+AI_LOD_SLEEP_SPEED = 0.05  # Abaixo desta velocidade um inimigo longe dorme
+
 MAX_TRAIT_VALUE = 5.0
 MIN_TRAIT_VALUE = 1.0
+# Os três últimos são os traços de enxame (pesos de separação, alinhamento e
+# coesão); no valor mínimo o peso é zero e o inimigo ignora os outros
+TRAIT_KEYS = ("run", "fly", "jump", "swim", "separation", "alignment", "cohesion")
 TRAIT_MUTATION_RATE = 0.5
 BEST_ENEMY_MUTATION_FACTOR = 0.1
 
@@ -59,6 +115,18 @@ MIN_FITNESS_FOR_WEIGHTING = 0.01
 W_HITS = 1000.0
 W_PROXIMITY = 1.0
 
+# Modo de seleção da evolução:
+# - "weighted": elitismo sobre o fitness ponderado (W_HITS/W_PROXIMITY)
+# - "pareto": ordenação não-dominada + aglomeração (NSGA-II) sobre hits,
+#   proximidade e aproximação máxima como objetivos separados (sem pesos)
+# - "novelty": busca por novidade; o elite é o comportamento mais distante dos
+#   k vizinhos mais próximos no arquivo de comportamentos (evolution/novelty.py)
+SELECTION_MODE = "weighted"
+
+# Busca por novidade
+NOVELTY_K = 15  # Vizinhos usados no cálculo da novidade
+NOVELTY_ARCHIVE_MAX = 200_000  # Entradas no arquivo (descarta as mais antigas)
+
 # Limite de distância para considerar um "Hit"
 HIT_SCORE_THRESHOLD = 20
 
@@ -74,6 +142,11 @@ SWIM_VERTICAL_BOOST = (
     0.5  # Para simular um movimento vertical lento (APENAS PARA AJUSTE)
 )
 
+# --- COLISÃO CONTÍNUA ---
+# Deslocamento por tick (px) a partir do qual o movimento é varrido contra a
+# grade antes do motor de física (evita atravessar tiles de 16px)
+CONTINUOUS_COLLISION_MIN_SPEED = 8.0
+
 
 # Constantes de Voo (Não Alteradas)
 BAT_FLAP_LIFT = 8.0
@@ -89,6 +162,47 @@ BAT_PROXIMITY_DEAD_ZONE_BONUS = 50
 BAT_PROXIMITY_HORIZONTAL_DRAG = 0.7
 TRAIT_MULTIPLIER = 0.5
 
+# --- ENXAME (VOADORES E NADADORES) ---
+# Separação, alinhamento e coesão entre inimigos do mesmo tipo, com vizinhos
+# achados numa grade uniforme reconstruída a cada tick (ver entities/swarm.py)
+SWARM_ENABLED = True
+SWARM_RADIUS = 48.0  # Raio de vizinhança (lado das células da grade), em px
+SWARM_SEPARATION_DISTANCE = 20.0  # Vizinhos mais perto que isso repelem
+SWARM_MAX_NEIGHBOURS = 12  # Candidatos examinados na separação, por inimigo
+SWARM_MAX_FORCE = 0.3  # Aceleração máxima do enxame (px/tick por tick)
+# Peso de cada regra com o traço no máximo (MAX_TRAIT_VALUE)
+SWARM_SEPARATION_WEIGHT = 1.5
+SWARM_ALIGNMENT_WEIGHT = 1.0
+SWARM_COHESION_WEIGHT = 1.0
+SWARM_TYPES = ("flying", "swimming")
+
+# --- SNAPSHOTS DA SIMULAÇÃO ---
+SNAPSHOT_INTERVAL = 2.0  # Segundos entre snapshots automáticos (player no chão)
+SNAPSHOT_HISTORY = 3  # Snapshots recentes guardados para voltar após uma queda
+
+# --- BANCO DE GENOMAS ---
+GENOME_DB_PATH = "genomes.db"  # Hall da fama dos elites (SQLite)
+
+# --- GRAVAÇÃO DE SESSÕES (TRACES) ---
+# Entrada do player por tick, para replay headless (ver training/traces.py);
+# desligado por padrão, liga com --record-trace. Gerações com o bot são
+# descartadas
+TRACE_RECORDING = False
+TRACE_DIR = "traces"
+
+# --- CAPTURA DE TELA E VÍDEO ---
+# F12 grava um PNG, F10 liga/desliga a gravação (ver render/capture.py)
+CAPTURE_DIR = "captures"
+CAPTURE_EVERY = 2  # Na gravação, um quadro a cada N frames desenhados
+CAPTURE_VIDEO = True  # MP4 pelo ffmpeg; sem ffmpeg, sequência de PNGs
+
+# --- LOG DE EVENTOS ---
+EVENT_LOG_PATH = "events.jsonl"  # Eventos estruturados (JSONL) do jogo com janela
+
+# --- RECARGA A QUENTE (DESENVOLVIMENTO) ---
+# Reaplica mudanças deste arquivo (constantes) e do .tmx sem reiniciar o jogo
+HOT_RELOAD_ENABLED = True
+
 # Configurações de Câmera e Cor
 BACKGROUND_COLOR = (46, 90, 137)
 
@@ -102,7 +216,7 @@ ENEMY_SPRITES_MAP = {
 # --- FIM DO MAPA DE SPRITES ---
 
 
-def determine_enemy_type(traits: dict) -> str:
+def determine_enemy_type(traits: dict, rng=random) -> str:
     """
     Determina o tipo do inimigo baseado nos traços.
 
@@ -132,7 +246,7 @@ def determine_enemy_type(traits: dict) -> str:
 
     # Se múltiplas habilidades estão ativas, escolhe uma aleatoriamente
     if len(active_abilities) > 1:
-        return random.choice(active_abilities)
+        return rng.choice(active_abilities)
 
     # Se apenas uma habilidade está ativa, retorna ela
     return active_abilities[0]
@@ -143,25 +257,26 @@ class BackgroundImage(arcade.Sprite):
 
     def __init__(self, image_path, x, y):
         try:
-            super().__init__(image_path, scale=1.0)
+            super().__init__(get_texture(image_path), scale=1.0)
             self.center_x = x
             self.center_y = y
         except Exception as e:
             print(f"Erro ao carregar imagem {image_path}: {e}")
 
 
-def load_background_images(tmx_path, map_width):
+def load_background_layers(tmx_path, map_width, layer_names=None):
     """
-    Carrega as imagens de fundo do arquivo .tmx e as repete horizontalmente.
+    Carrega as camadas de imagem do arquivo .tmx, repetidas horizontalmente.
 
     Args:
         tmx_path: Caminho do arquivo .tmx
         map_width: Largura total do mapa em pixels
+        layer_names: se dado, carrega apenas estas camadas
 
     Retorna:
-        Uma SpriteList com as imagens de fundo repetidas.
+        Um dict nome da camada -> lista de sprites, na ordem do mapa.
     """
-    backgrounds = arcade.SpriteList()
+    layers = {}
 
     try:
         tree = ET.parse(tmx_path)
@@ -170,8 +285,11 @@ def load_background_images(tmx_path, map_width):
 
         for imagelayer in root.findall("imagelayer"):
             layer_name = imagelayer.get("name", "unknown")
+            if layer_names is not None and layer_name not in layer_names:
+                continue
             offsetx = int(imagelayer.get("offsetx", 0))
             offsety = int(imagelayer.get("offsety", 0))
+            sprites = []
 
             image_tag = imagelayer.find("image")
             if image_tag is not None:
@@ -196,14 +314,28 @@ def load_background_images(tmx_path, map_width):
                     center_y = offsety + image_height / 2
 
                     bg_sprite = BackgroundImage(image_path, center_x, center_y)
-                    backgrounds.append(bg_sprite)
+                    sprites.append(bg_sprite)
 
                     x += image_width
 
                 print(f"✓ Fundo repetido considerando offset: {layer_name}")
+            layers[layer_name] = sprites
     except Exception as e:
         print(f"Erro ao carregar imagens de fundo: {e}")
 
+    return layers
+
+
+def load_background_images(tmx_path, map_width):
+    """
+    Carrega as imagens de fundo do arquivo .tmx e as repete horizontalmente.
+
+    Retorna:
+        Uma SpriteList com as imagens de fundo repetidas.
+    """
+    backgrounds = arcade.SpriteList()
+    for sprites in load_background_layers(tmx_path, map_width).values():
+        backgrounds.extend(sprites)
     return backgrounds
 
 
@@ -221,8 +353,33 @@ class Enemy(arcade.Sprite):
     Inclui rastreamento de fitness.
     """
 
+    # Estado dinâmico capturado pelos snapshots da simulação
+    STATE_FIELDS = (
+        "center_x",
+        "center_y",
+        "change_x",
+        "change_y",
+        "jump_cooldown",
+        "attack_cooldown",
+        "ignore_platforms_timer",
+        "flap_timer",
+        "is_drifting",
+        "hits",
+        "hit_cooldown",
+        "proximity_score",
+        "min_distance",
+        "airborne_time",
+        "water_time",
+        "lod_ready",
+        "lod_sleeping",
+        "lod_pending_ticks",
+        "lod_pending_time",
+        "rng_state",
+    )
+    _get_state = operator.attrgetter(*STATE_FIELDS)
+
     # Altera a escala padrão para a constante ENEMY_SCALE
-    def __init__(self, traits: dict, scale: float = ENEMY_SCALE):
+    def __init__(self, traits: dict, scale: float = ENEMY_SCALE, rng=random):
 
         enemy_type = traits.get("type")
 
@@ -231,15 +388,18 @@ class Enemy(arcade.Sprite):
 
         # 2. Se o caminho for encontrado, carrega o sprite real
         if selected_image_path:
-            super().__init__(selected_image_path, scale)
+            super().__init__(get_texture(selected_image_path), scale)
             self.color = (
                 arcade.color.WHITE
             )  # Define a cor como branca para não interferir no sprite
 
         # 3. Fallback (se por algum motivo o tipo não estiver no mapa, usa o círculo placeholder original)
         else:
-            print(
-                f"AVISO: Tipo de inimigo '{enemy_type}' desconhecido. Usando placeholder."
+            events.emit(
+                "spawn",
+                "AVISO: Tipo de inimigo '{enemy_type}' desconhecido. Usando placeholder.",
+                events.WARNING,
+                enemy_type=enemy_type,
             )
             radius = int(20 * (scale / 0.4))
             super().__init__(None, scale)
@@ -253,21 +413,20 @@ class Enemy(arcade.Sprite):
             self.color = (255, color_intensity, color_intensity)
 
         self.traits = traits
+        self.rng = rng
+
+        # Aceleração do enxame neste tick (ver GameSimulation.update_swarms)
+        self.swarm_x = 0.0
+        self.swarm_y = 0.0
 
         # Aplica traços
-        self.max_run_speed = (
-            self.traits.get("run", 1.0) / MAX_TRAIT_VALUE
-        ) * ENEMY_MAX_RUN_SPEED
-        self.max_fly_speed = self.traits.get("fly", 1.0) * TRAIT_MULTIPLIER
-        # Velocidade máxima de nado baseada no traço 'swim'
-        self.max_swim_speed = (
-            self.traits.get("swim", 1.0) / MAX_TRAIT_VALUE
-        ) * ENEMY_MAX_RUN_SPEED
-        self.flap_timer = random.uniform(0, BAT_FLAP_BASE_INTERVAL)
+        self.apply_traits()
+        self.flap_timer = rng.uniform(0, BAT_FLAP_BASE_INTERVAL)
 
         self.physics_engine = None
         self.ground_list = None  # Armazena a lista de colisões
         self.swim_tile_id = -1  # Armazena o ID do tile de nado
+        self.level_data = None  # Nível (grade e retângulos para colisão contínua)
 
         self.jump_cooldown = 0.0
         self.JUMP_COOLDOWN_TIME = 1.0
@@ -280,11 +439,49 @@ class Enemy(arcade.Sprite):
         # Temporizador para ignorar plataformas momentaneamente (para evitar travamentos ao pular)
         self.ignore_platforms_timer = 0.0
 
+        # Estado do LOD de IA (ver lod_update)
+        self.lod_ready = False  # Só após uma atualização completa (spawn resolvido)
+        self.lod_sleeping = False
+        self.lod_pending_ticks = 0
+        self.lod_pending_time = 0.0
+        self.lod_skip = False
+
         # Variáveis de Rastreamento de Fitness
         self.hits = 0
+        self.hit_cooldown = 0.0  # Só com GameSimulation.per_enemy_hit_cooldown
         self.proximity_score = 0.0
+        self.min_distance = float("inf")  # Aproximação máxima do player
         self.current_fitness = 0.0
 
+        # Descritor de comportamento (busca por novidade)
+        self.airborne_time = 0.0  # Segundos sem chão (nem água) sob os pés
+        self.water_time = 0.0  # Segundos com o centro dentro de um tile de água
+
+    def apply_traits(self):
+        """
+        Recalcula os atributos derivados dos traços e das constantes de ajuste
+        (chamado de novo quando as constantes são recarregadas a quente).
+        """
+        self.max_run_speed = (
+            self.traits.get("run", 1.0) / MAX_TRAIT_VALUE
+        ) * ENEMY_MAX_RUN_SPEED
+        self.max_fly_speed = self.traits.get("fly", 1.0) * TRAIT_MULTIPLIER
+        # Velocidade máxima de nado baseada no traço 'swim'
+        self.max_swim_speed = (
+            self.traits.get("swim", 1.0) / MAX_TRAIT_VALUE
+        ) * ENEMY_MAX_RUN_SPEED
+        # Pesos do enxame: zero no traço mínimo, o peso da regra no máximo
+        self.swarm_weights = tuple(
+            weight
+            * (self.traits.get(key, MIN_TRAIT_VALUE) - MIN_TRAIT_VALUE)
+            / (MAX_TRAIT_VALUE - MIN_TRAIT_VALUE)
+            for key, weight in (
+                ("separation", SWARM_SEPARATION_WEIGHT),
+                ("alignment", SWARM_ALIGNMENT_WEIGHT),
+                ("cohesion", SWARM_COHESION_WEIGHT),
+            )
+        )
+
     def calculate_final_fitness(self):
         """Calcula a pontuação de fitness final e armazena."""
         self.current_fitness = (W_HITS * self.hits) + (
@@ -292,15 +489,111 @@ class Enemy(arcade.Sprite):
         )
         return self.current_fitness
 
+    def objectives(self) -> tuple:
+        """Objetivos (todos de maximização) usados na seleção multiobjetivo."""
+        return (self.hits, self.proximity_score, -self.min_distance)
+
+    def behavior_descriptor(self, level_time, map_width, map_height) -> tuple:
+        """
+        Comportamento na geração, normalizado em [0, 1] por componente:
+        posição final (x, y), fração do tempo no ar, fração do tempo na água e
+        aproximação máxima do player (relativa ao alcance de percepção).
+        """
+        duration = max(level_time, MIN_DISTANCE_EPSILON)
+        return (
+            min(1.0, max(0.0, self.center_x / map_width)),
+            min(1.0, max(0.0, self.center_y / map_height)),
+            self.airborne_time / duration,
+            self.water_time / duration,
+            min(1.0, self.min_distance / ENEMY_PERCEPTION_RANGE),
+        )
+
+    def capture_state(self) -> tuple:
+        """Estado dinâmico do inimigo (ver STATE_FIELDS) como uma tupla."""
+        return Enemy._get_state(self)
+
+    def restore_state(self, state):
+        """Restaura um estado obtido com capture_state()."""
+        for name, value in zip(self.STATE_FIELDS, state):
+            setattr(self, name, value)
+
+    @property
+    def rng_state(self):
+        return self.rng.getstate()
+
+    @rng_state.setter
+    def rng_state(self, state):
+        self.rng.setstate(state)
+
     def set_target(self, player_sprite):
         self.player_target = player_sprite
 
-    def set_physics_engine(self, engine, ground_list=None, swim_tile_id=None):
+    def set_physics_engine(
+        self, engine, ground_list=None, swim_tile_id=None, level=None
+    ):
         """Define o motor de física e, se aplicável, informações de colisão/nado."""
         self.physics_engine = engine
         self.ground_list = ground_list
         if swim_tile_id is not None:
             self.swim_tile_id = swim_tile_id
+        if level is not None:
+            self.level_data = level
+
+    def sweep(self, dx: float, dy: float, blocking=None):
+        """
+        Colisão contínua da hit box do inimigo deslocada por (dx, dy).
+
+        Retorna o primeiro impacto (world.collision.SweepHit, com o instante e a
+        normal de contato) ou None.
+        """
+        if self.level_data is None:
+            return None
+        box = (self.left, self.bottom, self.right, self.top)
+        return sweep_box(self.level_data, box, dx, dy, blocking)
+
+    def is_wall(self, rect) -> bool:
+        """Se o retângulo de colisão bloqueia o motor de física deste inimigo."""
+        if self.traits.get("type") == "swimming":
+            # Nadadores só colidem com a água (boiam sobre ela)
+            return rect[4] == self.swim_tile_id
+        return True
+
+    @contextmanager
+    def swept_motion(self, moves=1):
+        """
+        Envolve o passo de movimento do tick (motor de física ou update()):
+        quando o deslocamento é grande o bastante para atravessar um tile (ver
+        CONTINUOUS_COLLISION_MIN_SPEED), ele é resolvido por colisão contínua,
+        deslizando nas superfícies (world.collision.resolve_motion), e só o
+        deslocamento deste tick é limitado. Depois do passo, a velocidade do
+        eixo que parou numa superfície é zerada; a do outro eixo não muda.
+        Movimentos lentos ficam por conta do motor de física.
+
+        Args:
+            moves: quantas vezes a velocidade será aplicada neste tick (os
+                nadadores andam duas: update() e o motor de física)
+        """
+        dx = self.change_x * moves
+        dy = self.change_y * moves
+        if self.level_data is None or (
+            abs(dx) <= CONTINUOUS_COLLISION_MIN_SPEED
+            and abs(dy) <= CONTINUOUS_COLLISION_MIN_SPEED
+        ):
+            yield
+            return
+        box = (self.left, self.bottom, self.right, self.top)
+        move_x, move_y, blocked_x, blocked_y = resolve_motion(
+            self.level_data, box, dx, dy, self.is_wall
+        )
+        if blocked_x:
+            self.change_x = move_x / moves
+        if blocked_y:
+            self.change_y = move_y / moves
+        yield
+        if blocked_x:
+            self.change_x = 0.0
+        if blocked_y:
+            self.change_y = 0.0
 
     def is_on_swim_tile(self):
         """Verifica se o inimigo está sobre um tile de nado (ID 59)."""
@@ -322,68 +615,40 @@ class Enemy(arcade.Sprite):
         que NÃO é o tile de nado (ID 59) E SE A COLISÃO ESTÁ NO NÍVEL DA ÁGUA.
         Se a colisão for muito acima do inimigo, ela é ignorada para permitir
         que ele nade por baixo de plataformas.
+
+        Todo o trajeto é varrido (colisão contínua), não só a posição final, então
+        um movimento rápido não atravessa uma parede fina.
         Retorna True se houver colisão com um tile "não-navegável" no nível da água.
         """
-        if not self.ground_list or self.swim_tile_id == -1:
+        if self.level_data is None or self.swim_tile_id == -1:
             return False
 
-        # 1. Pré-verificação de posição
-        original_x = self.center_x
-        original_y = self.center_y
-        self.center_x += dx
-        self.center_y += dy
-
-        # 2. Verifica colisões com TODOS os tiles no ground_list
-        hit_list = arcade.check_for_collision_with_list(self, self.ground_list)
-
-        # 3. Retorna o sprite para a posição original
-        self.center_x = original_x
-        self.center_y = original_y
-
-        # 4. Analisa as colisões
-        if not hit_list:
-            return False
+        center_y = self.center_y
+        # Só bloqueiam tiles sólidos na altura do inimigo (ou ligeiramente
+        # acima/abaixo); plataformas muito altas são ignoradas
+        vertical_tolerance = self.height * 1.5
 
-        for sprite in hit_list:
-            tile_id = sprite.properties.get("tile_id")
+        def blocks(rect):
+            _, bottom, _, top, tile_id = rect
 
             # Se colidir com o tile de água, não bloqueia.
             if tile_id == self.swim_tile_id:
-                continue
-
-            # Se estivermos no modo temporário de ignorar plataformas (ex.: durante um pulo/ataque)
-            # e o movimento vertical for para cima, ignoramos colisões com tiles que estão
-            # acima do inimigo (para evitar travamentos quando ele salta através de plataformas).
-            if self.ignore_platforms_timer > 0 and dy > 0:
-                # Se o tile estiver acima do centro do inimigo, não considera bloqueio.
-                if sprite.center_y > self.center_y:
-                    continue
-
-            # --- VERIFICAÇÃO DE NÍVEL DE COLISÃO ---
-            # Se colidir com um tile NÃO-ÁGUA, verifica se este tile está
-            # no nível horizontal do inimigo (ou ligeiramente acima/abaixo)
-            # para ignorar plataformas muito altas.
-            # Usaremos o centro do tile para checagem vertical.
-
-            # Se a colisão ocorrer no eixo Y do inimigo, e não for ignorada acima, bloqueia.
-            vertical_tolerance = self.height * 1.5
-
-            is_blocking_vertically = (
-                abs(sprite.center_y - self.center_y) < vertical_tolerance
-            )
+                return False
 
-            if is_blocking_vertically:
-                # Colisão com um tile sólido no nível da água (parede/fundo)
-                return True
+            # No modo temporário de ignorar plataformas (ex.: durante um
+            # pulo/ataque), subindo, tiles acima do inimigo não bloqueiam
+            if self.ignore_platforms_timer > 0 and dy > 0 and bottom > center_y:
+                return False
 
-        # Todas as colisões foram com tiles de água ou tiles sólidos muito altos (ignorados)
-        return False
+            return (
+                bottom < center_y + vertical_tolerance
+                and top > center_y - vertical_tolerance
+            )
 
-    def update_movement(self, delta_time):
-        """Lógica de movimento do inimigo."""
-        if not self.player_target:
-            return
+        return self.sweep(dx, dy, blocks) is not None
 
+    def advance_timers(self, delta_time):
+        """Decrementa os cooldowns do inimigo."""
         if self.jump_cooldown > 0:
             self.jump_cooldown -= delta_time
 
@@ -395,6 +660,93 @@ class Enemy(arcade.Sprite):
         if self.ignore_platforms_timer > 0:
             self.ignore_platforms_timer -= delta_time
 
+    def lod_update(self, delta_time) -> bool:
+        """
+        Agenda a atualização do inimigo conforme a distância ao player (LOD de IA).
+
+        Longe do player, corredores e nadadores apenas desaceleram por fricção.
+        Se estiverem no chão, AI_LOD_FAR_TICK_INTERVAL ticks são agrupados e
+        aplicados de uma vez (mesma fricção e deslocamento acumulados); quando
+        param, dormem sem custo algum até o player chegar perto.
+
+        Retorna:
+            True se o inimigo deve rodar a atualização completa neste tick;
+            False se o tick foi absorvido pelo LOD.
+        """
+        is_grounded_type = self.traits.get("type") in ("running", "swimming")
+        if not is_grounded_type or not self.physics_engine or not self.player_target:
+            return True
+
+        if not self.lod_ready:
+            # O primeiro tick resolve o spawn (que pode nascer dentro de um tile)
+            self.lod_ready = True
+            return True
+
+        far = abs(self.player_target.center_x - self.center_x) > AI_LOD_FAR_DISTANCE
+        if not far:
+            self.lod_wake()
+            return True
+
+        if self.lod_sleeping:
+            self.lod_pending_time += delta_time
+            return False
+
+        # Um lote só começa com o inimigo apoiado (longe ele não pula)
+        if self.lod_pending_ticks == 0 and not self.physics_engine.can_jump():
+            return True
+
+        self.lod_pending_ticks += 1
+        self.lod_pending_time += delta_time
+        if self.lod_pending_ticks >= AI_LOD_FAR_TICK_INTERVAL:
+            self._lod_flush()
+            if abs(self.change_x) < AI_LOD_SLEEP_SPEED:
+                self.change_x = 0
+                self.lod_sleeping = True
+        return False
+
+    def lod_wake(self):
+        """Acorda o inimigo, aplicando o que estava pendente do LOD."""
+        if self.lod_sleeping:
+            self.advance_timers(self.lod_pending_time)
+            self.lod_sleeping = False
+            self.lod_pending_time = 0.0
+        elif self.lod_pending_ticks:
+            self._lod_flush()
+
+    def _lod_flush(self):
+        """Aplica de uma vez os ticks agrupados de um inimigo longe e no chão."""
+        ticks = self.lod_pending_ticks
+        self.advance_timers(self.lod_pending_time)
+
+        # Deslocamento de `ticks` passos com fricção geométrica
+        speed = self.change_x
+        if ENEMY_FRICTION == 1.0:
+            displacement = speed * ticks
+        else:
+            displacement = (
+                speed * ENEMY_FRICTION * (1 - ENEMY_FRICTION**ticks)
+                / (1 - ENEMY_FRICTION)
+            )
+        if self.traits.get("type") == "swimming":
+            # Nadadores andam duas vezes por tick (update() + motor de física)
+            displacement *= 2
+
+        self.change_x = displacement
+        with self.swept_motion():
+            self.physics_engine.update()
+        if self.change_x:  # Zerada se parou numa parede
+            self.change_x = speed * ENEMY_FRICTION**ticks
+
+        self.lod_pending_ticks = 0
+        self.lod_pending_time = 0.0
+
+    def update_movement(self, delta_time):
+        """Lógica de movimento do inimigo."""
+        if not self.player_target:
+            return
+
+        self.advance_timers(delta_time)
+
         is_runner = self.traits.get("type") == "running"
         is_swimmer = self.traits.get("type") == "swimming"
         is_flying = self.traits.get("type") == "flying"
@@ -434,8 +786,11 @@ class Enemy(arcade.Sprite):
                     SWIM_BASE_SPEED * swim_factor * (0.5 + 0.5 * run_factor)
                 )
 
-                # Movimento horizontal: perseguição
-                self.change_x = desired_direction * current_swim_speed
+                # Movimento horizontal: perseguição, parando em paredes sólidas
+                # no nível da água (o nadador anda duas vezes por tick)
+                self.change_x = desired_direction * current_swim_speed + self.swarm_x
+                if self.change_x and self.is_swimming_collision(self.change_x * 2, 0):
+                    self.change_x = 0
 
                 # Ataque: pulo quando perto do player
                 if distance < SWIMMER_ATTACK_RANGE and self.attack_cooldown <= 0:
@@ -484,7 +839,7 @@ class Enemy(arcade.Sprite):
                     player_close_x = (
                         abs(self.player_target.center_x - self.center_x) < 150
                     )
-                    random_jump_chance = random.randint(1, 100) == 1
+                    random_jump_chance = self.rng.randint(1, 100) == 1
 
                     if (
                         (player_higher and player_close_x) or random_jump_chance
@@ -524,9 +879,11 @@ class Enemy(arcade.Sprite):
             elif dx > 0:
                 target_direction = 1
 
-            wobble = random.uniform(-HORIZONTAL_WOBBLE, HORIZONTAL_WOBBLE)
+            wobble = self.rng.uniform(-HORIZONTAL_WOBBLE, HORIZONTAL_WOBBLE)
 
             self.change_x += target_direction * self.max_fly_speed * delta_time
+            self.change_x += self.swarm_x
+            self.change_y += self.swarm_y
             self.change_x = max(
                 min(self.change_x, self.max_fly_speed), -self.max_fly_speed
             )
@@ -536,19 +893,65 @@ class Enemy(arcade.Sprite):
             self.change_y = max(min(self.change_y, max_v_speed), -max_v_speed)
 
 
-class MyGame(arcade.Window):
+class SimulationSnapshot:
     """
-    Classe Principal do Jogo - Gerencia o Player, Inimigos Evolutivos e Estados de Jogo.
+    Estado completo da simulação em um instante da geração.
+
+    Guarda apenas tuplas de números (mais os traços; o estado do gerador de
+    cada inimigo vai junto do seu estado), então capturar e restaurar custa
+    microssegundos.
+    Ver GameSimulation.take_snapshot() e restore_snapshot().
     """
 
-    def __init__(self, width=SCREEN_WIDTH, height=SCREEN_HEIGHT, title=SCREEN_TITLE):
-        # Usamos as dimensões fixas da tela para o GUI
-        super().__init__(width, height, title)
+    __slots__ = (
+        "level_time",
+        "hit_cooldown",
+        "player_state",
+        "enemy_traits",
+        "enemy_states",
+    )
+
+    def __init__(
+        self,
+        level_time,
+        hit_cooldown,
+        player_state,
+        enemy_traits,
+        enemy_states,
+    ):
+        self.level_time = level_time
+        self.hit_cooldown = hit_cooldown
+        self.player_state = player_state
+        self.enemy_traits = enemy_traits
+        self.enemy_states = enemy_states
+
+
+class GameSimulation:
+    """
+    Estado e regras da simulação (mapa, player, inimigos e evolução), sem janela.
+
+    MyGame acrescenta câmeras, entrada de teclado e renderização por cima desta
+    classe; os treinos headless (ver training/) a usam diretamente.
+    """
+
+    def __init__(self, load_graphics=True, seed=None):
+        # Sem gráficos não carregamos as imagens de fundo (apenas para desenho)
+        self.load_graphics = load_graphics
+
+        # Imagens do atlas pré-empacotado, se houver (ver render/atlas.py)
+        install_atlas()
+
+        # Semente da execução: toda a aleatoriedade (spawn, comportamento e
+        # evolução) sai de fluxos derivados dela, ver stream(). Simulações com a
+        # mesma semente dão os mesmos números em qualquer processo ou ordem.
+        self.seed = seed if seed is not None else random.getrandbits(32)
 
         self.player_list = None
         self.enemy_list = None
         self.enemy_physics_engines = []
 
+        self.level_data = None
+        self.map_name = None  # Mapa em uso (ver use_level)
         self.tile_map = None
         self.ground_list = None
         self.foreground_list = None
@@ -564,21 +967,20 @@ class MyGame(arcade.Window):
         # Armazena a lista de posições dos tiles de água para o spawn
         self.water_tile_centers = []
 
-        # Inicializa câmeras
-        screen_limits = (width, height)
-        screen_rect = arcade.LRBT(0, width, 0, height)
-        self.camera = arcade.camera.Camera2D(viewport=screen_rect)
-        self.gui_camera = arcade.camera.Camera2D(viewport=screen_rect)
-
-        # --- APLICA O ZOOM NO MUNDO DO JOGO ---
-        self.camera.zoom = CAMERA_ZOOM
-
         self.physics_engine = None
+        self.bot = None  # BotPlayer que controla o player (ver enable_bot)
+        self.individual_ids = []  # Identificador de cada inimigo da geração
+        self.trace_recorder = None  # TraceRecorder da sessão (jogo com janela)
+        self.jump_requested = False  # Pulo pedido desde o último tick
 
         self.left_pressed = False
         self.right_pressed = False
         self.hit_cooldown = 0.0
         self.HIT_COOLDOWN_TIME = 1.0
+        # Com True cada inimigo tem o seu cooldown de hit (Enemy.hit_cooldown):
+        # os acertos de um genoma não dependem de quem divide a simulação com
+        # ele (avaliação em arenas, ver training/arena.py)
+        self.per_enemy_hit_cooldown = False
         self.show_fitness_logs = True
 
         # --- NOVOS ESTADOS DE JOGO E CONTROLE ---
@@ -588,10 +990,23 @@ class MyGame(arcade.Window):
         self.summary_data = None
 
         # --- SISTEMA DE CHOQUE GENÉTICO ---
-        self.fitness_history = []  # Histórico de fitness máximo por geração
         self.stagnation_threshold = 3  # Gerações sem melhora para disparar choque
         self.genetic_shock_multiplier = 2.5  # Multiplicador de mutação no choque
 
+        # Estatísticas incrementais (estagnação, percentis, diversidade)
+        self.evolution_stats = EvolutionStats(self.stagnation_threshold)
+
+        # Arquivo de comportamentos já avaliados (SELECTION_MODE "novelty")
+        self.novelty_archive = NoveltyArchive(NOVELTY_K, NOVELTY_ARCHIVE_MAX)
+
+        # Snapshots recentes da geração atual (para voltar após uma queda)
+        self.snapshots = deque(maxlen=SNAPSHOT_HISTORY)
+        self.next_snapshot_time = SNAPSHOT_INTERVAL
+
+        # Banco de genomas onde os elites são gravados (ver attach_genome_store)
+        self.genome_store = None
+        self.run_id = None
+
         # Traços iniciais para a próxima geração (AGORA INCLUINDO O NADADOR)
         self.next_generation_traits = [
             {"run": 5.0, "fly": 1.0, "jump": 5.0, "swim": 1.0, "type": "running"},
@@ -599,78 +1014,62 @@ class MyGame(arcade.Window):
             {"run": 2.0, "fly": 1.0, "jump": 1.0, "swim": 5.0, "type": "swimming"},
         ]
 
-    def on_resize(self, width: float, height: float):
+    def stream(self, *purpose) -> CounterRNG:
         """
-        Chamado quando a janela é redimensionada.
-        Ajusta as câmeras para o novo tamanho e reafirma o zoom.
+        Gerador do fluxo (semente, geração, *purpose), ex.: stream(3, "enemy")
+        para o inimigo 3 da geração atual. Fluxos diferentes são independentes e
+        o mesmo fluxo sempre recomeça dos mesmos números.
         """
-        super().on_resize(width, height)
-        # Reaplicamos o zoom após redimensionar para manter a proximidade
-        self.camera.zoom = CAMERA_ZOOM
+        return CounterRNG(self.seed, self.level, *purpose)
 
-    def setup(self):
-        """Configura o mapa e o player (Chamado apenas uma vez no início)."""
+    def attach_genome_store(self, store: GenomeStore, params=None):
+        """Passa a gravar o elite de cada geração em store, numa execução nova."""
+        self.genome_store = store
+        self.run_id = store.start_run(params)
 
-        COLLISION_LAYER_NAME = "colission layer"
-        FOREGROUND_LAYER_NAME = "Foreground"
-        PLAYER_START_LAYER_NAME = "Player Start"
+    def seed_from_genome_store(self, store: GenomeStore, **query) -> bool:
+        """
+        Troca os traços iniciais pelos melhores genomas do banco que satisfazem
+        a consulta (argumentos de GenomeStore.top_genomes). Deve ser chamado
+        antes de setup(). Retorna False se a consulta não encontrou nada.
+        """
+        traits = store.seed_traits(len(self.next_generation_traits), **query)
+        if not traits:
+            return False
+        self.next_generation_traits = traits
+        return True
 
-        layer_options = {
-            COLLISION_LAYER_NAME: {
-                "use_spatial_hash": True,
-            }
-        }
+    @property
+    def fitness_history(self):
+        """Fitness máximo por geração (histórico limitado, ver EvolutionStats)."""
+        return self.evolution_stats.best_history
 
-        # Define a cor de fundo
-        arcade.set_background_color(BACKGROUND_COLOR)
+    def setup(self, level=None, map_name=None):
+        """
+        Configura o mapa e o player (Chamado apenas uma vez no início).
 
-        self.tile_map = arcade.load_tilemap(
-            MAP_NAME, scaling=1.0, layer_options=layer_options
-        )
+        Args:
+            level: LevelData já carregado para compartilhar entre simulações;
+                se None, vem do cache de níveis (world/cache.py).
+            map_name: caminho do mapa; se None, MAP_NAME.
+        """
 
-        # Calcula as dimensões do mapa em pixels ANTES de carregar os fundos
-        self.map_width_pixels = self.tile_map.width * self.tile_map.tile_width
-        self.map_height_pixels = self.tile_map.height * self.tile_map.tile_height
-        self.tile_size = self.tile_map.tile_width
+        # Define a cor de fundo
+        if self.load_graphics:
+            arcade.set_background_color(BACKGROUND_COLOR)
 
-        # Carrega as imagens de fundo do arquivo .tmx
-        self.background_images = load_background_images(MAP_NAME, self.map_width_pixels)
+        map_name = map_name or MAP_NAME
+        self.use_level(level or level_cache.get(map_name, SWIM_TILE_ID), map_name)
 
         # Configuração das listas e camadas
         self.player_list = arcade.SpriteList()
         self.enemy_list = arcade.SpriteList()
         self.enemy_physics_engines = []
         self.hit_cooldown = 0.0
-        self.water_tile_centers = []  # Limpa tiles de água
-
-        self.ground_list = self.tile_map.sprite_lists.get(COLLISION_LAYER_NAME)
-        self.foreground_list = self.tile_map.sprite_lists.get(
-            FOREGROUND_LAYER_NAME, arcade.SpriteList()
-        )
-
-        if self.ground_list is None:
-            print(
-                f"ATENÇÃO: A camada '{COLLISION_LAYER_NAME}' não foi encontrada. Usando SpriteList vazia."
-            )
-            self.ground_list = arcade.SpriteList()
-
-        # --- LÓGICA CORRIGIDA: PRÉ-CALCULAR PONTOS DE SPAWN DE ÁGUA ---
-        for sprite in self.ground_list:
-            tile_id = sprite.properties.get("tile_id")
-            # Usa o ID corrigido (SWIM_TILE_ID = 59)
-            if tile_id == SWIM_TILE_ID:
-                # Armazena o centro do tile de água
-                self.water_tile_centers.append((sprite.center_x, sprite.center_y))
-
-        if not self.water_tile_centers:
-            print(
-                f"AVISO: Nenhuma tile de água (ID:{SWIM_TILE_ID}) encontrada na camada '{COLLISION_LAYER_NAME}' para spawn de nadadores!"
-            )
-        # --- FIM DA LÓGICA DE PRÉ-CÁLCULO ---
 
         # Configuração do Player
         self.player_sprite = arcade.Sprite(
-            PLAYER_IDLE_SPRITE,  # USANDO O NOVO SPRITE DO PLAYER
+            get_texture(PLAYER_IDLE_SPRITE),  # USANDO O NOVO SPRITE DO PLAYER
             PLAYER_SCALE,
         )
 
@@ -678,27 +1077,21 @@ class MyGame(arcade.Window):
         self.player_sprite.height = self.tile_size * 0.8 * (PLAYER_SCALE / 0.4)
 
         # Ponto de Spawn do Player
-        player_spawn_layer = self.tile_map.object_lists.get(PLAYER_START_LAYER_NAME)
-        spawn_point_x, spawn_point_y = 50, 200  # Fallback
-
-        if player_spawn_layer and player_spawn_layer[0]:
-            try:
-                spawn_point_x = player_spawn_layer[0].center_x
-                spawn_point_y = player_spawn_layer[0].center_y
-            except Exception as e:
-                print(
-                    f"Erro ao obter ponto de spawn do Player: {e}. Usando fallback ({spawn_point_x}, {spawn_point_y})."
-                )
-                pass
+        spawn_point_x, spawn_point_y = self.level_data.player_spawn
 
         self.player_sprite.center_x = spawn_point_x
         self.player_sprite.center_y = spawn_point_y
         self.player_list.append(self.player_sprite)
 
+        # A física usa os retângulos fundidos do nível, não os tiles individuais
         self.physics_engine = arcade.PhysicsEnginePlatformer(
-            self.player_sprite, gravity_constant=GRAVITY, walls=self.ground_list
+            self.player_sprite,
+            gravity_constant=GRAVITY,
+            walls=self.level_data.collision_list,
         )
 
+        self.enable_bot(BOT_PROFILE)
+
         # Configuração da Geração Inicial de Inimigos
         self.setup_generation(self.next_generation_traits)
 
@@ -711,49 +1104,56 @@ class MyGame(arcade.Window):
         # Centraliza a câmera no jogador instantaneamente no setup
         self.center_camera_to_player(instant=True)
 
-    def setup_generation(self, traits_list):
-        """Cria e posiciona a nova geração de inimigos com base em traits_list."""
+    def setup_generation(self, traits_list, individual_ids=None):
+        """
+        Cria e posiciona a nova geração de inimigos com base em traits_list.
+
+        Args:
+            individual_ids: identificador de cada indivíduo (padrão: a posição
+                na lista); escolhe o ponto de spawn e o fluxo aleatório, então o
+                mesmo indivíduo se comporta igual em qualquer arena ou processo
+        """
         self.enemy_list = arcade.SpriteList()
         self.enemy_physics_engines = []
         self.level_time = 0.0
         self.game_state = "PLAYING"
+        self.snapshots.clear()
+        self.next_snapshot_time = SNAPSHOT_INTERVAL
 
-        PLAYER_START_LAYER_NAME = "Player Start"
-        player_spawn_layer = self.tile_map.object_lists.get(PLAYER_START_LAYER_NAME)
-        spawn_point_x, spawn_point_y = 50, 200
-
-        if player_spawn_layer and player_spawn_layer[0]:
-            try:
-                spawn_point_x = player_spawn_layer[0].center_x
-                spawn_point_y = player_spawn_layer[0].center_y
-            except Exception:
-                pass
+        spawn_point_x, spawn_point_y = self.level_data.player_spawn
 
         self.player_sprite.center_x = spawn_point_x
         self.player_sprite.center_y = spawn_point_y
         self.player_sprite.change_x = 0
         self.player_sprite.change_y = 0
+        if self.bot is not None:
+            self.bot.reset()
 
         # Offsets de spawn para corredores e voadores
         spawn_x_offsets = [100, 250, 400]
         spawn_y_offsets = [0, 50, 100]
 
-        # Lista de tiles de água disponíveis para spawn
-        available_water_spawns = list(self.water_tile_centers)
-        random.shuffle(available_water_spawns)
+        # Tiles de água para spawn, em uma ordem aleatória da geração; o
+        # indivíduo i usa o i-ésimo (tiles distintos para indivíduos distintos)
+        water_spawns = list(self.water_tile_centers)
+        self.stream("spawn").shuffle(water_spawns)
+
+        if individual_ids is None:
+            individual_ids = range(len(traits_list))
+        self.individual_ids = list(individual_ids)
 
-        for i, traits in enumerate(traits_list):
+        for i, traits in zip(individual_ids, traits_list):
             # Não é mais necessário passar o image_path, pois Enemy decide
             # o sprite baseado no tipo de traço.
-            enemy = Enemy(traits, scale=ENEMY_SCALE)
+            enemy = Enemy(traits, scale=ENEMY_SCALE, rng=self.stream(i, "enemy"))
             enemy.set_target(self.player_sprite)
             enemy_type = traits.get("type")
 
             if enemy_type == "swimming":
                 # --- LÓGICA DE SPAWN PARA NADADORES ---
-                if available_water_spawns:
-                    # Usa o próximo ponto de água disponível
-                    water_x, water_y = available_water_spawns.pop(0)
+                if i < len(water_spawns):
+                    # Usa o ponto de água do indivíduo
+                    water_x, water_y = water_spawns[i]
                     enemy.center_x = water_x
 
                     # Spawn ACIMA da água para que o nadador fique sobre a superfície
@@ -766,17 +1166,18 @@ class MyGame(arcade.Window):
                         spawn_point_x + spawn_x_offsets[i % len(spawn_x_offsets)]
                     )
                     enemy.center_y = spawn_point_y + self.tile_size * 3.0
-                    print(
-                        "Aviso: Nadador nasceu em posição padrão devido à falta de tiles de água."
+                    events.emit(
+                        "spawn",
+                        "Aviso: Nadador nasceu em posição padrão devido à falta de tiles de água.",
+                        events.WARNING,
+                        generation=self.level,
+                        x=enemy.center_x,
+                        y=enemy.center_y,
                     )
 
-                # Cria uma lista de colisão apenas com tiles de água para o nadador
-                # (não colide com plataformas regulares)
-                swimmer_collision_list = arcade.SpriteList()
-                for sprite in self.ground_list:
-                    tile_id = sprite.properties.get("tile_id")
-                    if tile_id == SWIM_TILE_ID:
-                        swimmer_collision_list.append(sprite)
+                # Lista de colisão apenas com tiles de água para o nadador
+                # (não colide com plataformas regulares), pré-calculada no nível
+                swimmer_collision_list = self.level_data.water_list
 
                 # Nadadores usam PhysicsEnginePlatformer com apenas tiles de água
                 swimmer_engine = arcade.PhysicsEnginePlatformer(
@@ -784,7 +1185,10 @@ class MyGame(arcade.Window):
                 )
                 self.enemy_physics_engines.append(swimmer_engine)
                 enemy.set_physics_engine(
-                    swimmer_engine, swimmer_collision_list, SWIM_TILE_ID
+                    swimmer_engine,
+                    swimmer_collision_list,
+                    SWIM_TILE_ID,
+                    level=self.level_data,
                 )
 
             else:
@@ -797,10 +1201,12 @@ class MyGame(arcade.Window):
 
                 if enemy_type == "running":
                     runner_engine = arcade.PhysicsEnginePlatformer(
-                        enemy, gravity_constant=GRAVITY, walls=self.ground_list
+                        enemy,
+                        gravity_constant=GRAVITY,
+                        walls=self.level_data.collision_list,
                     )
                     self.enemy_physics_engines.append(runner_engine)
-                    enemy.set_physics_engine(runner_engine)
+                    enemy.set_physics_engine(runner_engine, level=self.level_data)
 
                 # Voador não precisa de motor de física, mas precisa do target
                 # e já tem a lógica de movimento em update_movement
@@ -810,28 +1216,249 @@ class MyGame(arcade.Window):
         # Centraliza a câmera no jogador após o spawn
         self.center_camera_to_player(instant=True)
 
+    def _build_background_list(self):
+        """SpriteList de desenho com os fundos de todas as camadas, em ordem."""
+        backgrounds = arcade.SpriteList()
+        for sprites in self.background_layers.values():
+            backgrounds.extend(sprites)
+        return backgrounds
+
+    def apply_constant_changes(self, changed):
+        """
+        Repassa constantes recarregadas (ver devtools/hot_reload.py) aos objetos
+        vivos. Os valores novos já estão no módulo; `changed` diz quais mudaram.
+        """
+        for enemy in self.enemy_list or ():
+            enemy.apply_traits()
+            if "ENEMY_SCALE" in changed:
+                enemy.scale = ENEMY_SCALE
+
+        if "GRAVITY" in changed:
+            for engine in (self.physics_engine, *self.enemy_physics_engines):
+                if engine is not None:
+                    engine.gravity_constant = GRAVITY
+
+        if "SNAPSHOT_HISTORY" in changed:
+            self.snapshots = deque(self.snapshots, maxlen=SNAPSHOT_HISTORY)
+
+        # O grafo do bot depende da física do player
+        bot_params = {"PLAYER_MOVEMENT_SPEED", "PLAYER_JUMP_FORCE", "GRAVITY"}
+        if self.bot is not None and bot_params & set(changed):
+            self.enable_bot(self.bot.profile)
+
+    def use_level(self, level, map_name):
+        """
+        Passa a simular em outro nível compilado (mapa, colisão, água, spawn e
+        fundos), sem recarregar nada: level e os fundos vêm do cache de níveis.
+        Os inimigos em jogo continuam presos ao nível anterior; chame
+        setup_generation depois para criar a geração no nível novo.
+
+        Args:
+            level: LevelData do mapa
+            map_name: caminho do mapa (chave dos fundos no cache)
+        """
+        self.level_data = level
+        self.map_name = map_name
+        self.tile_map = level.tile_map
+
+        # Dimensões do mapa em pixels (necessárias ANTES de carregar os fundos)
+        self.map_width_pixels = level.map_width_pixels
+        self.map_height_pixels = level.map_height_pixels
+        self.tile_size = level.tile_size
+
+        # Camadas e pontos de spawn de água vêm pré-calculados do LevelData
+        self.ground_list = level.ground_list
+        self.foreground_list = level.foreground_list
+        self.water_tile_centers = level.water_tile_centers
+
+        # Os fundos do cache são compartilhados: reload_level_layers troca
+        # camadas deste dict, então cada simulação guarda a sua cópia
+        if self.load_graphics:
+            self.background_layers = dict(
+                level_cache.backgrounds(
+                    map_name, self.map_width_pixels, load_background_layers
+                )
+            )
+        else:
+            self.background_layers = {}
+        self.background_images = self._build_background_list()
+
+        if self.physics_engine is not None:
+            # O setter de walls do arcade acrescenta listas; limpamos antes
+            self.physics_engine.walls.clear()
+            self.physics_engine.walls = level.collision_list
+        if isinstance(self.bot, BotPlayer):
+            self.enable_bot(self.bot.profile)
+
+    def reload_level_layers(self, tile_layers, image_layers):
+        """
+        Recarrega apenas as camadas alteradas do mapa, mantendo inimigos,
+        traços e estatísticas.
+
+        Args:
+            tile_layers: nomes das camadas de tiles alteradas
+            image_layers: nomes das camadas de imagem (fundos) alteradas
+        """
+        if tile_layers:
+            level = level_cache.get(self.map_name, SWIM_TILE_ID)
+            if COLLISION_LAYER_NAME in tile_layers:
+                # Troca a geometria de colisão nos motores já existentes
+                self.level_data = level
+                self.tile_map = level.tile_map
+                self.ground_list = level.ground_list
+                self.water_tile_centers = level.water_tile_centers
+                # O setter de walls do arcade acrescenta listas; limpamos antes
+                self.physics_engine.walls.clear()
+                self.physics_engine.walls = level.collision_list
+                for enemy in self.enemy_list:
+                    if enemy.physics_engine is None:
+                        continue
+                    enemy.level_data = level
+                    walls = level.collision_list
+                    if enemy.traits.get("type") == "swimming":
+                        walls = enemy.ground_list = level.water_list
+                    enemy.physics_engine.walls.clear()
+                    enemy.physics_engine.walls = walls
+                if self.bot is not None:
+                    self.enable_bot(self.bot.profile)
+            if FOREGROUND_LAYER_NAME in tile_layers:
+                self.foreground_list = level.foreground_list
+
+        if image_layers and self.load_graphics:
+            self.background_layers.update(
+                load_background_layers(
+                    self.map_name, self.map_width_pixels, layer_names=image_layers
+                )
+            )
+            self.background_images = self._build_background_list()
+
+    def retire_enemies(self, enemies):
+        """
+        Tira inimigos da geração em andamento (lista, motores de física,
+        next_generation_traits e snapshots), para que uma volta a snapshot ou
+        um reinício da geração não os recrie. Usado pela avaliação por corrida
+        (ver training/arena.py).
+        """
+        retired = {id(enemy) for enemy in enemies}
+        keep = [
+            i for i, enemy in enumerate(self.enemy_list) if id(enemy) not in retired
+        ]
+        self.individual_ids = [self.individual_ids[i] for i in keep]
+        if len(self.next_generation_traits) == len(self.enemy_list):
+            self.next_generation_traits = [self.next_generation_traits[i] for i in keep]
+        self.snapshots = deque(
+            (
+                SimulationSnapshot(
+                    snapshot.level_time,
+                    snapshot.hit_cooldown,
+                    snapshot.player_state,
+                    tuple(snapshot.enemy_traits[i] for i in keep),
+                    tuple(snapshot.enemy_states[i] for i in keep),
+                )
+                for snapshot in self.snapshots
+            ),
+            maxlen=SNAPSHOT_HISTORY,
+        )
+        for enemy in enemies:
+            if enemy.physics_engine in self.enemy_physics_engines:
+                self.enemy_physics_engines.remove(enemy.physics_engine)
+            enemy.remove_from_sprite_lists()
+
+    def take_snapshot(self) -> SimulationSnapshot:
+        """
+        Captura posições, velocidades, cooldowns, acumuladores de fitness e o
+        estado dos geradores aleatórios dos inimigos da geração em andamento.
+        """
+        player = self.player_sprite
+        return SimulationSnapshot(
+            self.level_time,
+            self.hit_cooldown,
+            (player.center_x, player.center_y, player.change_x, player.change_y),
+            tuple(enemy.traits for enemy in self.enemy_list),
+            tuple(enemy.capture_state() for enemy in self.enemy_list),
+        )
+
+    def restore_snapshot(self, snapshot, traits_list=None, keep_fitness=None):
+        """
+        Volta a simulação ao instante de um snapshot.
+
+        Args:
+            snapshot: obtido com take_snapshot() nesta ou em outra simulação
+                do mesmo nível
+            traits_list: se dado, recria os inimigos com estes traços (mesma
+                quantidade) a partir do estado do snapshot, para avaliar novos
+                genomas a partir de um ponto comum da fase
+            keep_fitness: se False, zera os acumuladores de fitness e de
+                comportamento (hits, proximidade, distância mínima, tempo no
+                ar e na água) após restaurar. Padrão: mantém ao voltar os
+                mesmos genomas e zera com traits_list (genomas novos não
+                herdam o placar dos anteriores)
+        """
+        if keep_fitness is None:
+            keep_fitness = traits_list is None
+        traits_list = traits_list or snapshot.enemy_traits
+        same_enemies = len(traits_list) == len(self.enemy_list) and all(
+            enemy.traits is traits
+            for enemy, traits in zip(self.enemy_list, traits_list)
+        )
+        if not same_enemies:
+            # Recria os inimigos (com os motores de física) e depois aplica o estado
+            snapshots = list(self.snapshots)
+            ids = self.individual_ids
+            self.setup_generation(
+                list(traits_list), ids if len(ids) == len(traits_list) else None
+            )
+            self.snapshots.extend(snapshots)
+
+        player = self.player_sprite
+        (
+            player.center_x,
+            player.center_y,
+            player.change_x,
+            player.change_y,
+        ) = snapshot.player_state
+
+        for enemy, state in zip(self.enemy_list, snapshot.enemy_states):
+            enemy.restore_state(state)
+            if not keep_fitness:
+                enemy.hits = 0
+                enemy.hit_cooldown = 0.0
+                enemy.proximity_score = 0.0
+                enemy.min_distance = float("inf")
+                enemy.airborne_time = 0.0
+                enemy.water_time = 0.0
+
+        self.level_time = snapshot.level_time
+        self.hit_cooldown = snapshot.hit_cooldown
+        self.next_snapshot_time = self.level_time + SNAPSHOT_INTERVAL
+        self.game_state = "PLAYING"
+
     def _crossover_and_mutate(
-        self, parent1_traits: dict, parent2_traits: dict, mutation_rate: float
+        self,
+        parent1_traits: dict,
+        parent2_traits: dict,
+        mutation_rate: float,
+        rng=random,
     ) -> dict:
         """
-        Implementa o Uniform Crossover e aplica Mutação.
+        Implementa o Uniform Crossover e aplica Mutação (com os sorteios de rng,
+        o fluxo do filho).
         Uniform Crossover: para cada traço, 50% chance de vir de parent1, 50% de parent2.
         Isso resulta em melhor mixing dos genes.
         O tipo do inimigo é determinado automaticamente baseado nos traços.
         """
         new_traits = {}
-        trait_keys = ["run", "fly", "jump", "swim"]
 
         # Uniform Crossover: para cada traço, escolhe aleatoriamente de qual parent vem
-        for key in trait_keys:
+        for key in TRAIT_KEYS:
             # 50% de chance de vir de parent1, 50% de parent2
-            if random.random() < 0.5:
+            if rng.random() < 0.5:
                 base_value = parent1_traits.get(key, 1.0)
             else:
                 base_value = parent2_traits.get(key, 1.0)
 
             # Aplica mutação
-            mutation = random.uniform(-mutation_rate, mutation_rate)
+            mutation = rng.uniform(-mutation_rate, mutation_rate)
             new_value = base_value + mutation
 
             # Limita ao intervalo válido
@@ -840,13 +1467,20 @@ class MyGame(arcade.Window):
             new_traits[key] = new_value
 
         # Determina o tipo do inimigo baseado nos traços
-        new_traits["type"] = determine_enemy_type(new_traits)
+        new_traits["type"] = determine_enemy_type(new_traits, rng)
 
         return new_traits
 
     def evolve_enemies(self):
         """
-        Calcula os novos traços baseados no fitness da geração atual (Seleção Elitista).
+        Calcula os novos traços baseados no fitness da geração atual.
+
+        No modo "weighted" (padrão) a seleção é elitista sobre o fitness ponderado.
+        No modo "pareto" o elite é o membro mais isolado da frente não-dominada e
+        os demais pais vêm de torneios binários por rank/aglomeração.
+        No modo "novelty" o elite é o inimigo de comportamento mais novo em relação
+        ao arquivo (e aos demais da população); o cruzamento segue como no
+        "weighted".
         """
 
         old_traits_list = []
@@ -869,27 +1503,76 @@ class MyGame(arcade.Window):
                 max_fitness = fitness
                 elite_enemy = enemy
 
+        pareto_ranks = None
+        if SELECTION_MODE == "pareto":
+            objectives = [enemy.objectives() for enemy in self.enemy_list]
+            pareto_ranks, crowding = rank_population(objectives)
+            elite_index = min(
+                range(len(objectives)),
+                key=lambda i: (pareto_ranks[i], -crowding[i], -fitness_scores[i]),
+            )
+            elite_enemy = self.enemy_list[elite_index]
+            max_fitness = fitness_scores[elite_index]
+
+        novelty_scores = None
+        if SELECTION_MODE == "novelty":
+            # Novidade contra o arquivo e o resto da população; depois os
+            # comportamentos desta geração entram no arquivo
+            descriptors = [
+                enemy.behavior_descriptor(
+                    self.level_time, self.map_width_pixels, self.map_height_pixels
+                )
+                for enemy in self.enemy_list
+            ]
+            novelty_scores = self.novelty_archive.score_population(descriptors)
+            self.novelty_archive.extend(descriptors)
+            elite_index = max(
+                range(len(descriptors)),
+                key=lambda i: (novelty_scores[i], fitness_scores[i]),
+            )
+            elite_enemy = self.enemy_list[elite_index]
+            max_fitness = fitness_scores[elite_index]
+
         elite_traits = elite_enemy.traits.copy()
-        print(f"Elite: {elite_traits['type']} com Fitness: {max_fitness:.2f}")
+        if self.genome_store is not None:
+            elite_index = list(self.enemy_list).index(elite_enemy)
+            self.genome_store.record_elite(
+                self.run_id,
+                self.level,
+                elite_traits,
+                max_fitness,
+                hits=elite_enemy.hits,
+                proximity=elite_enemy.proximity_score,
+                min_distance=elite_enemy.min_distance,
+                novelty=(
+                    novelty_scores[elite_index] if novelty_scores is not None else None
+                ),
+            )
+        events.emit(
+            "elite",
+            "Elite: {type} com Fitness: {fitness:.2f}",
+            generation=self.level,
+            type=elite_traits["type"],
+            fitness=max_fitness,
+            traits=elite_traits,
+        )
 
         # --- SISTEMA DE CHOQUE GENÉTICO ---
-        # Detecta estagnação e aplica mutação mais agressiva
-        self.fitness_history.append(max_fitness)
-        is_stagnating = False
+        # Detecta estagnação e aplica mutação mais agressiva: o fitness máximo
+        # não melhorou nas últimas N gerações (estado mantido incrementalmente)
+        is_stagnating = self.evolution_stats.record_generation(
+            fitness_scores, old_traits_list, self.stagnation_threshold
+        )
         shock_mutation_rate = TRAIT_MUTATION_RATE
 
-        if len(self.fitness_history) >= self.stagnation_threshold + 1:
-            # Verifica se o fitness máximo não melhorou nas últimas N gerações
-            recent_fitness = self.fitness_history[-self.stagnation_threshold :]
-            if all(
-                f <= self.fitness_history[-self.stagnation_threshold - 1]
-                for f in recent_fitness
-            ):
-                is_stagnating = True
-                shock_mutation_rate = (
-                    TRAIT_MUTATION_RATE * self.genetic_shock_multiplier
-                )
-                print(f"CHOQUE GENÉTICO ATIVADO! Mutação: {shock_mutation_rate:.2f}")
+        if is_stagnating:
+            shock_mutation_rate = TRAIT_MUTATION_RATE * self.genetic_shock_multiplier
+            events.emit(
+                "shock",
+                "CHOQUE GENÉTICO ATIVADO! Mutação: {mutation_rate:.2f}",
+                generation=self.level,
+                mutation_rate=shock_mutation_rate,
+            )
 
         # 2. Geração da Nova População (Seleção Elitista com Mutação Adaptativa)
         new_traits_list_ordered = []
@@ -897,10 +1580,19 @@ class MyGame(arcade.Window):
         if is_stagnating:
             elite_mutation_rate = shock_mutation_rate * BEST_ENEMY_MUTATION_FACTOR
 
+        selection_rng = self.stream("selection")
         for i, old_enemy in enumerate(self.enemy_list):
 
             parent1_traits = elite_traits
             parent2_traits = old_enemy.traits.copy()
+            if pareto_ranks is not None and old_enemy is not elite_enemy:
+                # NSGA-II: os dois pais saem de torneios por rank/aglomeração
+                parent1_traits = self.enemy_list[
+                    crowded_tournament(pareto_ranks, crowding, selection_rng)
+                ].traits.copy()
+                parent2_traits = self.enemy_list[
+                    crowded_tournament(pareto_ranks, crowding, selection_rng)
+                ].traits.copy()
 
             if old_enemy is elite_enemy:
                 # O Elite: Mutação Suave (ou com choque se estagnando)
@@ -908,6 +1600,7 @@ class MyGame(arcade.Window):
                     parent1_traits,
                     parent1_traits,
                     elite_mutation_rate,
+                    self.stream(i, "mutation"),
                 )
             else:
                 # Os Filhos: Crossover com o Elite + Mutação Normal (ou com choque)
@@ -918,6 +1611,7 @@ class MyGame(arcade.Window):
                     parent1_traits,
                     parent2_traits,
                     mutation_rate,
+                    self.stream(i, "mutation"),
                 )
 
             new_traits_list_ordered.append(child_traits)
@@ -943,6 +1637,12 @@ class MyGame(arcade.Window):
                     "fitness": fitness_scores[i],
                     "hits": enemy.hits,
                     "proximity": enemy.proximity_score,
+                    "pareto_rank": (
+                        pareto_ranks[i] if pareto_ranks is not None else None
+                    ),
+                    "novelty": (
+                        novelty_scores[i] if novelty_scores is not None else None
+                    ),
                     "old_traits": old_traits_list[i],
                     "new_traits": self.next_generation_traits[i],
                     "is_elite": enemy is elite_enemy,
@@ -952,9 +1652,22 @@ class MyGame(arcade.Window):
                 }
             )
 
+        events.emit(
+            "generation",
+            "Fim da Geração {generation}: melhor {best:.2f}, média {mean:.2f}",
+            generation=self.level,
+            level_time=self.level_time,
+            best=max(fitness_scores),
+            mean=self.evolution_stats.population_mean,
+            elite_type=elite_traits["type"],
+            shock=is_stagnating,
+        )
+
     def simulate_level_end(self):
         """Simula o fim do nível, executa a evolução e entra no estado de resumo."""
         self.evolve_enemies()
+        if self.trace_recorder is not None:
+            self.trace_recorder.end_segment()
         self.level += 1
         self.game_state = "EVOLUTION_SUMMARY"
 
@@ -975,9 +1688,286 @@ class MyGame(arcade.Window):
         elif self.right_pressed and not self.left_pressed:
             self.player_sprite.change_x = PLAYER_MOVEMENT_SPEED
 
+    def enable_bot(self, profile):
+        """Passa o controle do player a um bot com o perfil dado (vazio = humano)."""
+        if profile:
+            self.bot = BotPlayer(
+                self,
+                profile,
+                PLAYER_MOVEMENT_SPEED,
+                PLAYER_JUMP_FORCE,
+                GRAVITY,
+                self.stream("bot"),
+            )
+        else:
+            self.bot = None
+            self.left_pressed = False
+            self.right_pressed = False
+            self.apply_movement()
+
+    def player_jump(self):
+        """Faz o player pular se estiver apoiado no chão."""
+        self.jump_requested = True
+        if self.physics_engine.can_jump():
+            self.player_sprite.change_y = PLAYER_JUMP_FORCE
+
+    def center_camera_to_player(self, instant=False):
+        """Sem câmera na simulação; MyGame sobrescreve para seguir o player."""
+
+    def update_swarms(self):
+        """
+        Calcula a aceleração de enxame (swarm_x, swarm_y) de voadores e
+        nadadores, por tipo, a partir das posições e velocidades deste tick.
+        Tipos em que ninguém tem peso de enxame são pulados.
+        """
+        groups = {enemy_type: [] for enemy_type in SWARM_TYPES}
+        for enemy in self.enemy_list:
+            group = groups.get(enemy.traits.get("type"))
+            if group is not None:
+                group.append(enemy)
+
+        for members in groups.values():
+            if not any(any(enemy.swarm_weights) for enemy in members):
+                for enemy in members:
+                    enemy.swarm_x = enemy.swarm_y = 0.0
+                continue
+            steering = flock_steering(
+                [
+                    (enemy.center_x, enemy.center_y, enemy.change_x, enemy.change_y)
+                    for enemy in members
+                ],
+                SWARM_RADIUS,
+                SWARM_SEPARATION_DISTANCE,
+                SWARM_MAX_NEIGHBOURS,
+            )
+            for enemy, (sep_x, sep_y, align_x, align_y, coh_x, coh_y) in zip(
+                members, steering
+            ):
+                separation, alignment, cohesion = enemy.swarm_weights
+                force_x = separation * sep_x + alignment * align_x + cohesion * coh_x
+                force_y = separation * sep_y + alignment * align_y + cohesion * coh_y
+                scale = SWARM_MAX_FORCE / max(1.0, math.hypot(force_x, force_y))
+                enemy.swarm_x = force_x * scale
+                enemy.swarm_y = force_y * scale
+
+    def update_simulation(self, delta_time):
+        """Avança a simulação em um passo de delta_time segundos."""
+
+        if self.game_state != "PLAYING":
+            return
+
+        self.level_time += delta_time
+
+        if self.bot is not None:
+            self.bot.update(delta_time)
+        if self.trace_recorder is not None:
+            if self.bot is not None:
+                # Só partidas humanas entram na biblioteca de traces
+                self.trace_recorder.discard_segment()
+            else:
+                self.trace_recorder.record(
+                    self.left_pressed,
+                    self.right_pressed,
+                    self.jump_requested,
+                    self.level,
+                )
+        self.jump_requested = False
+        self.physics_engine.update()
+        if self.hit_cooldown > 0:
+            self.hit_cooldown -= delta_time
+
+        # --- Lógica de Inimigos e Rastreamento de Fitness ---
+        if SWARM_ENABLED:
+            self.update_swarms()
+        level = self.level_data
+        for enemy in self.enemy_list:
+            # LOD de IA: inimigos longe do player atualizam em lote ou dormem
+            enemy.lod_skip = AI_LOD_ENABLED and not enemy.lod_update(delta_time)
+
+            if not enemy.lod_skip:
+                enemy.update_movement(delta_time)
+
+                # Aplica movimento para inimigos que não usam PhysicsEnginePlatformer
+                # Isso inclui o nadador e o voador
+                if (
+                    enemy.traits.get("type") == "flying"
+                    or enemy.traits.get("type") == "swimming"
+                ):
+                    if enemy.physics_engine:
+                        # Nadador: o passo livre e o do motor de física juntos
+                        with enemy.swept_motion(moves=2):
+                            enemy.update()
+                    else:
+                        enemy.update()
+
+            # RASTREAMENTO DE FITNESS (a cada tick, inclusive para quem está
+            # dormindo, para a integração da proximidade não perder ticks)
+
+            dx = self.player_sprite.center_x - enemy.center_x
+            dy = self.player_sprite.center_y - enemy.center_y
+            distance = math.sqrt(dx**2 + dy**2)
+
+            proximity_increment = (
+                PROXIMITY_SCORING_CONSTANT / (distance + MIN_DISTANCE_EPSILON)
+            ) * delta_time
+            enemy.proximity_score += proximity_increment
+            if distance < enemy.min_distance:
+                enemy.min_distance = distance
+
+            # Descritor de comportamento: consultas O(1) na grade de tiles (os
+            # nadadores boiam sobre a água, então o tile sob os pés também conta)
+            tile_below = level.tile_at(
+                enemy.center_x, enemy.center_y - enemy.height / 2 - 1
+            )
+            if (
+                tile_below == SWIM_TILE_ID
+                or level.tile_at(enemy.center_x, enemy.center_y) == SWIM_TILE_ID
+            ):
+                enemy.water_time += delta_time
+            elif tile_below == EMPTY_TILE:
+                enemy.airborne_time += delta_time
+
+            # Hits (Colisão simplificada)
+            if self.per_enemy_hit_cooldown:
+                if enemy.hit_cooldown > 0:
+                    enemy.hit_cooldown -= delta_time
+                if distance < HIT_SCORE_THRESHOLD and enemy.hit_cooldown <= 0:
+                    enemy.hits += 1
+                    enemy.hit_cooldown = self.HIT_COOLDOWN_TIME
+            elif distance < HIT_SCORE_THRESHOLD and self.hit_cooldown <= 0:
+                enemy.hits += 1
+                self.hit_cooldown = self.HIT_COOLDOWN_TIME
+
+        # Aplica movimento e física para inimigos que usam PhysicsEnginePlatformer (Runners)
+        for enemy in self.enemy_list:
+            if enemy.physics_engine and not enemy.lod_skip:
+                with enemy.swept_motion():
+                    enemy.physics_engine.update()
+
+        # A CÂMERA DEVE SEGUIR O JOGADOR A CADA FRAME
+        self.center_camera_to_player()
+
+        # Se o player cair do mapa, volta ao snapshot mais recente (cada um é
+        # usado uma vez); sem snapshots, reseta a geração (não evolui)
+        if self.player_sprite.center_y < -100:
+            if self.snapshots:
+                events.emit(
+                    "player_reset",
+                    "Player caiu. Voltando a t={restored_time:.1f}s da Geração {generation}.",
+                    generation=self.level,
+                    level_time=self.level_time,
+                    restored_time=self.snapshots[-1].level_time,
+                )
+                self.restore_snapshot(self.snapshots.pop())
+            else:
+                events.emit(
+                    "player_reset",
+                    "Player caiu. Reiniciando Geração {generation} com os mesmos traços.",
+                    generation=self.level,
+                    level_time=self.level_time,
+                    restored_time=0.0,
+                )
+                self.setup_generation(
+                    self.next_generation_traits, self.individual_ids
+                )
+                self.hit_cooldown = 0.0
+            return
+
+        # Snapshot automático periódico, só com o player apoiado no chão
+        if self.level_time >= self.next_snapshot_time:
+            if self.physics_engine.can_jump():
+                self.snapshots.append(self.take_snapshot())
+                self.next_snapshot_time = self.level_time + SNAPSHOT_INTERVAL
+
+
+class MyGame(GameSimulation, arcade.Window):
+    """
+    Classe Principal do Jogo - Gerencia o Player, Inimigos Evolutivos e Estados de Jogo.
+    """
+
+    def __init__(self, width=SCREEN_WIDTH, height=SCREEN_HEIGHT, title=SCREEN_TITLE):
+        # Usamos as dimensões fixas da tela para o GUI
+        arcade.Window.__init__(self, width, height, title)
+        GameSimulation.__init__(self)
+
+        # Inicializa câmeras
+        screen_rect = arcade.LRBT(0, width, 0, height)
+        self.camera = arcade.camera.Camera2D(viewport=screen_rect)
+        self.gui_camera = arcade.camera.Camera2D(viewport=screen_rect)
+
+        # --- APLICA O ZOOM NO MUNDO DO JOGO ---
+        self.camera.zoom = CAMERA_ZOOM
+
+        # Relógio de passo fixo e estado anterior para interpolar o desenho
+        self.simulation_step = 1.0 / SIMULATION_TICK_RATE
+        self.simulation_accumulator = 0.0
+        self.render_alpha = 1.0
+        self.interpolated_sprites = []
+        self.previous_positions = []
+
+        # Capturas de tela e gravação, sem travar o desenho
+        self.capture = FrameCapture(CAPTURE_DIR, CAPTURE_EVERY, CAPTURE_VIDEO)
+
+        # Camadas estáticas em blocos e as listas de onde vieram (ver
+        # static_layers)
+        self.chunked_layers = []
+        self.chunk_sources = None
+
+        # Recarga a quente do mapa e das constantes (ver devtools/hot_reload.py)
+        self.hot_reloader = HotReloader(self) if HOT_RELOAD_ENABLED else None
+
+    def on_close(self):
+        """Libera a captura enquanto o contexto OpenGL ainda existe."""
+        try:
+            self.capture.close()
+        finally:
+            super().on_close()
+
+    def on_resize(self, width: float, height: float):
+        """
+        Chamado quando a janela é redimensionada.
+        Ajusta as câmeras para o novo tamanho e reafirma o zoom.
+        """
+        super().on_resize(width, height)
+        # Reaplicamos o zoom após redimensionar para manter a proximidade
+        self.camera.zoom = CAMERA_ZOOM
+
+    def apply_constant_changes(self, changed):
+        """Além da simulação, reaplica as constantes de câmera, cor e relógio."""
+        super().apply_constant_changes(changed)
+        self.camera.zoom = CAMERA_ZOOM
+        arcade.set_background_color(BACKGROUND_COLOR)
+        self.simulation_step = 1.0 / SIMULATION_TICK_RATE
+
+    def static_layers(self) -> list:
+        """
+        Fundos (uma camada por vez, para manter a ordem entre elas), chão e frente
+        divididos em blocos. Refeitos quando alguma lista de origem é trocada
+        (nível novo, recarga a quente do mapa).
+        """
+        sources = (self.background_images, self.ground_list, self.foreground_list)
+        if self.chunk_sources is None or any(
+            old is not new for old, new in zip(self.chunk_sources, sources)
+        ):
+            layers = list(self.background_layers.values())
+            layers += [sprites for sprites in sources[1:] if sprites]
+            self.chunked_layers = [ChunkedLayer(sprites) for sprites in layers]
+            self.chunk_sources = sources
+        return self.chunked_layers
+
     def on_key_press(self, key, modifiers):
         """Atualiza o estado da tecla pressionada, recalcula o movimento e trata eventos de jogo."""
 
+        if key == arcade.key.F12:
+            self.capture.screenshot()
+            return
+        if key == arcade.key.F10:
+            if self.capture.recording:
+                self.capture.stop_recording()
+            else:
+                self.capture.start_recording()
+            return
+
         if self.game_state == "EVOLUTION_SUMMARY":
             if key == arcade.key.ENTER:
                 self.continue_to_next_generation()
@@ -988,8 +1978,7 @@ class MyGame(arcade.Window):
         elif key == arcade.key.RIGHT:
             self.right_pressed = True
         elif key == arcade.key.UP or key == arcade.key.SPACE:
-            if self.physics_engine.can_jump():
-                self.player_sprite.change_y = PLAYER_JUMP_FORCE
+            self.player_jump()
 
         elif key == arcade.key.G:
             self.show_fitness_logs = not self.show_fitness_logs
@@ -997,6 +1986,9 @@ class MyGame(arcade.Window):
         elif key == arcade.key.KEY_0:
             self.simulate_level_end()
 
+        elif key == arcade.key.B:
+            self.enable_bot(None if self.bot else BOT_PROFILE or "runner")
+
         self.apply_movement()
 
     def on_key_release(self, key, modifiers):
@@ -1037,64 +2029,64 @@ class MyGame(arcade.Window):
         screen_center_x = max(0, screen_center_x)
         screen_center_y = max(0, screen_center_y)
 
-        # Move a câmera instantaneamente para a nova posição (requerido pelo usuário)
-        # O argumento instant=True não é usado aqui, mas manteremos o parâmetro
-        # para referência futura se quisermos movimento suave.
-        self.camera.position = self.player_sprite.position
+        # Com interpolação a câmera é posicionada em on_draw (na posição
+        # interpolada do player); aqui só nos reposicionamentos instantâneos
+        if instant or not RENDER_INTERPOLATION:
+            self.camera.position = self.player_sprite.position
 
     def on_update(self, delta_time):
-        """Lógica de atualização a cada frame."""
-
-        if self.game_state != "PLAYING":
-            return
-
-        self.level_time += delta_time
-
-        self.physics_engine.update()
-        if self.hit_cooldown > 0:
-            self.hit_cooldown -= delta_time
-
-        # --- Lógica de Inimigos e Rastreamento de Fitness ---
-        for enemy in self.enemy_list:
-            enemy.update_movement(delta_time)
+        """
+        Acumula o tempo do quadro e avança a simulação em passos fixos de
+        1/SIMULATION_TICK_RATE; a sobra vira a fração de interpolação do desenho.
+        """
+        if self.hot_reloader is not None:
+            self.hot_reloader.poll(delta_time)
+
+        step = self.simulation_step
+        self.simulation_accumulator += delta_time
+        steps = 0
+        while self.simulation_accumulator >= step:
+            if steps == MAX_SIMULATION_STEPS_PER_FRAME:
+                # Quadro muito lento: descarta o atraso em vez de acumulá-lo
+                self.simulation_accumulator = 0.0
+                break
+            self.store_previous_positions()
+            self.update_simulation(step)
+            self.simulation_accumulator -= step
+            steps += 1
+        self.render_alpha = self.simulation_accumulator / step
+
+    def store_previous_positions(self):
+        """Guarda as posições antes de um passo (base da interpolação)."""
+        self.interpolated_sprites = [self.player_sprite, *self.enemy_list]
+        self.previous_positions = [
+            sprite.position for sprite in self.interpolated_sprites
+        ]
 
-            # Aplica movimento para inimigos que não usam PhysicsEnginePlatformer
-            # Isso inclui o nadador e o voador
+    def apply_interpolated_positions(self) -> list:
+        """
+        Move os sprites para prev + (atual - prev) * render_alpha e devolve as
+        posições atuais, para restore_simulation_positions() depois do desenho.
+        """
+        current = [sprite.position for sprite in self.interpolated_sprites]
+        alpha = self.render_alpha
+        for sprite, (prev_x, prev_y), (x, y) in zip(
+            self.interpolated_sprites, self.previous_positions, current
+        ):
             if (
-                enemy.traits.get("type") == "flying"
-                or enemy.traits.get("type") == "swimming"
+                abs(x - prev_x) > INTERPOLATION_SNAP_DISTANCE
+                or abs(y - prev_y) > INTERPOLATION_SNAP_DISTANCE
             ):
-                enemy.update()
-
-            # RASTREAMENTO DE FITNESS
-            dx = self.player_sprite.center_x - enemy.center_x
-            dy = self.player_sprite.center_y - enemy.center_y
-            distance = math.sqrt(dx**2 + dy**2)
-
-            proximity_increment = (
-                PROXIMITY_SCORING_CONSTANT / (distance + MIN_DISTANCE_EPSILON)
-            ) * delta_time
-            enemy.proximity_score += proximity_increment
-
-            # Hits (Colisão simplificada)
-            if distance < HIT_SCORE_THRESHOLD and self.hit_cooldown <= 0:
-                enemy.hits += 1
-                self.hit_cooldown = self.HIT_COOLDOWN_TIME
-
-        # Aplica movimento e física para inimigos que usam PhysicsEnginePlatformer (Runners)
-        for engine in self.enemy_physics_engines:
-            engine.update()
-
-        # A CÂMERA DEVE SEGUIR O JOGADOR A CADA FRAME
-        self.center_camera_to_player()
-
-        # Se o player cair do mapa, reseta a geração (não evolui)
-        if self.player_sprite.center_y < -100:
-            print(
-                f"Player caiu. Reiniciando Geração {self.level} com os mesmos traços."
+                continue
+            sprite.position = (
+                prev_x + (x - prev_x) * alpha,
+                prev_y + (y - prev_y) * alpha,
             )
-            self.setup_generation(self.next_generation_traits)
-            self.hit_cooldown = 0.0
+        return current
+
+    def restore_simulation_positions(self, positions):
+        for sprite, position in zip(self.interpolated_sprites, positions):
+            sprite.position = position
 
     def _get_trait_color(self, new_value, old_value):
         """Retorna a cor baseada na mudança de valor do traço (Melhorou=Verde, Piorou=Vermelho)."""
@@ -1146,21 +2138,17 @@ class MyGame(arcade.Window):
         )
 
         # Indicador de Choque Genético
-        if len(self.fitness_history) >= self.stagnation_threshold + 1:
-            recent_fitness = self.fitness_history[-self.stagnation_threshold :]
-            if all(
-                f <= self.fitness_history[-self.stagnation_threshold - 1]
-                for f in recent_fitness
-            ):
-                arcade.draw_text(
-                    "CHOQUE GENÉTICO ATIVO",
-                    center_x,
-                    screen_height - 140,
-                    arcade.color.RED,
-                    16,
-                    anchor_x="center",
-                    bold=True,
-                )
+        stats = self.evolution_stats
+        if stats.is_stagnating:
+            arcade.draw_text(
+                "CHOQUE GENÉTICO ATIVO",
+                center_x,
+                screen_height - 140,
+                arcade.color.RED,
+                16,
+                anchor_x="center",
+                bold=True,
+            )
 
         # ------------------- TABELA DE DADOS -------------------
 
@@ -1350,6 +2338,27 @@ class MyGame(arcade.Window):
                 anchor_x="left",
             )
 
+        # ------------------- ESTATÍSTICAS DA POPULAÇÃO -------------------
+
+        percentiles = stats.fitness_percentiles
+        diversity = stats.trait_diversity
+        arcade.draw_text(
+            f"Melhor (histórico): {stats.best_ever:.1f} | "
+            f"Média: {stats.population_mean:.1f} | "
+            f"P50: {percentiles.get(50, 0.0):.1f} | "
+            f"P90: {percentiles.get(90, 0.0):.1f} | "
+            "Diversidade (σ) R/F/J/S: "
+            + "/".join(
+                f"{diversity.get(key, 0.0):.2f}"
+                for key in ("run", "fly", "jump", "swim")
+            ),
+            center_x,
+            95,
+            arcade.color.LIGHT_GRAY,
+            13,
+            anchor_x="center",
+        )
+
         # ------------------- INSTRUÇÃO DE CONTINUIDADE -------------------
 
         arcade.draw_text(
@@ -1365,21 +2374,45 @@ class MyGame(arcade.Window):
         """Renderiza a tela."""
         self.clear()
 
+        # Posições interpoladas entre os dois últimos passos da simulação; os
+        # sprites de uma geração recém-criada (lista trocada) não interpolam
+        interpolate = (
+            RENDER_INTERPOLATION
+            and self.game_state == "PLAYING"
+            and len(self.interpolated_sprites) == len(self.enemy_list) + 1
+            and self.interpolated_sprites[0] is self.player_sprite
+            and all(
+                a is b for a, b in zip(self.interpolated_sprites[1:], self.enemy_list)
+            )
+        )
+        if interpolate:
+            simulation_positions = self.apply_interpolated_positions()
+        if RENDER_INTERPOLATION:
+            self.camera.position = self.player_sprite.position
+
         # 1. Desenhar o MUNDO DO JOGO (mapa, player, inimigos) usando a CAMERA
         self.camera.use()
 
-        # Desenha as imagens de fundo estáticas
-        self.background_images.draw()
+        # Desenha as camadas estáticas: fundos, chão e frente
+        if CHUNKED_STATIC_LAYERS:
+            view = camera_view(self.camera)
+            for layer in self.static_layers():
+                layer.draw(view)
+        else:
+            self.background_images.draw()
 
-        if self.ground_list:
-            self.ground_list.draw()
+            if self.ground_list:
+                self.ground_list.draw()
 
-        if self.foreground_list:
-            self.foreground_list.draw()
+            if self.foreground_list:
+                self.foreground_list.draw()
 
         self.player_list.draw()
         self.enemy_list.draw()
 
+        if interpolate:
+            self.restore_simulation_positions(simulation_positions)
+
         # 2. Desenhar o HUD/GUI (texto, placar) usando a GUI_CAMERA para fixar na tela
         self.gui_camera.use()
 
@@ -1432,8 +2465,69 @@ class MyGame(arcade.Window):
         if self.game_state == "EVOLUTION_SUMMARY":
             self.draw_evolution_summary()
 
+        # Captura o frame pronto (leitura assíncrona; ver render/capture.py)
+        self.capture.on_frame(self)
+
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=SCREEN_TITLE)
+    parser.add_argument(
+        "--genome-db", default=GENOME_DB_PATH, help="Banco SQLite dos elites"
+    )
+    parser.add_argument(
+        "--seed-from-db",
+        action="store_true",
+        help="Começa dos melhores genomas do banco em vez dos traços padrão",
+    )
+    parser.add_argument(
+        "--seed-type", default=None, help="Filtra a semente por tipo (ex.: swimming)"
+    )
+    parser.add_argument(
+        "--seed-where",
+        action="append",
+        default=[],
+        type=parse_condition,
+        help="Filtro por traço, ex.: 'jump>3' (pode repetir)",
+    )
+    parser.add_argument(
+        "--record-trace",
+        action="store_true",
+        help=f"Grava a entrada do player em {TRACE_DIR}/ (replay headless)",
+    )
+    parser.add_argument(
+        "--record",
+        action="store_true",
+        help=f"Grava a sessão em {CAPTURE_DIR}/ desde o início (F10 liga/desliga)",
+    )
+    args = parser.parse_args()
+
+    events.configure(sink_path=EVENT_LOG_PATH)
+    genome_store = GenomeStore(args.genome_db)
     window = MyGame(SCREEN_WIDTH, SCREEN_HEIGHT, SCREEN_TITLE)
+    if args.seed_from_db or args.seed_type or args.seed_where:
+        if not window.seed_from_genome_store(
+            genome_store, enemy_type=args.seed_type, conditions=args.seed_where
+        ):
+            print("Nenhum genoma do banco satisfaz a consulta. Usando traços padrão.")
+    window.attach_genome_store(genome_store)
+    if TRACE_RECORDING or args.record_trace:
+        window.trace_recorder = TraceRecorder(
+            os.path.join(TRACE_DIR, time.strftime("session-%Y%m%d-%H%M%S.trace")),
+            SIMULATION_TICK_RATE,
+            MAP_NAME,
+        )
     window.setup()
-    arcade.run()
+    if args.record:
+        window.capture.start_recording()
+    try:
+        arcade.run()
+    finally:
+        # Cada limpeza roda mesmo se a anterior falhar
+        try:
+            window.capture.close()  # Normalmente já fechada em on_close
+        finally:
+            try:
+                if window.trace_recorder is not None:
+                    window.trace_recorder.close()
+            finally:
+                genome_store.close()
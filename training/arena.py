@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+"""
+Simulação em lote de várias arenas independentes em um único processo.
+
+Cada arena é uma GameSimulation headless com o seu próprio player e o seu
+subconjunto de inimigos; todas compartilham o mesmo LevelData (grade de tiles, geometria de colisão e tabelas de spawn),
+carregado uma única vez. Avaliar N genomas custa um carregamento de mapa e um
+laço de atualização, em vez de N jogos completos.
+
+evaluate_maps() repete a avaliação em vários mapas: os níveis compilados vêm do
+cache do processo (world/cache.py), então trocar de mapa só troca referências.
+"""
+import teste
+from evolution.racing import RACING_CHECKPOINT_INTERVAL, Race
+from training.headless import SIMULATION_DELTA_TIME
+from training.traces import TraceReplayer
+from world.cache import level_cache
+
+
+class ArenaRunner:
+    """
+    Executa K arenas lado a lado sobre um nível compartilhado somente leitura.
+
+    Args:
+        arena_count: número de arenas (K)
+        level: LevelData compartilhado; se None, teste.MAP_NAME (do cache)
+        seed: semente da execução, comum a todas as arenas: cada genoma usa o
+            fluxo aleatório do seu índice em traits_list (evolution/rng.py),
+            então o resultado não depende da arena em que ele caiu; pelo mesmo
+            motivo o cooldown de hit é de cada inimigo, e não da arena
+            (GameSimulation.per_enemy_hit_cooldown)
+    """
+
+    def __init__(self, arena_count, level=None, seed=0):
+        self.level = level or level_cache.get(teste.MAP_NAME, teste.SWIM_TILE_ID)
+        self.arenas = []
+        for _ in range(arena_count):
+            arena = teste.GameSimulation(load_graphics=False, seed=seed)
+            arena.per_enemy_hit_cooldown = True
+            # Nenhuma geração é criada ainda: evaluate() distribui os genomas
+            arena.next_generation_traits = []
+            arena.setup(level=self.level)
+            self.arenas.append(arena)
+
+    def evaluate(
+        self,
+        traits_list,
+        duration,
+        delta_time=SIMULATION_DELTA_TIME,
+        race_keep=None,
+        checkpoint_interval=RACING_CHECKPOINT_INTERVAL,
+        trace_segment=None,
+        individual_ids=None,
+    ):
+        """
+        Avalia os genomas de traits_list durante `duration` segundos simulados.
+
+        Os genomas são distribuídos em rodízio entre as arenas e todas as arenas
+        avançam no mesmo laço.
+
+        Com race_keep (k), a avaliação é uma corrida (ver evolution/racing.py):
+        a cada checkpoint_interval segundos os genomas que estatisticamente não
+        alcançam o top-k param de ser simulados, com o fitness congelado, e uma
+        arena sem genomas restantes para de rodar.
+
+        Com trace_segment (ver training/traces.py), o player de todas as arenas
+        repete a entrada gravada de uma sessão humana; duration None = a
+        duração do segmento (delta_time deve ser 1 / tick_rate do trace).
+
+        individual_ids (padrão: a posição em traits_list) identifica cada genoma
+        para o spawn e os fluxos aleatórios; um lote de uma população maior
+        passa os índices globais e dá o mesmo resultado da população inteira.
+
+        Retorna:
+            Uma lista alinhada com traits_list com os componentes de fitness de
+            cada genoma (fitness, hits, proximity, min_distance, tempos no ar e
+            na água, posição final, arena) e o tempo simulado (evaluated_time,
+            menor que duration se eliminado).
+        """
+        assignments = [[] for _ in self.arenas]
+        for index, traits in enumerate(traits_list):
+            assignments[index % len(self.arenas)].append(index)
+
+        if individual_ids is None:
+            individual_ids = range(len(traits_list))
+        if duration is None:
+            duration = len(trace_segment) * delta_time
+        previous_bots = [arena.bot for arena in self.arenas]
+
+        active = []
+        for arena, indices in zip(self.arenas, assignments):
+            # next_generation_traits é o que a arena recria se o player cair
+            arena.next_generation_traits = [traits_list[i] for i in indices]
+            arena.setup_generation(
+                arena.next_generation_traits, [individual_ids[i] for i in indices]
+            )
+            arena.hit_cooldown = 0.0
+            if trace_segment is not None:
+                arena.bot = TraceReplayer(arena, trace_segment)
+            if indices:
+                active.append(arena)
+
+        results = [None] * len(traits_list)
+        race = Race(len(traits_list), race_keep) if race_keep else None
+        checkpoint_steps = max(1, int(round(checkpoint_interval / delta_time)))
+
+        steps = int(round(duration / delta_time))
+        for step in range(1, steps + 1):
+            for arena in active:
+                arena.update_simulation(delta_time)
+
+            if race is not None and step % checkpoint_steps == 0 and step < steps:
+                elapsed = step * delta_time
+                running = self._running_enemies(assignments)
+                scores = {
+                    index: enemy.calculate_final_fitness()
+                    for index, (_, enemy) in running.items()
+                }
+                for index in race.checkpoint(scores, elapsed, duration):
+                    arena_index, enemy = running[index]
+                    results[index] = self._result(enemy, arena_index, elapsed)
+                    self.arenas[arena_index].retire_enemies([enemy])
+                    assignments[arena_index].remove(index)
+                active = [
+                    arena
+                    for arena, indices in zip(self.arenas, assignments)
+                    if indices
+                ]
+
+        for index, (arena_index, enemy) in self._running_enemies(assignments).items():
+            results[index] = self._result(enemy, arena_index, duration)
+        for arena, bot in zip(self.arenas, previous_bots):
+            arena.bot = bot
+        return results
+
+    def evaluate_maps(self, traits_list, duration, map_names=None, **options):
+        """
+        Avalia traits_list em cada mapa de map_names (padrão teste.MAP_NAMES) e
+        agrega o fitness por genoma. Os demais argumentos são os de evaluate().
+
+        Retorna:
+            Uma lista alinhada com traits_list com o fitness médio entre os
+            mapas (fitness), o pior mapa (worst_fitness) e o resultado completo
+            de cada mapa (maps: caminho -> resultado de evaluate).
+        """
+        map_names = list(map_names or teste.MAP_NAMES)
+        per_map = {}
+        for map_name in map_names:
+            level = level_cache.get(map_name, teste.SWIM_TILE_ID)
+            for arena in self.arenas:
+                arena.use_level(level, map_name)
+            per_map[map_name] = self.evaluate(traits_list, duration, **options)
+        self.level = self.arenas[0].level_data if self.arenas else self.level
+
+        results = []
+        for index in range(len(traits_list)):
+            maps = {name: per_map[name][index] for name in map_names}
+            scores = [result["fitness"] for result in maps.values()]
+            results.append(
+                {
+                    "fitness": sum(scores) / len(scores),
+                    "worst_fitness": min(scores),
+                    "maps": maps,
+                }
+            )
+        return results
+
+    def _running_enemies(self, assignments):
+        """Índice do genoma -> (arena, inimigo) dos genomas ainda em avaliação."""
+        running = {}
+        for arena_index, (arena, indices) in enumerate(
+            zip(self.arenas, assignments)
+        ):
+            for index, enemy in zip(indices, arena.enemy_list):
+                running[index] = (arena_index, enemy)
+        return running
+
+    @staticmethod
+    def _result(enemy, arena_index, evaluated_time):
+        return {
+            "fitness": enemy.calculate_final_fitness(),
+            "hits": enemy.hits,
+            "proximity": enemy.proximity_score,
+            "min_distance": enemy.min_distance,
+            "airborne_time": enemy.airborne_time,
+            "water_time": enemy.water_time,
+            "position": (enemy.center_x, enemy.center_y),
+            "arena": arena_index,
+            "evaluated_time": evaluated_time,
+        }
@@ -0,0 +1,664 @@
+# -*- coding: utf-8 -*-
+"""
+Avaliação distribuída: um coordenador e workers em outras máquinas, via TCP.
+
+O coordenador é dono da população e do laço evolutivo (uma GameSimulation
+headless: evolve_enemies, choque genético, banco de genomas), mas não simula.
+Cada geração é dividida em lotes de genomas que os workers puxam pela rede,
+simulam com ArenaRunner e devolvem como componentes de fitness (acertos,
+proximidade, distância mínima, tempos no ar e na água, posição final).
+
+Os workers não guardam estado entre lotes: o lote leva a semente, a geração, o
+índice global de cada genoma, o número de arenas e os parâmetros do treino,
+então o resultado não depende do worker que o avaliou (ver evolution/rng.py) e
+um lote perdido pode ser refeito em qualquer outro.
+
+Protocolo: mensagens [tipo: u8][tamanho: u32][corpo], em big-endian.
+    HELLO      worker -> coord   PROTOCOL_MAGIC + nome do worker
+    READY      worker -> coord   pede um lote
+    JOB        coord -> worker   lote (ver encode_job)
+    RESULT     worker -> coord   componentes por genoma (ver encode_result)
+    HEARTBEAT  worker -> coord   a cada HEARTBEAT_INTERVAL, inclusive simulando
+    SHUTDOWN   coord -> worker   fim do treino
+
+Um worker em silêncio por HEARTBEAT_TIMEOUT segundos (ou cuja conexão cai) é
+dado como perdido e o lote que ele avaliava volta para o início da fila.
+
+Uso (coordenador e 4 workers locais, para testar numa máquina só):
+    python -m training.distributed coordinator --generations 20 --local-workers 4
+
+Workers em outras máquinas:
+    python -m training.distributed worker --host 10.0.0.5
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import socket
+import struct
+import threading
+import time
+from collections import deque
+
+import teste
+from diagnostics import events
+from training.arena import ArenaRunner
+from training.headless import (
+    GENERATION_TIME,
+    SIMULATION_DELTA_TIME,
+    apply_results,
+    create_game,
+    generation_record,
+    override_constants,
+)
+from world.cache import level_cache
+
+DEFAULT_PORT = 5577
+BATCH_SIZE = 8  # Genomas por lote
+BATCH_ARENAS = 4  # Arenas em que um lote é distribuído (ArenaRunner)
+HEARTBEAT_INTERVAL = 2.0  # Segundos entre heartbeats do worker
+HEARTBEAT_TIMEOUT = 10.0  # Silêncio até o worker ser dado como perdido
+CONNECT_TIMEOUT = 30.0  # Tempo que o worker espera o coordenador subir
+MAX_MESSAGE_SIZE = 16 * 1024 * 1024  # Corpo maior = conexão corrompida
+
+PROTOCOL_MAGIC = b"EVD2"
+
+MSG_HELLO = 1
+MSG_READY = 2
+MSG_JOB = 3
+MSG_RESULT = 4
+MSG_HEARTBEAT = 5
+MSG_SHUTDOWN = 6
+
+_HEADER = struct.Struct("!BI")
+# lote, geração, semente, arenas, duração, passo, race_keep (0 = sem corrida)
+_JOB = struct.Struct("!IIqHddH")
+_GENOME = struct.Struct(f"!I{len(teste.TRAIT_KEYS)}d")  # índice e TRAIT_KEYS
+_RESULT = struct.Struct("!IH")  # lote, genomas
+_COMPONENTS = struct.Struct("!Ii6d")  # índice, acertos e os componentes float
+_COUNT = struct.Struct("!H")
+
+
+# --- Formato de fio ---
+
+
+def send_message(sock, kind, body=b""):
+    sock.sendall(_HEADER.pack(kind, len(body)) + body)
+
+
+def recv_message(sock):
+    """Lê uma mensagem inteira; ConnectionError se a conexão fechar no meio."""
+    kind, size = _HEADER.unpack(_recv_exact(sock, _HEADER.size))
+    if size > MAX_MESSAGE_SIZE:
+        raise ConnectionError(f"Mensagem grande demais ({size} bytes)")
+    return kind, _recv_exact(sock, size)
+
+
+def _recv_exact(sock, size):
+    data = bytearray()
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("Conexão fechada")
+        data += chunk
+    return bytes(data)
+
+
+def _pack_text(text):
+    data = text.encode("utf-8")
+    return _COUNT.pack(len(data)) + data
+
+
+def _unpack_text(body, position):
+    (size,) = _COUNT.unpack_from(body, position)
+    position += _COUNT.size
+    return body[position : position + size].decode("utf-8"), position + size
+
+
+def encode_job(
+    batch_id,
+    generation,
+    seed,
+    arena_count,
+    duration,
+    delta_time,
+    map_name,
+    params,
+    genomes,
+    race_keep=None,
+) -> bytes:
+    """
+    Corpo de um JOB.
+
+    Args:
+        genomes: lista de (índice global, traços)
+        params: constantes do treino (dict), aplicadas no worker
+        race_keep: avalia o lote por corrida (ver ArenaRunner.evaluate)
+    """
+    parts = [
+        _JOB.pack(
+            batch_id,
+            generation,
+            seed,
+            arena_count,
+            duration,
+            delta_time,
+            race_keep or 0,
+        ),
+        _pack_text(map_name),
+        _pack_text(json.dumps(params or {}, sort_keys=True)),
+        _COUNT.pack(len(genomes)),
+    ]
+    for index, traits in genomes:
+        parts.append(
+            _GENOME.pack(index, *(traits.get(key, 1.0) for key in teste.TRAIT_KEYS))
+        )
+        parts.append(_pack_text(traits["type"]))
+    return b"".join(parts)
+
+
+def decode_job(body) -> dict:
+    (
+        batch_id,
+        generation,
+        seed,
+        arena_count,
+        duration,
+        delta_time,
+        race_keep,
+    ) = _JOB.unpack_from(body)
+    map_name, position = _unpack_text(body, _JOB.size)
+    params, position = _unpack_text(body, position)
+    (count,) = _COUNT.unpack_from(body, position)
+    position += _COUNT.size
+    genomes = []
+    for _ in range(count):
+        index, *values = _GENOME.unpack_from(body, position)
+        enemy_type, position = _unpack_text(body, position + _GENOME.size)
+        traits = dict(zip(teste.TRAIT_KEYS, values))
+        traits["type"] = enemy_type
+        genomes.append((index, traits))
+    return {
+        "batch_id": batch_id,
+        "generation": generation,
+        "seed": seed,
+        "arena_count": arena_count,
+        "duration": duration,
+        "delta_time": delta_time,
+        "race_keep": race_keep or None,
+        "map_name": map_name,
+        "params": json.loads(params),
+        "genomes": genomes,
+    }
+
+
+def encode_result(batch_id, results) -> bytes:
+    """Corpo de um RESULT; results é uma lista de (índice global, componentes)."""
+    parts = [_RESULT.pack(batch_id, len(results))]
+    for index, result in results:
+        parts.append(
+            _COMPONENTS.pack(
+                index,
+                result["hits"],
+                result["proximity"],
+                result["min_distance"],
+                result["airborne_time"],
+                result["water_time"],
+                *result["position"],
+            )
+        )
+    return b"".join(parts)
+
+
+def decode_result(body):
+    batch_id, count = _RESULT.unpack_from(body)
+    results = []
+    end = _RESULT.size + count * _COMPONENTS.size
+    for position in range(_RESULT.size, end, _COMPONENTS.size):
+        index, hits, proximity, min_distance, airborne, water, x, y = (
+            _COMPONENTS.unpack_from(body, position)
+        )
+        results.append(
+            (
+                index,
+                {
+                    "hits": hits,
+                    "proximity": proximity,
+                    "min_distance": min_distance,
+                    "airborne_time": airborne,
+                    "water_time": water,
+                    "position": (x, y),
+                },
+            )
+        )
+    return batch_id, results
+
+
+# --- Coordenador ---
+
+
+class Coordinator:
+    """
+    Servidor que reparte lotes de genomas entre os workers conectados.
+
+    Cada conexão tem uma thread: ela entrega um lote a cada READY, guarda o
+    RESULT e, se o worker some (timeout de heartbeat ou conexão fechada),
+    devolve o lote em andamento para a fila.
+
+    Args:
+        host, port: endereço de escuta (port 0 = porta livre, ver address)
+        batch_size: genomas por lote
+        heartbeat_timeout: silêncio até um worker ser dado como perdido
+    """
+
+    def __init__(
+        self,
+        host="0.0.0.0",
+        port=DEFAULT_PORT,
+        batch_size=BATCH_SIZE,
+        heartbeat_timeout=HEARTBEAT_TIMEOUT,
+    ):
+        self.batch_size = batch_size
+        self.heartbeat_timeout = heartbeat_timeout
+        self.workers = set()  # Nomes dos workers conectados
+        self.redispatched = 0  # Lotes devolvidos à fila por perda de worker
+
+        self._condition = threading.Condition()
+        self._pending = deque()  # Lotes à espera de um worker
+        self._jobs = {}  # Lote -> corpo do JOB
+        self._results = {}  # Lote -> [(índice, componentes)]
+        self._next_batch = 0
+        self._closed = False
+
+        self._server = socket.create_server((host, port))
+        self.address = self._server.getsockname()
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+
+    def evaluate(
+        self,
+        traits_list,
+        duration,
+        delta_time,
+        generation,
+        seed,
+        map_name,
+        params=None,
+        arena_count=BATCH_ARENAS,
+        race_keep=None,
+    ) -> list:
+        """
+        Avalia traits_list nos workers e espera todos os lotes voltarem.
+
+        Com race_keep cada lote corre separado (top-race_keep do lote): os
+        top-race_keep da geração estão entre eles, então nenhum é eliminado.
+
+        Retorna:
+            Os componentes de fitness de cada genoma, alinhados com traits_list.
+        """
+        batches = []
+        with self._condition:
+            for start in range(0, len(traits_list), self.batch_size):
+                batch_id = self._next_batch
+                self._next_batch += 1
+                genomes = [
+                    (index, traits_list[index])
+                    for index in range(
+                        start, min(start + self.batch_size, len(traits_list))
+                    )
+                ]
+                self._jobs[batch_id] = encode_job(
+                    batch_id,
+                    generation,
+                    seed,
+                    arena_count,
+                    duration,
+                    delta_time,
+                    map_name,
+                    params,
+                    genomes,
+                    race_keep,
+                )
+                self._pending.append(batch_id)
+                batches.append(batch_id)
+            self._condition.notify_all()
+            self._condition.wait_for(
+                lambda: self._closed or all(b in self._results for b in batches)
+            )
+            if self._closed:
+                raise RuntimeError("Coordenador encerrado durante a avaliação")
+
+            results = [None] * len(traits_list)
+            for batch_id in batches:
+                del self._jobs[batch_id]
+                for index, components in self._results.pop(batch_id):
+                    results[index] = components
+        return results
+
+    def close(self):
+        """Encerra: workers ociosos recebem SHUTDOWN e o servidor para de aceitar."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._server.close()
+
+    def _accept_loop(self):
+        while True:
+            try:
+                conn, address = self._server.accept()
+            except OSError:
+                return  # Servidor fechado
+            threading.Thread(
+                target=self._serve, args=(conn, address), daemon=True
+            ).start()
+
+    def _take_batch(self):
+        """Próximo lote pendente (espera por um); None se o coordenador fechou."""
+        with self._condition:
+            self._condition.wait_for(lambda: self._closed or self._pending)
+            if self._closed:
+                return None
+            return self._pending.popleft()
+
+    def _serve(self, conn, address):
+        name = f"{address[0]}:{address[1]}"
+        batch_id = None
+        conn.settimeout(self.heartbeat_timeout)
+        try:
+            kind, body = recv_message(conn)
+            if kind != MSG_HELLO or not body.startswith(PROTOCOL_MAGIC):
+                return
+            name = body[len(PROTOCOL_MAGIC) :].decode("utf-8") or name
+            with self._condition:
+                self.workers.add(name)
+            events.emit("distributed", "Worker conectado: {worker}", worker=name)
+
+            while True:
+                kind, body = recv_message(conn)
+                if kind == MSG_READY:
+                    batch_id = self._take_batch()
+                    if batch_id is None:
+                        send_message(conn, MSG_SHUTDOWN)
+                        return
+                    send_message(conn, MSG_JOB, self._jobs[batch_id])
+                elif kind == MSG_RESULT:
+                    finished, results = decode_result(body)
+                    with self._condition:
+                        if finished in self._jobs and finished not in self._results:
+                            self._results[finished] = results
+                            self._condition.notify_all()
+                    batch_id = None
+                # HEARTBEAT: a leitura já renovou o timeout
+        except (OSError, struct.error) as e:
+            reason = f"{type(e).__name__}: {e}"
+        else:
+            reason = ""
+        finally:
+            conn.close()
+            with self._condition:
+                self.workers.discard(name)
+                lost = (
+                    batch_id is not None
+                    and batch_id in self._jobs
+                    and batch_id not in self._results
+                )
+                if lost:
+                    self._pending.appendleft(batch_id)
+                    self.redispatched += 1
+                    self._condition.notify_all()
+        if lost:
+            events.emit(
+                "distributed",
+                "Worker perdido ({reason}): {worker}; lote {batch} redistribuído",
+                events.WARNING,
+                worker=name,
+                batch=batch_id,
+                reason=reason,
+            )
+
+
+def evaluate_generation(
+    coordinator,
+    game,
+    generation_time,
+    delta_time,
+    params=None,
+    arena_count=BATCH_ARENAS,
+    race_keep=None,
+):
+    """
+    Avalia a geração atual de game nos workers e executa a evolução com os
+    componentes recebidos. Retorna o resumo da geração.
+    """
+    results = coordinator.evaluate(
+        list(game.next_generation_traits),
+        generation_time,
+        delta_time,
+        game.level,
+        game.seed,
+        game.map_name,
+        params,
+        arena_count,
+        race_keep,
+    )
+    return apply_results(game, results, generation_time)
+
+
+def run_coordinator(
+    generations=20,
+    generation_time=GENERATION_TIME,
+    delta_time=SIMULATION_DELTA_TIME,
+    params=None,
+    seed=0,
+    host="0.0.0.0",
+    port=DEFAULT_PORT,
+    batch_size=BATCH_SIZE,
+    arena_count=BATCH_ARENAS,
+    local_workers=0,
+    race_keep=None,
+):
+    """
+    Executa um treino com avaliação distribuída (mesmo histórico que
+    training.headless.run_training). local_workers sobe workers em processos
+    desta máquina, conectados ao próprio coordenador; race_keep avalia os
+    lotes por corrida (ver Coordinator.evaluate).
+    """
+    params = params or {}
+    history = []
+    coordinator = Coordinator(host, port, batch_size)
+    processes = [
+        start_local_worker("127.0.0.1", coordinator.address[1], f"local-{i + 1}")
+        for i in range(local_workers)
+    ]
+    try:
+        with override_constants(params):
+            game = create_game(params, seed=seed)
+            for generation in range(generations):
+                started = time.perf_counter()
+                summary = evaluate_generation(
+                    coordinator,
+                    game,
+                    generation_time,
+                    delta_time,
+                    params,
+                    arena_count,
+                    race_keep,
+                )
+                history.append(
+                    generation_record(generation + 1, summary, game, started)
+                )
+    finally:
+        coordinator.close()
+        for process in processes:
+            process.join(timeout=HEARTBEAT_TIMEOUT)
+            if process.is_alive():
+                process.terminate()
+    return history
+
+
+# --- Worker ---
+
+
+def evaluate_job(job, runners) -> list:
+    """
+    Simula um lote. runners guarda o ArenaRunner entre lotes do mesmo treino
+    (mesma semente, parâmetros e número de arenas).
+
+    Retorna:
+        Lista de (índice global, resultado de ArenaRunner.evaluate).
+    """
+    params = job["params"]
+    key = (job["seed"], json.dumps(params, sort_keys=True), job["arena_count"])
+    indices = [index for index, _ in job["genomes"]]
+    with override_constants(params):
+        runner = runners.get(key)
+        if runner is None:
+            runners.clear()
+            runner = runners[key] = ArenaRunner(job["arena_count"], seed=job["seed"])
+        level = level_cache.get(job["map_name"], teste.SWIM_TILE_ID)
+        for arena in runner.arenas:
+            arena.level = job["generation"]
+            if arena.level_data is not level:
+                arena.use_level(level, job["map_name"])
+        results = runner.evaluate(
+            [traits for _, traits in job["genomes"]],
+            job["duration"],
+            job["delta_time"],
+            race_keep=job["race_keep"],
+            individual_ids=indices,
+        )
+    return list(zip(indices, results))
+
+
+def _connect(host, port, timeout):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            return socket.create_connection((host, port))
+        except OSError:
+            if time.monotonic() >= deadline:
+                raise
+            time.sleep(0.2)
+
+
+def run_worker(
+    host="127.0.0.1",
+    port=DEFAULT_PORT,
+    name=None,
+    heartbeat_interval=HEARTBEAT_INTERVAL,
+    connect_timeout=CONNECT_TIMEOUT,
+) -> int:
+    """
+    Conecta ao coordenador e avalia lotes até receber SHUTDOWN (ou a conexão
+    cair). Retorna o número de lotes avaliados.
+    """
+    name = name or f"{socket.gethostname()}-{os.getpid()}"
+    sock = _connect(host, port, connect_timeout)
+    send_lock = threading.Lock()
+    stopped = threading.Event()
+
+    def send(kind, body=b""):
+        with send_lock:
+            send_message(sock, kind, body)
+
+    def heartbeat():
+        while not stopped.wait(heartbeat_interval):
+            try:
+                send(MSG_HEARTBEAT)
+            except OSError:
+                return
+
+    finished = 0
+    runners = {}
+    try:
+        send(MSG_HELLO, PROTOCOL_MAGIC + name.encode("utf-8"))
+        threading.Thread(target=heartbeat, daemon=True).start()
+        while True:
+            send(MSG_READY)
+            kind, body = recv_message(sock)
+            if kind == MSG_SHUTDOWN:
+                break
+            if kind != MSG_JOB:
+                continue
+            job = decode_job(body)
+            send(MSG_RESULT, encode_result(job["batch_id"], evaluate_job(job, runners)))
+            finished += 1
+    except ConnectionError:
+        pass  # Coordenador encerrado
+    finally:
+        stopped.set()
+        sock.close()
+        # Um worker local sai por os._exit, sem atexit: grava os eventos agora
+        events.flush()
+    return finished
+
+
+def _local_worker(host, port, name, event_config):
+    events.configure(**event_config)
+    run_worker(host, port, name)
+
+
+def start_local_worker(host, port, name=None) -> multiprocessing.Process:
+    """Sobe um worker em um processo desta máquina, com o log de eventos do pai."""
+    process = multiprocessing.Process(
+        target=_local_worker, args=(host, port, name, events.config()), daemon=True
+    )
+    process.start()
+    return process
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    coordinator = commands.add_parser("coordinator", help="População e evolução")
+    coordinator.add_argument("--host", default="0.0.0.0")
+    coordinator.add_argument("--port", type=int, default=DEFAULT_PORT)
+    coordinator.add_argument("--generations", type=int, default=20)
+    coordinator.add_argument("--generation-time", type=float, default=GENERATION_TIME)
+    coordinator.add_argument("--delta-time", type=float, default=SIMULATION_DELTA_TIME)
+    coordinator.add_argument("--seed", type=int, default=0)
+    coordinator.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    coordinator.add_argument("--arenas", type=int, default=BATCH_ARENAS)
+    coordinator.add_argument("--local-workers", type=int, default=0)
+    coordinator.add_argument(
+        "--race-keep", type=int, default=None, help="Avaliação por corrida (top-k)"
+    )
+    coordinator.add_argument("--params", default="{}", help="Constantes (JSON)")
+    coordinator.add_argument("--events", default=None, help="Log de eventos (JSONL)")
+
+    worker = commands.add_parser("worker", help="Avalia lotes do coordenador")
+    worker.add_argument("--host", default="127.0.0.1")
+    worker.add_argument("--port", type=int, default=DEFAULT_PORT)
+    worker.add_argument("--name", default=None)
+    worker.add_argument("--events", default=None, help="Log de eventos (JSONL)")
+    args = parser.parse_args()
+    if args.events:
+        events.configure(sink_path=args.events)
+
+    if args.command == "worker":
+        finished = run_worker(args.host, args.port, args.name)
+        print(f"Worker encerrado após {finished} lotes.")
+        return
+
+    history = run_coordinator(
+        generations=args.generations,
+        generation_time=args.generation_time,
+        delta_time=args.delta_time,
+        params=json.loads(args.params),
+        seed=args.seed,
+        host=args.host,
+        port=args.port,
+        batch_size=args.batch_size,
+        arena_count=args.arenas,
+        local_workers=args.local_workers,
+        race_keep=args.race_keep,
+    )
+    for row in history:
+        print(
+            f"Geração {row['generation']}: melhor {row['best_fitness']:.2f}, "
+            f"média {row['mean_fitness']:.2f} ({row['elapsed']:.2f}s)"
+        )
+
+
+if __name__ == "__main__":
+    main()
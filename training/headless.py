@@ -0,0 +1,329 @@
+# -*- coding: utf-8 -*-
+"""
+Treino headless: roda gerações completas da simulação sem abrir janela.
+
+Como não há jogador humano, cada geração dura um tempo simulado fixo
+(GENERATION_TIME) com passo fixo (SIMULATION_DELTA_TIME) e termina em
+simulate_level_end(), exatamente como a tecla '0' no jogo.
+"""
+import time
+from contextlib import contextmanager
+
+import teste
+from diagnostics import events
+from evolution.genome_store import GenomeStore
+from world.cache import level_cache
+
+GENERATION_TIME = 20.0  # Segundos simulados por geração
+SIMULATION_DELTA_TIME = 1 / 60
+
+# Parâmetros ajustáveis que vivem na instância do jogo (e não no módulo)
+GAME_ATTRIBUTE_PARAMS = ("genetic_shock_multiplier", "stagnation_threshold")
+
+# Constantes de teste.py que não são de ajuste: definem o nível (carregado uma
+# vez e compartilhado pelos workers, que nunca o recarregam), a janela e o laço
+# de desenho, ou caminhos de arquivos
+FIXED_CONSTANTS = frozenset(
+    {
+        "MAP_NAME",
+        "SWIM_TILE_ID",
+        "EMPTY_TILE",
+        "COLLISION_LAYER_NAME",
+        "FOREGROUND_LAYER_NAME",
+        "CAMERA_ZOOM",
+        "SIMULATION_TICK_RATE",
+        "MAX_SIMULATION_STEPS_PER_FRAME",
+        "INTERPOLATION_SNAP_DISTANCE",
+        "PLAYER_IDLE_SPRITE",
+        "CAPTURE_DIR",
+        "CAPTURE_EVERY",
+        "EVENT_LOG_PATH",
+        "GENOME_DB_PATH",
+        "TRACE_DIR",
+    }
+)
+FIXED_PREFIXES = ("SCREEN_",)
+
+
+def is_tunable_param(name: str) -> bool:
+    """
+    Parâmetro ajustável: constante MAIÚSCULA de teste.py com valor numérico ou
+    texto (ex.: SELECTION_MODE), fora de FIXED_CONSTANTS, ou um atributo do
+    jogo em GAME_ATTRIBUTE_PARAMS.
+    """
+    if name in GAME_ATTRIBUTE_PARAMS:
+        return True
+    if name in FIXED_CONSTANTS or name.startswith(FIXED_PREFIXES):
+        return False
+    value = getattr(teste, name, None)
+    return (
+        name.isupper()
+        and isinstance(value, (int, float, str))
+        and not isinstance(value, bool)
+    )
+
+
+@contextmanager
+def override_constants(params: dict):
+    """
+    Sobrescreve temporariamente constantes de teste.py.
+
+    As funções do jogo leem as constantes do módulo em tempo de execução, então
+    basta trocar o atributo. Os valores originais são restaurados na saída, o
+    que permite reaproveitar o mesmo processo para várias configurações.
+    """
+    originals = {}
+    try:
+        for name, value in params.items():
+            if name in GAME_ATTRIBUTE_PARAMS:
+                continue
+            if not is_tunable_param(name):
+                raise ValueError(f"Parâmetro desconhecido ou fixo: {name}")
+            originals[name] = getattr(teste, name)
+            setattr(teste, name, value)
+        yield
+    finally:
+        for name, value in originals.items():
+            setattr(teste, name, value)
+
+
+def create_game(
+    params=None, level=None, genome_store=None, seed_query=None, seed=None
+) -> teste.GameSimulation:
+    """
+    Cria e configura uma simulação sem gráficos com os atributos de params.
+
+    Se level (LevelData) for dado, o mapa não é recarregado — é o caso dos
+    workers que anexaram o nível publicado em memória compartilhada.
+    Com genome_store, os elites são gravados no banco; seed_query (argumentos
+    de GenomeStore.top_genomes) semeia a população inicial a partir dele.
+    seed é a semente dos fluxos aleatórios da simulação (evolution/rng.py).
+    """
+    game = teste.GameSimulation(load_graphics=False, seed=seed)
+    for name in GAME_ATTRIBUTE_PARAMS:
+        if params and name in params:
+            setattr(game, name, params[name])
+    if genome_store is not None:
+        if seed_query is not None:
+            game.seed_from_genome_store(genome_store, **seed_query)
+        game.attach_genome_store(genome_store, params)
+    game.setup(level=level)
+    return game
+
+
+def run_generation(
+    game, generation_time=GENERATION_TIME, delta_time=None, map_names=None
+):
+    """
+    Simula uma geração inteira e executa a evolução ao final.
+
+    Com map_names (mais de um mapa), a mesma geração é simulada em cada mapa,
+    na ordem, e a seleção usa o fitness agregado: a média entre os mapas dos
+    acertos, da proximidade e dos tempos no ar e na água, e a menor distância
+    ao player. Como o fitness é linear em acertos e proximidade, ele é a média
+    do fitness de cada mapa, a mesma escala de ArenaRunner.evaluate_maps e de
+    um treino com um mapa só. Os níveis vêm do cache (world/cache.py), então trocar de mapa não
+    recarrega nada. O resumo ganha "maps": caminho -> fitness de cada inimigo.
+    """
+    delta_time = delta_time or SIMULATION_DELTA_TIME
+    steps = int(round(generation_time / delta_time))
+    map_names = list(map_names or [])
+    if len(map_names) < 2:
+        if map_names and map_names[0] != game.map_name:
+            _switch_map(game, map_names[0])
+        for _ in range(steps):
+            game.update_simulation(delta_time)
+        game.simulate_level_end()
+        summary = game.summary_data
+        game.continue_to_next_generation()
+        return summary
+
+    traits_list = list(game.next_generation_traits)
+    totals = [[0.0, 0.0, float("inf"), 0.0, 0.0] for _ in traits_list]
+    per_map = {}
+    for map_name in map_names:
+        _switch_map(game, map_name, traits_list)
+        for _ in range(steps):
+            game.update_simulation(delta_time)
+        per_map[map_name] = [
+            enemy.calculate_final_fitness() for enemy in game.enemy_list
+        ]
+        for total, enemy in zip(totals, game.enemy_list):
+            total[0] += enemy.hits / len(map_names)
+            total[1] += enemy.proximity_score / len(map_names)
+            total[2] = min(total[2], enemy.min_distance)
+            total[3] += enemy.airborne_time / len(map_names)
+            total[4] += enemy.water_time / len(map_names)
+
+    # Os inimigos do último mapa carregam o fitness agregado para a evolução
+    for total, enemy in zip(totals, game.enemy_list):
+        (
+            enemy.hits,
+            enemy.proximity_score,
+            enemy.min_distance,
+            enemy.airborne_time,
+            enemy.water_time,
+        ) = total
+    game.simulate_level_end()
+    summary = game.summary_data
+    summary["maps"] = per_map
+    game.continue_to_next_generation()
+    return summary
+
+
+def run_race_generation(
+    game,
+    runner,
+    generation_time=GENERATION_TIME,
+    delta_time=None,
+    map_names=None,
+    race_keep=1,
+):
+    """
+    Como run_generation, mas a geração é avaliada por corrida nas arenas de
+    runner (training/arena.py, evolution/racing.py): os genomas que não
+    alcançam o top-race_keep param de ser simulados, com o fitness congelado.
+    Os componentes de fitness de cada mapa são agregados como em
+    run_generation e a evolução roda em game (ver apply_results).
+    """
+    delta_time = delta_time or SIMULATION_DELTA_TIME
+    traits_list = list(game.next_generation_traits)
+    map_names = list(map_names or [game.map_name])
+    per_map = {}
+    for map_name in map_names:
+        for arena in runner.arenas:
+            arena.level = game.level  # Mesmos fluxos aleatórios da geração
+            if arena.map_name != map_name:
+                level = level_cache.get(map_name, teste.SWIM_TILE_ID)
+                arena.use_level(level, map_name)
+        per_map[map_name] = runner.evaluate(
+            traits_list, generation_time, delta_time, race_keep=race_keep
+        )
+
+    results = []
+    for index in range(len(traits_list)):
+        maps = [per_map[name][index] for name in map_names]
+        result = {
+            key: sum(r[key] for r in maps) / len(maps)
+            for key in ("hits", "proximity", "airborne_time", "water_time")
+        }
+        result["min_distance"] = min(r["min_distance"] for r in maps)
+        result["position"] = maps[-1]["position"]
+        results.append(result)
+
+    summary = apply_results(game, results, generation_time)
+    if len(map_names) > 1:
+        summary["maps"] = {
+            name: [r["fitness"] for r in per_map[name]] for name in map_names
+        }
+    return summary
+
+
+def apply_results(game, results, generation_time):
+    """
+    Passa aos inimigos de game os componentes de fitness avaliados fora dele
+    (arenas ou workers remotos), alinhados com a geração, e executa a
+    evolução. Retorna o resumo da geração.
+    """
+    for enemy, result in zip(game.enemy_list, results):
+        enemy.hits = result["hits"]
+        enemy.proximity_score = result["proximity"]
+        enemy.min_distance = result["min_distance"]
+        enemy.airborne_time = result["airborne_time"]
+        enemy.water_time = result["water_time"]
+        enemy.center_x, enemy.center_y = result["position"]
+    game.level_time = generation_time
+    game.simulate_level_end()
+    summary = game.summary_data
+    game.continue_to_next_generation()
+    return summary
+
+
+def _switch_map(game, map_name, traits_list=None):
+    """Troca o mapa da simulação e recria a geração atual nele."""
+    game.use_level(level_cache.get(map_name, teste.SWIM_TILE_ID), map_name)
+    if traits_list is None:
+        traits_list = list(game.next_generation_traits)
+    game.setup_generation(traits_list)
+    game.hit_cooldown = 0.0
+
+
+def generation_record(generation, summary, game, started) -> dict:
+    """Linha do histórico de treino de uma geração (ver run_training)."""
+    scores = [e["fitness"] for e in summary["enemies"]]
+    elite = next(e for e in summary["enemies"] if e["is_elite"])
+    return {
+        "generation": generation,
+        "best_fitness": max(scores),
+        "mean_fitness": sum(scores) / len(scores),
+        "elite_type": elite["type"],
+        "elite_hits": elite["hits"],
+        "shock": game.evolution_stats.is_stagnating,
+        "elapsed": time.perf_counter() - started,
+    }
+
+
+def run_training(
+    generations=20,
+    generation_time=GENERATION_TIME,
+    delta_time=SIMULATION_DELTA_TIME,
+    params=None,
+    seed=None,
+    level=None,
+    genome_db=None,
+    seed_query=None,
+    map_names=None,
+    race_keep=None,
+):
+    """
+    Executa um treino headless completo.
+
+    map_names (padrão teste.MAP_NAMES) são os mapas de cada geração; com mais
+    de um, o fitness é agregado entre eles (ver run_generation).
+
+    Com race_keep (k), cada geração é avaliada por corrida em uma arena (ver
+    run_race_generation): só o top-k precisa ser decidido, então os genomas
+    sem chance param de ser simulados mais cedo.
+
+    Com genome_db (caminho SQLite), os elites são gravados no banco de genomas e
+    seed_query pode semear a população inicial (ver create_game).
+
+    Retorna uma lista com um resumo por geração (fitness máximo, médio, tipo do
+    elite e se o choque genético estava ativo).
+    """
+    params = params or {}
+
+    history = []
+    genome_store = GenomeStore(genome_db) if genome_db else None
+    with override_constants(params):
+        game = create_game(params, level, genome_store, seed_query, seed)
+        runner = None
+        if race_keep:
+            # Import tardio: training.arena importa este módulo
+            from training.arena import ArenaRunner
+
+            runner = ArenaRunner(1, level=game.level_data, seed=game.seed)
+        for generation in range(generations):
+            started = time.perf_counter()
+            if runner is None:
+                summary = run_generation(
+                    game, generation_time, delta_time, map_names or teste.MAP_NAMES
+                )
+            else:
+                summary = run_race_generation(
+                    game,
+                    runner,
+                    generation_time,
+                    delta_time,
+                    map_names or teste.MAP_NAMES,
+                    race_keep,
+                )
+            history.append(
+                generation_record(generation + 1, summary, game, started)
+            )
+    if genome_store is not None:
+        genome_store.close()
+    # Em um worker de pool o processo sai sem atexit: grava os eventos agora
+    events.flush()
+    return history
+
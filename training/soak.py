@@ -0,0 +1,248 @@
+# -*- coding: utf-8 -*-
+"""
+Teste de resistência (soak) de memória do treino headless.
+
+Roda milhares de gerações sem janela e, a cada N gerações, registra:
+- RSS do processo (de /proc/self/statm; pico via resource onde não houver /proc);
+- memória rastreada pelo tracemalloc e os locais que mais cresceram desde a
+  referência;
+- contagem de objetos vivos por tipo (gc), com os tipos que mais cresceram.
+
+A referência é tirada depois de algumas gerações de aquecimento (caches de
+textura, spatial hash e afins já preenchidos). Se o crescimento do RSS ou do
+tracemalloc passar do limite, o soak falha (código de saída 1 na linha de
+comando).
+
+Uso:
+    python -m training.soak --generations 2000 --every 50 --max-rss-growth 64
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import ExitStack
+
+from diagnostics import events
+from training.headless import (
+    SIMULATION_DELTA_TIME,
+    create_game,
+    override_constants,
+    run_generation,
+)
+
+SOAK_GENERATION_TIME = 2.0  # Gerações curtas: o que importa é o número delas
+WARMUP_GENERATIONS = 5
+TRACEMALLOC_FRAMES = 5
+TOP_ALLOCATIONS = 10
+TOP_TYPES = 10
+
+MB = 1024 * 1024
+
+
+def current_rss_bytes() -> int:
+    """RSS atual do processo; usa o pico (ru_maxrss) se /proc não existir."""
+    try:
+        with open("/proc/self/statm") as statm:
+            resident_pages = int(statm.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss é em KiB no Linux e em bytes no macOS
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def live_object_counts() -> Counter:
+    """Objetos vivos rastreados pelo gc, agrupados pelo nome do tipo."""
+    gc.collect()
+    return Counter(type(obj).__qualname__ for obj in gc.get_objects())
+
+
+class SoakFailure(Exception):
+    """O crescimento de memória passou do limite configurado."""
+
+
+class MemorySample:
+    """Medição de memória em uma geração."""
+
+    def __init__(self, generation, rss, traced, objects, snapshot):
+        self.generation = generation
+        self.rss = rss
+        self.traced = traced
+        self.objects = objects
+        self.snapshot = snapshot
+
+    def to_record(self, reference=None) -> dict:
+        """Registro para JSON, com os crescimentos se houver referência."""
+        record = {
+            "generation": self.generation,
+            "rss_mb": round(self.rss / MB, 2),
+            "traced_mb": round(self.traced / MB, 2),
+            "objects": sum(self.objects.values()),
+        }
+        if reference is not None:
+            record["rss_growth_mb"] = round((self.rss - reference.rss) / MB, 2)
+            record["traced_growth_mb"] = round(
+                (self.traced - reference.traced) / MB, 2
+            )
+            record["top_allocations"] = [
+                {
+                    "site": str(stat.traceback[0]),
+                    "size_diff_kb": stat.size_diff // 1024,
+                }
+                for stat in self.snapshot.compare_to(reference.snapshot, "lineno")[
+                    :TOP_ALLOCATIONS
+                ]
+            ]
+            growth = self.objects.copy()
+            growth.subtract(reference.objects)
+            record["top_types"] = [
+                {"type": name, "count_diff": diff}
+                for name, diff in growth.most_common(TOP_TYPES)
+                if diff > 0
+            ]
+        return record
+
+
+def take_sample(generation) -> MemorySample:
+    objects = live_object_counts()
+    traced, _ = tracemalloc.get_traced_memory()
+    snapshot = tracemalloc.take_snapshot().filter_traces(
+        (tracemalloc.Filter(False, tracemalloc.__file__),)
+    )
+    return MemorySample(generation, current_rss_bytes(), traced, objects, snapshot)
+
+
+def run_soak(
+    generations=1000,
+    every=50,
+    generation_time=SOAK_GENERATION_TIME,
+    delta_time=SIMULATION_DELTA_TIME,
+    max_rss_growth_mb=64.0,
+    max_traced_growth_mb=32.0,
+    warmup=WARMUP_GENERATIONS,
+    params=None,
+    seed=None,
+    report=print,
+):
+    """
+    Executa o soak e devolve a lista de registros por amostra.
+
+    Cada registro é passado para `report` assim que é medido. Lança SoakFailure
+    na primeira amostra cujo crescimento passe de max_rss_growth_mb ou
+    max_traced_growth_mb em relação à referência pós-aquecimento.
+    """
+    if not 1 <= warmup < generations:
+        # Sem geração depois do aquecimento nenhuma amostra seria comparada e o
+        # soak passaria sem medir nada
+        raise ValueError(
+            f"warmup ({warmup}) precisa estar entre 1 e generations - 1 "
+            f"({generations - 1})"
+        )
+    params = params or {}
+
+    records = []
+    reference = None
+    tracemalloc.start(TRACEMALLOC_FRAMES)
+    try:
+        with override_constants(params):
+            game = create_game(params, seed=seed)
+            for generation in range(1, generations + 1):
+                run_generation(game, generation_time, delta_time)
+
+                if generation == warmup:
+                    reference = take_sample(generation)
+                    record = reference.to_record()
+                elif reference is not None and (
+                    generation % every == 0 or generation == generations
+                ):
+                    sample = take_sample(generation)
+                    record = sample.to_record(reference)
+                else:
+                    continue
+
+                records.append(record)
+                report(record)
+                if reference is None or record["generation"] == warmup:
+                    continue
+                if record["rss_growth_mb"] > max_rss_growth_mb:
+                    raise SoakFailure(
+                        f"RSS cresceu {record['rss_growth_mb']} MB desde a geração {warmup} (limite {max_rss_growth_mb} MB)"
+                    )
+                if record["traced_growth_mb"] > max_traced_growth_mb:
+                    raise SoakFailure(
+                        f"tracemalloc cresceu {record['traced_growth_mb']} MB desde a geração {warmup} (limite {max_traced_growth_mb} MB)"
+                    )
+    finally:
+        tracemalloc.stop()
+    return records
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--generations", type=int, default=1000)
+    parser.add_argument(
+        "--every", type=int, default=50, help="Amostra a cada N gerações"
+    )
+    parser.add_argument(
+        "--generation-time", type=float, default=SOAK_GENERATION_TIME
+    )
+    parser.add_argument("--delta-time", type=float, default=SIMULATION_DELTA_TIME)
+    parser.add_argument("--warmup", type=int, default=WARMUP_GENERATIONS)
+    parser.add_argument("--max-rss-growth", type=float, default=64.0, help="MB")
+    parser.add_argument("--max-traced-growth", type=float, default=32.0, help="MB")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--out", default=None, help="Arquivo JSONL com as amostras")
+    parser.add_argument("--events", default=None, help="Log de eventos (JSONL)")
+    args = parser.parse_args(argv)
+    if not 1 <= args.warmup < args.generations:
+        parser.error("--warmup precisa ser >= 1 e menor que --generations")
+    if args.every < 1:
+        parser.error("--every precisa ser >= 1")
+    if args.events:
+        events.configure(sink_path=args.events)
+
+    with ExitStack() as stack:
+        out = (
+            stack.enter_context(open(args.out, "a", encoding="utf-8"))
+            if args.out
+            else None
+        )
+
+        def report(record):
+            print(
+                f"[soak] geração {record['generation']}: RSS {record['rss_mb']} MB"
+                f" (+{record.get('rss_growth_mb', 0.0)}), tracemalloc {record['traced_mb']} MB"
+                f" (+{record.get('traced_growth_mb', 0.0)}), objetos {record['objects']}"
+            )
+            if out:
+                out.write(json.dumps(record) + "\n")
+                out.flush()
+
+        started = time.perf_counter()
+        try:
+            run_soak(
+                generations=args.generations,
+                every=args.every,
+                generation_time=args.generation_time,
+                delta_time=args.delta_time,
+                max_rss_growth_mb=args.max_rss_growth,
+                max_traced_growth_mb=args.max_traced_growth,
+                warmup=args.warmup,
+                seed=args.seed,
+                report=report,
+            )
+        except SoakFailure as e:
+            print(f"[soak] FALHOU: {e}")
+            return 1
+    print(f"[soak] OK em {time.perf_counter() - started:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,276 @@
+# -*- coding: utf-8 -*-
+"""
+Varredura paralela de hiperparâmetros sobre as constantes de ajuste.
+
+Cada configuração da varredura roda um treino headless completo (ver
+training/headless.py) em um pool de processos que usa todos os núcleos. O mapa
+é carregado uma vez no processo pai e publicado em memória compartilhada (ver
+world/shared_level.py), então os workers sobem sem reprocessar o .tmx. Os
+resultados são gravados de forma incremental em um CSV com colunas fixas: uma
+linha por configuração assim que ela termina, de modo que uma varredura
+interrompida pode ser retomada sem refazer o que já foi gravado.
+
+Formato da especificação (JSON):
+
+    {"mode": "grid", "params": {"GRAVITY": [0.5, 0.7, 0.9],
+                                "stagnation_threshold": [2, 3, 5]}}
+
+    {"mode": "random", "samples": 200, "seed": 42,
+     "params": {"TRAIT_MUTATION_RATE": {"min": 0.1, "max": 1.0},
+                "W_PROXIMITY": {"min": 0.5, "max": 5.0, "log": true},
+                "stagnation_threshold": {"choices": [2, 3, 5]}}}
+
+Uso:
+    python -m training.sweep spec.json --out sweep.csv --generations 30
+"""
+import argparse
+import csv
+import itertools
+import json
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import teste
+from diagnostics import events
+from training.headless import (
+    GENERATION_TIME,
+    SIMULATION_DELTA_TIME,
+    is_tunable_param,
+    run_training,
+)
+from world.level import load_level
+from world.shared_level import init_worker_level, publish_level, worker_level
+
+RESULT_COLUMNS = [
+    "config_id",
+    "generations",
+    "final_best",
+    "best_ever",
+    "mean_best",
+    "final_mean",
+    "shock_generations",
+    "final_elite_type",
+    "elapsed_s",
+    "error",
+]
+
+
+def expand_spec(spec: dict) -> list:
+    """Gera a lista de configurações (dicts parâmetro -> valor) da especificação."""
+    params = spec.get("params", {})
+    unknown = [name for name in params if not is_tunable_param(name)]
+    if unknown:
+        raise ValueError(
+            f"Parâmetros desconhecidos ou fixos na especificação: {unknown} (o "
+            "mapa, a janela e os caminhos de arquivos não variam numa varredura)"
+        )
+
+    mode = spec.get("mode", "grid")
+    names = sorted(params)
+
+    if mode == "grid":
+        value_lists = [params[name] for name in names]
+        return [dict(zip(names, values)) for values in itertools.product(*value_lists)]
+
+    if mode == "random":
+        rng = random.Random(spec.get("seed"))
+        configs = []
+        for _ in range(int(spec.get("samples", 10))):
+            configs.append({name: _sample_param(params[name], rng) for name in names})
+        return configs
+
+    raise ValueError(f"Modo de varredura desconhecido: {mode}")
+
+
+def _sample_param(space, rng):
+    """Sorteia um valor de um espaço: lista/choices, intervalo min/max ou log."""
+    if isinstance(space, list):
+        return rng.choice(space)
+    if "choices" in space:
+        return rng.choice(space["choices"])
+
+    low, high = space["min"], space["max"]
+    if space.get("log"):
+        value = math.exp(rng.uniform(math.log(low), math.log(high)))
+    else:
+        value = rng.uniform(low, high)
+    if isinstance(low, int) and isinstance(high, int) and not space.get("log"):
+        return int(round(value))
+    return value
+
+
+def config_id(params: dict) -> str:
+    """Identificador estável de uma configuração (usado para retomar varreduras)."""
+    return json.dumps(params, sort_keys=True, separators=(",", ":"))
+
+
+def _run_config(params, generations, generation_time, delta_time, seed, race_keep):
+    """Executado nos processos do pool: treina uma configuração e agrega o resultado."""
+    started = time.perf_counter()
+    row = {"config_id": config_id(params), "generations": generations}
+    try:
+        history = run_training(
+            generations=generations,
+            generation_time=generation_time,
+            delta_time=delta_time,
+            params=params,
+            seed=seed,
+            level=worker_level(),
+            race_keep=race_keep,
+        )
+        bests = [g["best_fitness"] for g in history]
+        row.update(
+            {
+                "final_best": bests[-1],
+                "best_ever": max(bests),
+                "mean_best": sum(bests) / len(bests),
+                "final_mean": history[-1]["mean_fitness"],
+                "shock_generations": sum(1 for g in history if g["shock"]),
+                "final_elite_type": history[-1]["elite_type"],
+                "error": "",
+            }
+        )
+    except Exception as e:
+        row["error"] = f"{type(e).__name__}: {e}"
+    finally:
+        events.flush()
+    row["elapsed_s"] = round(time.perf_counter() - started, 3)
+    return params, row
+
+
+def _init_worker(handle, event_config):
+    """Inicializador do pool: nível compartilhado e o mesmo log de eventos do pai."""
+    init_worker_level(handle)
+    events.configure(**event_config)
+
+
+def _completed_ids(out_path):
+    """Lê os config_id já gravados em um CSV de resultados existente."""
+    if not os.path.exists(out_path):
+        return set()
+    with open(out_path, newline="", encoding="utf-8") as f:
+        return {row["config_id"] for row in csv.DictReader(f) if not row["error"]}
+
+
+def run_sweep(
+    spec: dict,
+    out_path: str,
+    generations=20,
+    generation_time=GENERATION_TIME,
+    delta_time=SIMULATION_DELTA_TIME,
+    workers=None,
+    seed=0,
+    race_keep=None,
+):
+    """
+    Roda todas as configurações da especificação e grava os resultados em out_path.
+    Com race_keep, cada treino avalia as gerações por corrida (ver run_training).
+
+    Configurações já presentes (sem erro) em out_path são puladas. Lança
+    ValueError se a especificação tem parâmetros que não são colunas do
+    out_path existente (os valores deles seriam perdidos na retomada).
+    """
+    configs = expand_spec(spec)
+    param_names = sorted({name for params in configs for name in params})
+    done = _completed_ids(out_path)
+    pending = [params for params in configs if config_id(params) not in done]
+
+    print(
+        f"Varredura: {len(configs)} configurações, {len(configs) - len(pending)} "
+        f"já concluídas, {len(pending)} pendentes."
+    )
+    if not pending:
+        return
+
+    write_header = not os.path.exists(out_path) or os.path.getsize(out_path) == 0
+    if write_header:
+        columns = RESULT_COLUMNS + param_names
+    else:
+        # Retomada: mantém as colunas do arquivo existente
+        with open(out_path, newline="", encoding="utf-8") as f:
+            columns = next(csv.reader(f))
+        missing = [name for name in param_names if name not in columns]
+        if missing:
+            raise ValueError(
+                f"{out_path} não tem colunas para {', '.join(missing)}; "
+                "use outro arquivo de saída (--out) para esta especificação"
+            )
+    workers = workers or os.cpu_count() or 1
+    shared = publish_level(load_level(teste.MAP_NAME, teste.SWIM_TILE_ID))
+    try:
+        with open(out_path, "a", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=columns, extrasaction="ignore")
+            if write_header:
+                writer.writeheader()
+                f.flush()
+
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_worker,
+                initargs=(shared.handle, events.config()),
+            ) as pool:
+                futures = [
+                    pool.submit(
+                        _run_config,
+                        params,
+                        generations,
+                        generation_time,
+                        delta_time,
+                        seed,
+                        race_keep,
+                    )
+                    for params in pending
+                ]
+                for finished, future in enumerate(as_completed(futures), start=1):
+                    params, row = future.result()
+                    row.update(params)
+                    writer.writerow(row)
+                    f.flush()
+                    status = row["error"] or f"best={row['best_ever']:.1f}"
+                    print(
+                        f"[{finished}/{len(pending)}] {row['config_id']} -> {status}"
+                    )
+    finally:
+        shared.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("spec", help="Arquivo JSON com a especificação da varredura")
+    parser.add_argument("--out", default="sweep_results.csv")
+    parser.add_argument("--generations", type=int, default=20)
+    parser.add_argument("--generation-time", type=float, default=GENERATION_TIME)
+    parser.add_argument("--delta-time", type=float, default=SIMULATION_DELTA_TIME)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--race-keep", type=int, default=None, help="Avaliação por corrida (top-k)"
+    )
+    parser.add_argument("--events", default=None, help="Log de eventos (JSONL)")
+    args = parser.parse_args()
+    if args.events:
+        events.configure(sink_path=args.events)
+
+    with open(args.spec, encoding="utf-8") as f:
+        spec = json.load(f)
+
+    try:
+        run_sweep(
+            spec,
+            args.out,
+            generations=args.generations,
+            generation_time=args.generation_time,
+            delta_time=args.delta_time,
+            workers=args.workers,
+            seed=args.seed,
+            race_keep=args.race_keep,
+        )
+    except ValueError as e:
+        parser.error(str(e))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+# -*- coding: utf-8 -*-
+"""
+Gravação de sessões humanas (entrada por tick) e replay determinístico.
+
+O movimento do player só depende das teclas (left_pressed, right_pressed e
+pulos) e da física com passo fixo, nunca dos inimigos. Então gravar a entrada de
+cada tick basta para reproduzir exatamente o mesmo percurso em headless, contra
+quaisquer genomas, sem custo além da própria simulação.
+
+Formato: cada tick vira um estado de 3 bits (esquerda, direita, pulo) e os
+estados são codificados em run-length (pares estado/repetições como varints)
+dentro de um arquivo comprimido com zlib. Uma sessão é dividida em segmentos,
+um por geração jogada; alguns minutos de jogo ocupam poucos kB.
+
+Uso (replay de uma geração gravada contra muitos genomas):
+    trace = PlayTrace.load("traces/session-20250101-120000.trace")
+    results = ArenaRunner(8).evaluate(
+        traits_list, None, 1 / trace.tick_rate, trace_segment=trace.segments[0]
+    )
+"""
+import json
+import os
+import time
+import zlib
+
+TRACE_MAGIC = b"PTR1"
+
+LEFT = 1
+RIGHT = 2
+JUMP = 4
+
+
+def _write_varint(out, value):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data, position):
+    value = 0
+    shift = 0
+    while True:
+        byte = data[position]
+        position += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, position
+        shift += 7
+
+
+class TraceSegment:
+    """
+    Entrada de uma geração jogada, em run-length.
+
+    Atributos:
+        generation: geração em que foi gravado
+        runs: lista de [estado, ticks]
+    """
+
+    __slots__ = ("generation", "runs")
+
+    def __init__(self, generation=0, runs=None):
+        self.generation = generation
+        self.runs = runs if runs is not None else []
+
+    def __len__(self):
+        return sum(count for _, count in self.runs)
+
+    def append(self, state):
+        runs = self.runs
+        if runs and runs[-1][0] == state:
+            runs[-1][1] += 1
+        else:
+            runs.append([state, 1])
+
+    def states(self):
+        """Estados tick a tick (gerador)."""
+        for state, count in self.runs:
+            for _ in range(count):
+                yield state
+
+
+class PlayTrace:
+    """
+    Sessão gravada: segmentos mais metadados (mapa, taxa de ticks, data).
+
+    Args:
+        tick_rate: ticks por segundo da sessão (SIMULATION_TICK_RATE)
+        map_name: mapa jogado
+    """
+
+    def __init__(self, tick_rate, map_name="", segments=None, created=None):
+        self.tick_rate = tick_rate
+        self.map_name = map_name
+        self.segments = segments if segments is not None else []
+        self.created = created if created is not None else time.time()
+
+    @property
+    def duration(self) -> float:
+        """Segundos de jogo gravados (todos os segmentos)."""
+        return sum(len(segment) for segment in self.segments) / self.tick_rate
+
+    def to_bytes(self) -> bytes:
+        header = json.dumps(
+            {
+                "tick_rate": self.tick_rate,
+                "map_name": self.map_name,
+                "created": self.created,
+            }
+        ).encode("utf-8")
+        body = bytearray()
+        _write_varint(body, len(header))
+        body += header
+        _write_varint(body, len(self.segments))
+        for segment in self.segments:
+            _write_varint(body, segment.generation)
+            _write_varint(body, len(segment.runs))
+            for state, count in segment.runs:
+                _write_varint(body, count << 3 | state)
+        return TRACE_MAGIC + zlib.compress(bytes(body), 9)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "PlayTrace":
+        if data[: len(TRACE_MAGIC)] != TRACE_MAGIC:
+            raise ValueError("Arquivo de trace inválido (assinatura desconhecida)")
+        body = zlib.decompress(data[len(TRACE_MAGIC) :])
+        size, position = _read_varint(body, 0)
+        header = json.loads(body[position : position + size].decode("utf-8"))
+        position += size
+
+        segments = []
+        segment_count, position = _read_varint(body, position)
+        for _ in range(segment_count):
+            generation, position = _read_varint(body, position)
+            run_count, position = _read_varint(body, position)
+            runs = []
+            for _ in range(run_count):
+                value, position = _read_varint(body, position)
+                runs.append([value & 7, value >> 3])
+            segments.append(TraceSegment(generation, runs))
+        return cls(
+            header["tick_rate"], header.get("map_name", ""), segments, header["created"]
+        )
+
+    def save(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Grava em arquivo temporário e renomeia: um trace nunca fica pela metade
+        temporary = f"{path}.tmp"
+        with open(temporary, "wb") as f:
+            f.write(self.to_bytes())
+        os.replace(temporary, path)
+
+    @classmethod
+    def load(cls, path) -> "PlayTrace":
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
+
+
+class TraceRecorder:
+    """
+    Grava a entrada do player a cada tick da simulação.
+
+    GameSimulation chama record() uma vez por tick (depois do controle do
+    player e antes da física) e end_segment() no fim de cada geração. Em um
+    tick com o bot no controle chama discard_segment(): a biblioteca guarda só
+    partidas humanas.
+
+    Args:
+        path: arquivo onde a sessão é salva (a cada fim de geração e em close)
+        tick_rate, map_name: metadados da sessão
+    """
+
+    def __init__(self, path, tick_rate, map_name=""):
+        self.path = path
+        self.trace = PlayTrace(tick_rate, map_name)
+        self.segment = None
+        self.discarding = False  # Geração atual descartada (bot no controle)
+
+    def record(self, left, right, jump, generation=0):
+        if self.discarding:
+            return
+        if self.segment is None:
+            self.segment = TraceSegment(generation)
+            self.trace.segments.append(self.segment)
+        self.segment.append(left * LEFT | right * RIGHT | jump * JUMP)
+
+    def discard_segment(self):
+        """
+        Descarta o segmento da geração atual e ignora o resto dela: um segmento
+        com buracos não poderia ser repetido tick a tick.
+        """
+        if self.segment is not None:
+            self.trace.segments.remove(self.segment)
+            self.segment = None
+        self.discarding = True
+
+    def end_segment(self):
+        """Fecha o segmento da geração atual e salva a sessão."""
+        self.segment = None
+        self.discarding = False
+        self.save()
+
+    def save(self):
+        if self.trace.segments:
+            self.trace.save(self.path)
+
+    def close(self):
+        self.save()
+
+
+class TraceReplayer:
+    """
+    Controla o player de uma GameSimulation a partir de um segmento gravado.
+
+    Ocupa o lugar do bot (GameSimulation.bot): a cada tick aplica as teclas
+    gravadas com apply_movement e repete os pulos com player_jump. Depois do
+    fim do segmento o player fica parado.
+    """
+
+    def __init__(self, game, segment: TraceSegment):
+        self.game = game
+        self.segment = segment
+        self._states = segment.states()
+        self.length = len(segment)
+        self.ticks = 0
+
+    def reset(self):
+        # Um reinício da geração (queda do player) também aconteceu na sessão
+        # gravada, no mesmo tick: a entrada continua de onde está
+        pass
+
+    @property
+    def finished(self) -> bool:
+        return self.ticks >= self.length
+
+    def update(self, delta_time):
+        state = next(self._states, 0)
+        self.ticks += 1
+        game = self.game
+        game.left_pressed = bool(state & LEFT)
+        game.right_pressed = bool(state & RIGHT)
+        game.apply_movement()
+        if state & JUMP:
+            game.player_jump()
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""
+Cache LRU, no processo, dos níveis já compilados.
+
+Compilar um nível (ler o .tmx, montar a grade, fundir os retângulos de colisão,
+listar os tiles de água e o spawn) e carregar as texturas dos fundos custa muito
+mais que simular uma geração curta. Com vários mapas na avaliação, cada troca de
+mapa recompilaria tudo; aqui cada nível é compilado uma vez e reaproveitado.
+
+A chave é (caminho, hash do conteúdo): o hash cobre o .tmx e os tilesets .tsx
+que ele referencia, e só é recalculado quando o mtime ou o tamanho do arquivo
+mudam. Um mapa editado vira uma entrada nova; o mesmo conteúdo nunca é lido de
+novo pelo arcade.
+"""
+import hashlib
+import os
+import re
+from collections import OrderedDict
+
+from world.level import load_level
+
+LEVEL_CACHE_SIZE = 8  # Níveis (e conjuntos de fundos) mantidos em memória
+
+_TILESET_SOURCE = re.compile(rb'<tileset[^>]*\ssource="([^"]+)"')
+
+
+class LevelCache:
+    """
+    Níveis compilados (LevelData) e fundos, por caminho e conteúdo.
+
+    Args:
+        max_levels: entradas mantidas; a usada há mais tempo sai primeiro
+    """
+
+    def __init__(self, max_levels=LEVEL_CACHE_SIZE):
+        self.max_levels = max_levels
+        self._levels = OrderedDict()
+        self._backgrounds = OrderedDict()
+        self._digests = {}  # caminho -> (mtime_ns, tamanho, hash)
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._levels)
+
+    def content_hash(self, path) -> str:
+        """Hash do .tmx e dos .tsx referenciados (recalculado se o arquivo mudou)."""
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        cached = self._digests.get(path)
+        if cached and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            return cached[2]
+
+        digest = hashlib.sha1()
+        with open(path, "rb") as f:
+            data = f.read()
+        digest.update(data)
+        directory = os.path.dirname(path)
+        for source in _TILESET_SOURCE.findall(data):
+            try:
+                with open(os.path.join(directory, source.decode()), "rb") as f:
+                    digest.update(f.read())
+            except OSError:
+                pass  # O arcade reporta o tileset ausente ao carregar
+        result = digest.hexdigest()
+        self._digests[path] = (stat.st_mtime_ns, stat.st_size, result)
+        return result
+
+    def _lookup(self, entries, key, build):
+        if key in entries:
+            self.hits += 1
+            entries.move_to_end(key)
+            return entries[key]
+        self.misses += 1
+        value = build()
+        entries[key] = value
+        while len(entries) > self.max_levels:
+            entries.popitem(last=False)
+        return value
+
+    def get(self, path, swim_tile_id):
+        """LevelData do mapa em path (compilado só na primeira vez)."""
+        key = (os.path.abspath(path), self.content_hash(path), swim_tile_id)
+        return self._lookup(
+            self._levels, key, lambda: load_level(path, swim_tile_id)
+        )
+
+    def backgrounds(self, path, map_width, loader) -> dict:
+        """
+        Camadas de fundo do mapa, carregadas com loader(path, map_width) só na
+        primeira vez. O dict devolvido é compartilhado: copie antes de alterar.
+        """
+        key = (os.path.abspath(path), self.content_hash(path), map_width)
+        return self._lookup(
+            self._backgrounds, key, lambda: loader(path, map_width)
+        )
+
+    def clear(self):
+        self._levels.clear()
+        self._backgrounds.clear()
+        self._digests.clear()
+
+
+# Cache do processo (compartilhado por todas as simulações)
+level_cache = LevelCache()
@@ -0,0 +1,315 @@
+# -*- coding: utf-8 -*-
+"""
+Geometria de colisão estática pré-processada.
+
+A camada de colisão do Tiled vem como um sprite por tile de 16x16. Aqui os
+tiles são fundidos de forma gulosa em retângulos alinhados aos eixos (um chão
+comprido vira um único retângulo), e a física passa a testar poucos
+colisores grandes em vez de centenas de tiles.
+
+Regras da fusão:
+- tiles de água (swim_tile_id) nunca se fundem com tiles sólidos;
+- só se fundem tiles com a mesma hit box dentro da célula; a extensão
+  horizontal exige hit box de largura total e a vertical de altura total
+  (plataformas finas se fundem apenas em faixas horizontais).
+
+Também há colisão contínua (swept AABB): sweep_box() percorre a grade de tiles
+ao longo do deslocamento de uma caixa (DDA, célula por célula na ordem em que a
+borda dianteira as alcança) e testa os retângulos de cada célula visitada,
+devolvendo o instante exato do impacto e a normal de contato. resolve_motion()
+repete a varredura a partir de cada contato com o deslocamento restante
+(deslizando na superfície). Objetos rápidos não atravessam tiles de 16px, por
+maior que seja o passo.
+"""
+import math
+from collections import namedtuple
+
+import arcade
+
+# tile_id dos retângulos sólidos fundidos (qualquer valor != swim_tile_id)
+MERGED_SOLID_TILE = -2
+
+# Resultado de sweep_box: toi em [0, 1] é a fração do deslocamento percorrida até
+# o contato; (normal_x, normal_y) aponta para fora do retângulo atingido
+SweepHit = namedtuple("SweepHit", "toi normal_x normal_y rect")
+
+
+def tile_hit_boxes(ground_list, tile_size):
+    """
+    Extrai de cada sprite de tile a célula e a hit box (AABB) relativa à célula.
+
+    Retorna:
+        dict (coluna, linha) -> (tile_id, x0, y0, x1, y1), com os offsets em
+        pixels a partir do canto inferior esquerdo da célula.
+    """
+    cells = {}
+    for sprite in ground_list:
+        column = int(sprite.center_x // tile_size)
+        row = int(sprite.center_y // tile_size)
+        points = sprite.hit_box.get_adjusted_points()
+        xs = [p[0] for p in points]
+        ys = [p[1] for p in points]
+        cell_left = column * tile_size
+        cell_bottom = row * tile_size
+        cells[(column, row)] = (
+            sprite.properties.get("tile_id"),
+            round(min(xs) - cell_left, 3),
+            round(min(ys) - cell_bottom, 3),
+            round(max(xs) - cell_left, 3),
+            round(max(ys) - cell_bottom, 3),
+        )
+    return cells
+
+
+def merge_collision_rects(cells, tile_size, swim_tile_id):
+    """
+    Funde as células de colisão em retângulos maiores (guloso, linha a linha).
+
+    Args:
+        cells: saída de tile_hit_boxes()
+        tile_size: lado do tile em pixels
+        swim_tile_id: tile de água (fundido separadamente dos sólidos)
+
+    Retorna:
+        Lista de (left, bottom, right, top, tile_id) em pixels, onde tile_id é
+        swim_tile_id para água e MERGED_SOLID_TILE para os sólidos.
+    """
+
+    def merge_key(cell):
+        tile_id, x0, y0, x1, y1 = cells[cell]
+        return (tile_id == swim_tile_id, x0, y0, x1, y1)
+
+    visited = set()
+    rects = []
+
+    for column, row in sorted(cells, key=lambda c: (c[1], c[0])):
+        if (column, row) in visited:
+            continue
+        key = merge_key((column, row))
+        is_water, x0, y0, x1, y1 = key
+        full_width = x0 == 0 and x1 == tile_size
+        full_height = y0 == 0 and y1 == tile_size
+
+        def mergeable(cell):
+            return cell in cells and cell not in visited and merge_key(cell) == key
+
+        # 1. Estende para a direita
+        span = 1
+        if full_width:
+            while mergeable((column + span, row)):
+                span += 1
+
+        # 2. Estende para cima enquanto a linha inteira do intervalo servir
+        rows = 1
+        if full_height:
+            while all(
+                mergeable((column + dx, row + rows)) for dx in range(span)
+            ):
+                rows += 1
+
+        for dy in range(rows):
+            for dx in range(span):
+                visited.add((column + dx, row + dy))
+
+        rects.append(
+            (
+                column * tile_size + x0,
+                row * tile_size + y0,
+                (column + span - 1) * tile_size + x1,
+                (row + rows - 1) * tile_size + y1,
+                swim_tile_id if is_water else MERGED_SOLID_TILE,
+            )
+        )
+
+    return rects
+
+
+def build_collision_lists(rects, swim_tile_id):
+    """
+    Cria os colisores (sprites sem textura, nunca desenhados) dos retângulos.
+
+    Retorna:
+        (collision_list, water_list): a primeira com todos os retângulos
+        (paredes do player e dos corredores), a segunda só com a água (paredes
+        dos nadadores). Ambas com spatial hash como broadphase.
+    """
+    collision_list = arcade.SpriteList(use_spatial_hash=True)
+    water_list = arcade.SpriteList(use_spatial_hash=True)
+    for left, bottom, right, top, tile_id in rects:
+        sprite = arcade.SpriteSolidColor(
+            right - left,
+            top - bottom,
+            center_x=(left + right) / 2,
+            center_y=(bottom + top) / 2,
+        )
+        sprite.properties["tile_id"] = tile_id
+        collision_list.append(sprite)
+        if tile_id == swim_tile_id:
+            water_list.append(sprite)
+    return collision_list, water_list
+
+
+def index_rects_by_cell(rects, tile_size):
+    """
+    Índice espacial dos retângulos na grade de tiles.
+
+    Retorna:
+        dict (coluna, linha) -> tupla com os índices (em rects) dos retângulos
+        que ocupam a célula.
+    """
+    cells = {}
+    for index, (left, bottom, right, top, _) in enumerate(rects):
+        for column in range(int(left // tile_size), int(math.ceil(right / tile_size))):
+            for row in range(int(bottom // tile_size), int(math.ceil(top / tile_size))):
+                cells.setdefault((column, row), []).append(index)
+    return {cell: tuple(indices) for cell, indices in cells.items()}
+
+
+def sweep_rect(box, dx, dy, rect):
+    """
+    Colisão contínua de uma caixa (left, bottom, right, top) deslocada por
+    (dx, dy) contra um retângulo estático (left, bottom, right, top, ...).
+
+    Retorna (toi, normal_x, normal_y) ou None. Contatos rasantes não contam, e
+    uma caixa que já começa sobreposta ao retângulo não é bloqueada (para
+    conseguir sair dele).
+    """
+    left, bottom, right, top = box
+    rect_left, rect_bottom, rect_right, rect_top = rect[:4]
+
+    if dx > 0:
+        x_entry, x_exit = (rect_left - right) / dx, (rect_right - left) / dx
+    elif dx < 0:
+        x_entry, x_exit = (rect_right - left) / dx, (rect_left - right) / dx
+    elif right <= rect_left or left >= rect_right:
+        return None
+    else:
+        x_entry, x_exit = -math.inf, math.inf
+
+    if dy > 0:
+        y_entry, y_exit = (rect_bottom - top) / dy, (rect_top - bottom) / dy
+    elif dy < 0:
+        y_entry, y_exit = (rect_top - bottom) / dy, (rect_bottom - top) / dy
+    elif top <= rect_bottom or bottom >= rect_top:
+        return None
+    else:
+        y_entry, y_exit = -math.inf, math.inf
+
+    entry = max(x_entry, y_entry)
+    if entry < 0 or entry > 1 or entry >= min(x_exit, y_exit):
+        return None
+    if x_entry > y_entry:
+        return entry, (-1.0 if dx > 0 else 1.0), 0.0
+    return entry, 0.0, (-1.0 if dy > 0 else 1.0)
+
+
+def _next_boundary_time(t, low, high, delta, tile_size):
+    """Instante (> t) em que a borda dianteira cruza a próxima linha da grade."""
+    if delta == 0:
+        return math.inf
+    if delta > 0:
+        edge = high
+        boundary = (math.floor((edge + delta * t) / tile_size) + 1) * tile_size
+        step = tile_size
+    else:
+        edge = low
+        boundary = (math.ceil((edge + delta * t) / tile_size) - 1) * tile_size
+        step = -tile_size
+    t_boundary = (boundary - edge) / delta
+    if t_boundary <= t:
+        # Arredondamento deixou a borda exatamente sobre a linha: pula para a
+        # seguinte para garantir progresso
+        t_boundary = (boundary + step - edge) / delta
+    return t_boundary
+
+
+def sweep_box(level, box, dx, dy, blocking=None):
+    """
+    Desloca a caixa (left, bottom, right, top) por (dx, dy) pela grade do nível
+    e devolve o primeiro impacto (SweepHit) ou None.
+
+    As células são visitadas na ordem em que a caixa as alcança; a busca para
+    assim que o próximo trecho começa depois do impacto mais próximo já achado.
+
+    Args:
+        level: LevelData (usa collision_rects, cell_rects e tile_size)
+        blocking: filtro opcional rect -> bool (ex.: só água para nadadores)
+    """
+    tile_size = level.tile_size
+    rects = level.collision_rects
+    cell_rects = level.cell_rects
+    left, bottom, right, top = box
+
+    visited_cells = set()
+    tested = set()
+    best = None
+    t = 0.0
+    while True:
+        t_next = min(
+            1.0,
+            _next_boundary_time(t, left, right, dx, tile_size),
+            _next_boundary_time(t, bottom, top, dy, tile_size),
+        )
+
+        # Células cobertas pela caixa durante [t, t_next]
+        x0 = min(left + dx * t, left + dx * t_next)
+        x1 = max(right + dx * t, right + dx * t_next)
+        y0 = min(bottom + dy * t, bottom + dy * t_next)
+        y1 = max(top + dy * t, top + dy * t_next)
+        for column in range(int(x0 // tile_size), int(x1 // tile_size) + 1):
+            for row in range(int(y0 // tile_size), int(y1 // tile_size) + 1):
+                if (column, row) in visited_cells:
+                    continue
+                visited_cells.add((column, row))
+                for index in cell_rects.get((column, row), ()):
+                    if index in tested:
+                        continue
+                    tested.add(index)
+                    rect = rects[index]
+                    if blocking is not None and not blocking(rect):
+                        continue
+                    hit = sweep_rect(box, dx, dy, rect)
+                    if hit is not None and (best is None or hit[0] < best.toi):
+                        best = SweepHit(hit[0], hit[1], hit[2], rect)
+
+        if t_next >= 1.0 or (best is not None and best.toi <= t_next):
+            return best
+        t = t_next
+
+
+def resolve_motion(level, box, dx, dy, blocking=None, max_hits=3):
+    """
+    Deslocamento de fato da caixa por (dx, dy), deslizando nas superfícies.
+
+    A cada impacto a caixa avança até o contato, o resto do deslocamento perde
+    a componente da normal atingida e é varrido de novo a partir dali: o eixo
+    que não bateu continua sendo verificado (sem isso ele atravessaria uma
+    parede depois de um pouso, por exemplo).
+
+    Retorna:
+        (move_x, move_y, blocked_x, blocked_y): o deslocamento resolvido e se
+        cada eixo parou numa superfície.
+    """
+    left, bottom, right, top = box
+    move_x = move_y = 0.0
+    blocked_x = blocked_y = False
+    for _ in range(max_hits):
+        if dx == 0 and dy == 0:
+            break
+        hit = sweep_box(level, (left, bottom, right, top), dx, dy, blocking)
+        if hit is None:
+            move_x += dx
+            move_y += dy
+            break
+        step_x, step_y = dx * hit.toi, dy * hit.toi
+        move_x += step_x
+        move_y += step_y
+        left, right = left + step_x, right + step_x
+        bottom, top = bottom + step_y, top + step_y
+        if hit.normal_x:
+            blocked_x = True
+            dx, dy = 0.0, dy * (1 - hit.toi)
+        else:
+            blocked_y = True
+            dx, dy = dx * (1 - hit.toi), 0.0
+    return move_x, move_y, blocked_x, blocked_y
@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+"""
+Representação imutável de um nível carregado do Tiled.
+
+Tudo o que a simulação precisa saber sobre o mapa (grade de tiles da camada de
+colisão, listas de colisão, pontos de spawn) é calculado uma única vez aqui e
+pode ser compartilhado, somente leitura, por várias simulações ao mesmo tempo
+(ver training/arena.py). Nenhuma simulação deve alterar estes objetos.
+"""
+import arcade
+
+from world.collision import (
+    build_collision_lists,
+    index_rects_by_cell,
+    merge_collision_rects,
+    tile_hit_boxes,
+)
+
+COLLISION_LAYER_NAME = "colission layer"
+FOREGROUND_LAYER_NAME = "Foreground"
+PLAYER_START_LAYER_NAME = "Player Start"
+
+# Ponto de spawn usado quando a camada "Player Start" não fornece um centro
+DEFAULT_PLAYER_SPAWN = (50, 200)
+
+EMPTY_TILE = -1
+
+
+class LevelData:
+    """
+    Dados de um nível, calculados no carregamento e nunca mais modificados.
+
+    Atributos:
+        tile_map: TileMap original do arcade (camadas gráficas, objetos); None
+            quando o nível foi reconstruído a partir de memória compartilhada
+        width, height: dimensões em tiles
+        tile_size: lado do tile em pixels
+        map_width_pixels, map_height_pixels: dimensões em pixels
+        tile_grid: sequência com o tile_id de cada célula da camada de colisão,
+            linha a linha a partir de baixo (EMPTY_TILE = célula vazia)
+        ground_list: sprites da camada de colisão, um por tile (para desenho;
+            vazia quando o nível veio de memória compartilhada)
+        collision_rects: retângulos fundidos (left, bottom, right, top, tile_id)
+            da camada de colisão, ver world/collision.py
+        cell_rects: células -> índices em collision_rects (colisão contínua)
+        collision_list: colisores dos retângulos fundidos (player e corredores)
+        water_list: apenas os retângulos de água (colisão dos nadadores)
+        foreground_list: camada decorativa da frente
+        water_tile_centers: centros dos tiles de água (spawn de nadadores)
+        player_spawn: (x, y) do spawn do player
+    """
+
+    def __init__(
+        self,
+        width,
+        height,
+        tile_size,
+        tile_grid,
+        swim_tile_id,
+        player_spawn,
+        water_tile_centers=None,
+        collision_rects=None,
+        ground_list=None,
+        foreground_list=None,
+        tile_map=None,
+    ):
+        self.tile_map = tile_map
+        self.swim_tile_id = swim_tile_id
+
+        self.width = width
+        self.height = height
+        self.tile_size = tile_size
+        self.map_width_pixels = width * tile_size
+        self.map_height_pixels = height * tile_size
+
+        self.tile_grid = tile_grid
+        self.player_spawn = player_spawn
+
+        self.ground_list = ground_list or arcade.SpriteList()
+        self.foreground_list = foreground_list or arcade.SpriteList()
+
+        if collision_rects is None:
+            collision_rects = merge_collision_rects(
+                tile_hit_boxes(self.ground_list, tile_size), tile_size, swim_tile_id
+            )
+        self.collision_rects = tuple(collision_rects)
+        self.cell_rects = index_rects_by_cell(self.collision_rects, tile_size)
+        self.collision_list, self.water_list = build_collision_lists(
+            self.collision_rects, swim_tile_id
+        )
+
+        if water_tile_centers is None:
+            water_tile_centers = tuple(
+                self.cell_center(index)
+                for index, tile_id in enumerate(tile_grid)
+                if tile_id == swim_tile_id
+            )
+        self.water_tile_centers = water_tile_centers
+
+        if not self.water_tile_centers:
+            print(
+                f"AVISO: Nenhuma tile de água (ID:{swim_tile_id}) encontrada na camada '{COLLISION_LAYER_NAME}' para spawn de nadadores!"
+            )
+
+    def cell_at(self, x, y):
+        """Coluna e linha (a partir de baixo) da célula que contém o ponto (x, y)."""
+        return int(x // self.tile_size), int(y // self.tile_size)
+
+    def cell_center(self, index):
+        """Centro em pixels da célula de índice `index` da grade."""
+        row, column = divmod(index, self.width)
+        return (
+            column * self.tile_size + self.tile_size / 2,
+            row * self.tile_size + self.tile_size / 2,
+        )
+
+    def in_bounds(self, column, row) -> bool:
+        return 0 <= column < self.width and 0 <= row < self.height
+
+    def tile_at(self, x, y):
+        """tile_id da camada de colisão no ponto (x, y), ou EMPTY_TILE."""
+        column, row = self.cell_at(x, y)
+        if not self.in_bounds(column, row):
+            return EMPTY_TILE
+        return self.tile_grid[row * self.width + column]
+
+
+def _find_player_spawn(tile_map):
+    """Ponto de spawn do player a partir da camada de objetos (com fallback)."""
+    player_spawn_layer = tile_map.object_lists.get(PLAYER_START_LAYER_NAME)
+    spawn_point_x, spawn_point_y = DEFAULT_PLAYER_SPAWN
+
+    if player_spawn_layer and player_spawn_layer[0]:
+        try:
+            spawn_point_x = player_spawn_layer[0].center_x
+            spawn_point_y = player_spawn_layer[0].center_y
+        except Exception as e:
+            print(
+                f"Erro ao obter ponto de spawn do Player: {e}. Usando fallback ({spawn_point_x}, {spawn_point_y})."
+            )
+
+    return spawn_point_x, spawn_point_y
+
+
+def load_level(map_path, swim_tile_id) -> LevelData:
+    """Carrega o arquivo .tmx e pré-calcula os dados do nível."""
+    layer_options = {
+        COLLISION_LAYER_NAME: {
+            "use_spatial_hash": True,
+        }
+    }
+    tile_map = arcade.load_tilemap(map_path, scaling=1.0, layer_options=layer_options)
+    tile_size = tile_map.tile_width
+
+    ground_list = tile_map.sprite_lists.get(COLLISION_LAYER_NAME)
+    if ground_list is None:
+        print(
+            f"ATENÇÃO: A camada '{COLLISION_LAYER_NAME}' não foi encontrada. Usando SpriteList vazia."
+        )
+        ground_list = arcade.SpriteList()
+
+    grid = [EMPTY_TILE] * (tile_map.width * tile_map.height)
+    for sprite in ground_list:
+        column = int(sprite.center_x // tile_size)
+        row = int(sprite.center_y // tile_size)
+        if 0 <= column < tile_map.width and 0 <= row < tile_map.height:
+            grid[row * tile_map.width + column] = sprite.properties.get("tile_id")
+
+    return LevelData(
+        tile_map.width,
+        tile_map.height,
+        tile_size,
+        tuple(grid),
+        swim_tile_id,
+        _find_player_spawn(tile_map),
+        ground_list=ground_list,
+        foreground_list=tile_map.sprite_lists.get(FOREGROUND_LAYER_NAME),
+        tile_map=tile_map,
+    )
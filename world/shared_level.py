@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+"""
+Publicação de um LevelData em memória compartilhada para processos de treino.
+
+O processo pai carrega o mapa uma vez e copia a grade de colisão, os
+retângulos de colisão fundidos e as tabelas de spawn para um único bloco de
+multiprocessing.shared_memory. Os workers se conectam ao bloco pelo nome e
+leem os dados através de memoryviews tipadas e
+somente leitura (zero cópia), sem rodar arcade.load_tilemap nem reprocessar o
+.tmx. O bloco não muda depois de publicado.
+
+Uso:
+    shared = publish_level(level)          # no processo pai
+    pool = ProcessPoolExecutor(initializer=init_worker_level,
+                               initargs=(shared.handle,))
+    ...
+    shared.close()                         # no pai, ao final (libera o bloco)
+"""
+from array import array
+from multiprocessing import shared_memory
+
+from world.level import LevelData
+
+GRID_FORMAT = "i"  # int32 por célula (tile_id ou EMPTY_TILE)
+POINT_FORMAT = "d"  # float64 por coordenada das tabelas de spawn e retângulos
+RECT_FIELDS = 5  # left, bottom, right, top, tile_id
+
+# Nível anexado no processo atual (preenchido por init_worker_level)
+_worker_level = None
+_worker_block = None
+
+
+class SharedLevel:
+    """Bloco de memória compartilhada com os dados de um nível (lado do pai)."""
+
+    def __init__(self, block, handle):
+        self.block = block
+        self.handle = handle
+
+    def close(self):
+        """Fecha e remove o bloco; os workers precisam ter terminado antes."""
+        self.block.close()
+        self.block.unlink()
+
+
+def publish_level(level: LevelData) -> SharedLevel:
+    """
+    Copia a grade de colisão e as tabelas de spawn de level para um bloco novo.
+
+    Retorna um SharedLevel cujo `handle` (um dict simples, serializável) basta
+    para um worker reconstruir o nível com attach_level().
+    """
+    grid = array(GRID_FORMAT, level.tile_grid).tobytes()
+    water = array(
+        POINT_FORMAT, [c for center in level.water_tile_centers for c in center]
+    ).tobytes()
+    rects = array(
+        POINT_FORMAT, [v for rect in level.collision_rects for v in rect]
+    ).tobytes()
+
+    grid_size, water_size, rects_size = len(grid), len(water), len(rects)
+    block = shared_memory.SharedMemory(
+        create=True, size=max(1, grid_size + water_size + rects_size)
+    )
+    block.buf[:grid_size] = grid
+    block.buf[grid_size : grid_size + water_size] = water
+    block.buf[grid_size + water_size : grid_size + water_size + rects_size] = rects
+
+    handle = {
+        "name": block.name,
+        "width": level.width,
+        "height": level.height,
+        "tile_size": level.tile_size,
+        "swim_tile_id": level.swim_tile_id,
+        "player_spawn": tuple(level.player_spawn),
+        "grid_size": grid_size,
+        "water_size": water_size,
+        "rects_size": rects_size,
+    }
+    return SharedLevel(block, handle)
+
+
+def attach_level(handle: dict):
+    """
+    Conecta-se ao bloco publicado e monta um LevelData sobre ele.
+
+    A grade é uma memoryview somente leitura apontando direto para a memória
+    compartilhada. Retorna (level, block); o bloco deve continuar referenciado
+    enquanto o nível estiver em uso.
+    """
+    # Os workers do pool compartilham o resource_tracker do pai, então o
+    # registro feito ao anexar não remove o bloco quando o worker termina;
+    # quem o remove é o pai, em SharedLevel.close().
+    block = shared_memory.SharedMemory(name=handle["name"])
+
+    grid_size = handle["grid_size"]
+    water_size = handle["water_size"]
+    tile_grid = block.buf[:grid_size].cast(GRID_FORMAT).toreadonly()
+    water = block.buf[grid_size : grid_size + water_size].cast(POINT_FORMAT)
+    water_tile_centers = tuple(
+        (water[2 * i], water[2 * i + 1]) for i in range(len(water) // 2)
+    )
+    water.release()
+
+    rects_start = grid_size + water_size
+    rects = block.buf[rects_start : rects_start + handle["rects_size"]].cast(
+        POINT_FORMAT
+    )
+    collision_rects = [
+        (*rects[i : i + 4], int(rects[i + 4]))
+        for i in range(0, len(rects), RECT_FIELDS)
+    ]
+    rects.release()
+
+    level = LevelData(
+        handle["width"],
+        handle["height"],
+        handle["tile_size"],
+        tile_grid,
+        handle["swim_tile_id"],
+        handle["player_spawn"],
+        water_tile_centers=water_tile_centers,
+        collision_rects=collision_rects,
+    )
+    return level, block
+
+
+def init_worker_level(handle: dict):
+    """Initializer de pool: anexa o nível compartilhado uma vez por worker."""
+    global _worker_level, _worker_block
+    _worker_level, _worker_block = attach_level(handle)
+
+
+def worker_level():
+    """Nível anexado por init_worker_level neste processo (ou None)."""
+    return _worker_level